@@ -15,6 +15,14 @@ from app.models.base import Base  # noqa: E402
 from app.models.metrics_cpu import MetricsCPU  # noqa: F401,E402
 from app.models.metrics_ram import MetricsRAM  # noqa: F401,E402
 from app.models.metrics_gpu import MetricsGPU  # noqa: F401,E402
+from app.models.metric_sketch import MetricSketch  # noqa: F401,E402
+from app.models.metrics_chunk import MetricsChunk  # noqa: F401,E402
+from app.models.metrics_process import MetricsProcess  # noqa: F401,E402
+from app.models.metrics_cpu_cores import MetricsCPUCores  # noqa: F401,E402
+from app.models.metrics_gpu_devices import MetricsGPUDevice  # noqa: F401,E402
+from app.models.alert import Alert  # noqa: F401,E402
+from app.models.metrics_disk_io import MetricsDiskIO  # noqa: F401,E402
+from app.models.metrics_net_io import MetricsNetIO  # noqa: F401,E402
 
 target_metadata = Base.metadata
 
@@ -0,0 +1,48 @@
+"""add disk and network io rate tables
+
+Revision ID: a4d7e2c9b153
+Revises: f3c9b7e2a814
+Create Date: 2026-10-18 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "a4d7e2c9b153"
+down_revision: Union[str, None] = "f3c9b7e2a814"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "metrics_disk_io",
+        sa.Column("ts", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("device", sa.String(length=32), nullable=False),
+        sa.Column("read_bytes_per_s", postgresql.REAL(), nullable=False),
+        sa.Column("write_bytes_per_s", postgresql.REAL(), nullable=False),
+        sa.Column("read_iops", postgresql.REAL(), nullable=False),
+        sa.Column("write_iops", postgresql.REAL(), nullable=False),
+        sa.Column("busy_percent", postgresql.REAL(), nullable=True),
+        sa.PrimaryKeyConstraint("ts", "device"),
+    )
+    op.create_table(
+        "metrics_net_io",
+        sa.Column("ts", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("nic", sa.String(length=32), nullable=False),
+        sa.Column("rx_bytes_per_s", postgresql.REAL(), nullable=False),
+        sa.Column("tx_bytes_per_s", postgresql.REAL(), nullable=False),
+        sa.Column("rx_packets_per_s", postgresql.REAL(), nullable=False),
+        sa.Column("tx_packets_per_s", postgresql.REAL(), nullable=False),
+        sa.Column("errors_per_s", postgresql.REAL(), nullable=True),
+        sa.Column("drops_per_s", postgresql.REAL(), nullable=True),
+        sa.PrimaryKeyConstraint("ts", "nic"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("metrics_net_io")
+    op.drop_table("metrics_disk_io")
@@ -0,0 +1,35 @@
+"""add per-minute / per-hour DDSketch table for percentile queries
+
+Revision ID: a91e4c2b7d35
+Revises: 7c3b2d9f4a10
+Create Date: 2026-10-18 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "a91e4c2b7d35"
+down_revision: Union[str, None] = "7c3b2d9f4a10"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "metric_sketches",
+        sa.Column("metric", sa.String(length=64), nullable=False),
+        sa.Column("width_s", sa.Integer(), nullable=False),
+        sa.Column("bucket", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("min", sa.Float(), nullable=False),
+        sa.Column("max", sa.Float(), nullable=False),
+        sa.Column("sketch", sa.LargeBinary(), nullable=False),
+        # PK (metric, width_s, bucket): pencere sorgusu tek index range scan
+        sa.PrimaryKeyConstraint("metric", "width_s", "bucket"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("metric_sketches")
@@ -0,0 +1,41 @@
+"""add metrics_chunks for compressed hourly history
+
+Revision ID: b5d2e8f1c364
+Revises: a91e4c2b7d35
+Create Date: 2026-10-18 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "b5d2e8f1c364"
+down_revision: Union[str, None] = "a91e4c2b7d35"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "metrics_chunks",
+        sa.Column("family", sa.String(length=16), nullable=False),
+        sa.Column("chunk_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("first_ts", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("last_ts", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("n", sa.Integer(), nullable=False),
+        sa.Column("ts_data", sa.LargeBinary(), nullable=False),
+        sa.Column("val_data", sa.LargeBinary(), nullable=False),
+        sa.Column("col_min", postgresql.ARRAY(sa.Float()), nullable=False),
+        sa.Column("col_max", postgresql.ARRAY(sa.Float()), nullable=False),
+        sa.Column("col_sum", postgresql.ARRAY(sa.Float()), nullable=False),
+        sa.PrimaryKeyConstraint("family", "chunk_start"),
+    )
+    # Pencere sorguları "last_ts >= since" ile başlar
+    op.create_index("ix_metrics_chunks_family_last_ts", "metrics_chunks", ["family", "last_ts"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_metrics_chunks_family_last_ts", table_name="metrics_chunks")
+    op.drop_table("metrics_chunks")
@@ -0,0 +1,24 @@
+"""add alerts (rule, ts desc) index
+
+Revision ID: b8e2c5d1f047
+Revises: a4d7e2c9b153
+Create Date: 2026-10-19 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "b8e2c5d1f047"
+down_revision: Union[str, None] = "a4d7e2c9b153"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_alerts_rule_ts", "alerts", ["rule", sa.text("ts DESC")], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_alerts_rule_ts", table_name="alerts")
@@ -0,0 +1,35 @@
+"""add metrics_process for per-tick top-N processes
+
+Revision ID: c7f3a9d2e481
+Revises: b5d2e8f1c364
+Create Date: 2026-10-18 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "c7f3a9d2e481"
+down_revision: Union[str, None] = "b5d2e8f1c364"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "metrics_process",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("ts", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("pid", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=64), nullable=False),
+        sa.Column("cpu_percent", sa.Float(), nullable=True),
+        sa.Column("rss_mb", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_metrics_process_ts"), "metrics_process", ["ts"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_metrics_process_ts"), table_name="metrics_process")
+    op.drop_table("metrics_process")
@@ -0,0 +1,41 @@
+"""add metrics_cpu_cores and metrics_gpu_devices
+
+Revision ID: d2a6c8e4f917
+Revises: c7f3a9d2e481
+Create Date: 2026-10-18 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "d2a6c8e4f917"
+down_revision: Union[str, None] = "c7f3a9d2e481"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "metrics_cpu_cores",
+        sa.Column("ts", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("usage_percent", postgresql.ARRAY(postgresql.REAL()), nullable=False),
+        sa.Column("freq_mhz", postgresql.ARRAY(postgresql.REAL()), nullable=True),
+        sa.PrimaryKeyConstraint("ts"),
+    )
+    op.create_table(
+        "metrics_gpu_devices",
+        sa.Column("ts", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("device", sa.SmallInteger(), nullable=False),
+        sa.Column("utilization_percent", postgresql.REAL(), nullable=False),
+        sa.Column("temperature_c", postgresql.REAL(), nullable=False),
+        sa.Column("memory_used_mb", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("ts", "device"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("metrics_gpu_devices")
+    op.drop_table("metrics_cpu_cores")
@@ -0,0 +1,67 @@
+"""replace metrics ts btree indexes with covering indexes
+
+Revision ID: f3c9b7e2a814
+Revises: e8b1f4a7c263
+Create Date: 2026-10-18 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "f3c9b7e2a814"
+down_revision: Union[str, None] = "e8b1f4a7c263"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tool SQL'lerinin aggregate ettiği kolonlar (app.services.metrics_query.FAMILIES ile aynı)
+_TABLES = {
+    "metrics_cpu": ("usage_percent", "temperature_c", "freq_mhz"),
+    "metrics_ram": ("used_mb", "available_mb", "usage_percent"),
+    "metrics_gpu": ("utilization_percent", "temperature_c", "memory_used_mb"),
+}
+
+# Index-only scan visibility map'e bakar; sadece insert alan tabloda autovacuum varsayılan olarak
+# tablonun %20'si kadar yeni satır bekler. Sabit eşikle yeni sayfalar sık işaretlenir (append-only'de ucuz).
+_AUTOVACUUM = "autovacuum_vacuum_insert_scale_factor = 0, autovacuum_vacuum_insert_threshold = 1000"
+
+
+def _index_valid(name: str) -> bool | None:
+    # None: index yok; False: yarıda kalmış CONCURRENTLY build'in bıraktığı INVALID index
+    return op.get_bind().execute(
+        sa.text("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"), {"name": name}
+    ).scalar()
+
+
+def _create_concurrently(name: str, ddl: str) -> None:
+    # IF NOT EXISTS INVALID index'i de "var" sayar; önceki denemeden kalanı silip yeniden kur
+    if _index_valid(name) is False:
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+    op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} {ddl}")
+    if not _index_valid(name):
+        raise RuntimeError(f"index {name} is missing or INVALID after CREATE INDEX CONCURRENTLY")
+
+
+def upgrade() -> None:
+    # CONCURRENTLY transaction içinde çalışmaz; büyük tabloda yazmaları kilitlememek için autocommit
+    with op.get_context().autocommit_block():
+        for table, cols in _TABLES.items():
+            # (ts) INCLUDE (değerler): MAX(col) WHERE ts >= ... heap'e gitmeden index-only scan.
+            # Aynı anahtar sırası: ORDER BY ts DESC LIMIT 1 ve max(ts) de bu index'i kullanır.
+            _create_concurrently(f"ix_{table}_ts_cover", f"ON {table} (ts) INCLUDE ({', '.join(cols)})")
+            # Covering index aynı anahtarla her sorguyu karşılıyor; eski btree sadece yazma maliyeti.
+            # BRIN eklenmez: covering index varken planner onu hiç seçmiyor, WAL'i %28 artırıyor (README, Benchmark).
+            # Yeni index geçerli olmadan (_create_concurrently hata verir) buraya gelinmez.
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS ix_{table}_ts")
+            op.execute(f"ALTER TABLE {table} SET ({_AUTOVACUUM})")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table in _TABLES:
+            _create_concurrently(f"ix_{table}_ts", f"ON {table} (ts)")
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS ix_{table}_ts_cover")
+            op.execute(
+                f"ALTER TABLE {table} RESET (autovacuum_vacuum_insert_scale_factor, autovacuum_vacuum_insert_threshold)"
+            )
@@ -0,0 +1,129 @@
+import operator
+from datetime import datetime
+from typing import Any, Callable, Iterable
+
+from app.alerts.types import AlertRule
+from app.services.metrics_query import FAMILIES
+
+_OPS: dict[str, Callable[[float, float], bool]] = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+
+
+def observed_values(sample: dict[str, Any] | None) -> dict[str, float]:
+    """Collector örneği -> {"cpu.usage_percent": 42.0, ...}. Random fallback ile yazılan sensörler gözlem sayılmaz."""
+    if not sample:
+        return {}
+    skip = set(sample.get("randomized") or [])
+    out: dict[str, float] = {}
+    for fam, (_, cols) in FAMILIES.items():
+        values = sample.get(fam) or {}
+        for col in cols:
+            name = f"{fam}.{col}"
+            v = values.get(col)
+            if v is not None and name not in skip:
+                out[name] = float(v)
+    return out
+
+
+class RuleState:
+    # Kural başına sabit boyutlu durum; geçmiş örnek tutulmaz
+    __slots__ = ("since", "firing", "last_seen", "prev_value", "prev_ts")
+
+    def __init__(self, now: float) -> None:
+        self.since: float | None = None  # koşulun kesintisiz sağlandığı ilk an
+        self.firing = False
+        self.last_seen = now  # absence: açılışta veri yoksa for_seconds sonra tetiklenir
+        self.prev_value: float | None = None
+        self.prev_ts: float | None = None
+
+
+class AlertEngine:
+    """
+    Kuralları her yeni örnekte artımlı değerlendirir (DB sorgusu yok, tespit gecikmesi bir tick).
+    Sadece durum değişimlerinde olay üretir: firing (tetiklendi) ve resolved (düzeldi).
+    firing: açılışta hâlâ aktif olan kurallar (alerts tablosundaki son olayı firing); yeniden başlatmada
+    koşul düzeldiğinde resolved yazılabilsin diye bu kurallar firing durumunda başlar.
+    """
+
+    def __init__(self, rules: list[AlertRule], now: float, firing: Iterable[str] = ()) -> None:
+        self.rules = rules
+        self.states = {r.name: RuleState(now) for r in rules}
+        for name in firing:
+            if name in self.states:
+                self.states[name].firing = True
+
+    def observe(self, ts: datetime, values: dict[str, float]) -> list[dict[str, Any]]:
+        now = ts.timestamp()
+        events: list[dict[str, Any]] = []
+        for rule in self.rules:
+            st = self.states[rule.name]
+            v = values.get(rule.metric)
+
+            if rule.kind == "absence":
+                if v is not None:
+                    st.last_seen = now
+                    if st.firing:
+                        events.append(self._resolve(rule, st, ts, v))
+                elif not st.firing and now - st.last_seen >= rule.for_seconds:
+                    events.append(self._fire(rule, st, ts, None))
+                continue
+
+            if v is None:
+                continue  # eksik örnek koşulu ne başlatır ne bozar; absence kuralları ayrıca yakalar
+
+            x = v
+            if rule.kind == "rate":
+                prev_value, prev_ts = st.prev_value, st.prev_ts
+                st.prev_value, st.prev_ts = v, now
+                if prev_value is None or prev_ts is None or now <= prev_ts:
+                    continue
+                x = (v - prev_value) / (now - prev_ts) * 60.0  # birim/dakika
+
+            event = self._step(rule, st, ts, now, x)
+            if event is not None:
+                events.append(event)
+        return events
+
+    def _step(self, rule: AlertRule, st: RuleState, ts: datetime, now: float, x: float) -> dict[str, Any] | None:
+        op = _OPS[rule.op]
+        limit = float(rule.value or 0.0)  # loader threshold/rate kurallarında value'yu zorunlu kılar
+        if st.firing:
+            clear_at = rule.clear_value if rule.clear_value is not None else limit
+            if not op(x, clear_at):
+                st.since = None
+                return self._resolve(rule, st, ts, x)
+            return None
+
+        if not op(x, limit):
+            st.since = None
+            return None
+        if st.since is None:
+            st.since = now
+        if now - st.since >= rule.for_seconds:
+            return self._fire(rule, st, ts, x)
+        return None
+
+    def _fire(self, rule: AlertRule, st: RuleState, ts: datetime, value: float | None) -> dict[str, Any]:
+        st.firing = True
+        return self._event(rule, ts, "firing", value)
+
+    def _resolve(self, rule: AlertRule, st: RuleState, ts: datetime, value: float | None) -> dict[str, Any]:
+        st.firing = False
+        return self._event(rule, ts, "resolved", value)
+
+    @staticmethod
+    def _event(rule: AlertRule, ts: datetime, state: str, value: float | None) -> dict[str, Any]:
+        return {
+            "ts": ts,
+            "rule": rule.name,
+            "severity": rule.severity,
+            "state": state,
+            "metric": rule.metric,
+            "value": round(value, 2) if value is not None else None,
+            "threshold": rule.value,
+            "message": rule.description,
+        }
@@ -0,0 +1,30 @@
+# app/alerts/loader.py
+import json
+from pathlib import Path
+
+from app.alerts.types import AlertRule
+from app.services.metrics_query import FAMILIES
+
+RULES_DIR = Path(__file__).parent / "rules"
+
+METRICS = {f"{fam}.{col}" for fam, (_, cols) in FAMILIES.items() for col in cols}
+
+
+def load_rules(rules_dir: Path) -> list[AlertRule]:
+    rules: dict[str, AlertRule] = {}
+
+    for p in sorted(rules_dir.glob("*.json")):
+        rule = AlertRule.model_validate(json.loads(p.read_text(encoding="utf-8")))
+
+        if rule.name in rules:
+            raise RuntimeError(f"Duplicate alert rule name detected: {rule.name} ({p.name})")
+        if rule.metric not in METRICS:
+            raise RuntimeError(f"Unknown metric for alert rule={rule.name}: {rule.metric}")
+        if rule.kind != "absence" and rule.value is None:
+            raise RuntimeError(f"Alert rule={rule.name} ({rule.kind}) requires a value")
+        if rule.kind == "absence" and rule.for_seconds <= 0:
+            raise RuntimeError(f"Alert rule={rule.name} (absence) requires for_seconds > 0")
+
+        rules[rule.name] = rule
+
+    return list(rules.values())
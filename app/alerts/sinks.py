@@ -0,0 +1,70 @@
+import asyncio
+import os
+from typing import Any
+
+import httpx
+import orjson
+
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.core.logging import get_logger
+from app.core.metrics import ALERT_EVENTS, ALERT_SINK_ERRORS
+from app.models.alert import Alert
+
+log = get_logger()
+
+# Webhook gönderimleri tick'i bekletmez; referans tutulmazsa task GC'ye gidebilir
+_pending: set[asyncio.Task] = set()
+
+
+async def _to_db(events: list[dict[str, Any]]) -> None:
+    async with SessionLocal() as session:
+        session.add_all(Alert(**e) for e in events)
+        await session.commit()
+
+
+def _to_file(events: list[dict[str, Any]]) -> None:
+    path = os.path.join(settings.log_dir, "alerts.jsonl")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "ab") as f:
+        f.write(b"".join(orjson.dumps(e) + b"\n" for e in events))
+
+
+async def _to_webhook(url: str, events: list[dict[str, Any]]) -> None:
+    try:
+        async with httpx.AsyncClient(timeout=settings.alert_webhook_timeout_seconds) as client:
+            resp = await client.post(
+                url, content=orjson.dumps({"alerts": events}), headers={"Content-Type": "application/json"}
+            )
+            resp.raise_for_status()
+    except Exception:
+        ALERT_SINK_ERRORS.labels(sink="webhook").inc()
+        log.exception("alerts.sink.webhook.error", url=url)
+
+
+async def dispatch(events: list[dict[str, Any]]) -> None:
+    """
+    Olayları tabloya, {log_dir}/alerts.jsonl'e ve (ayarlıysa) webhook'a gönderir.
+    Sink'ler birbirinden bağımsızdır: DB yazılamıyorsa (ör. metrics_missing alarmı) dosya yine yazılır.
+    """
+    for e in events:
+        ALERT_EVENTS.labels(rule=e["rule"], state=e["state"]).inc()
+        log.warning("alerts.event", **e)
+
+    try:
+        await _to_db(events)
+    except Exception:
+        ALERT_SINK_ERRORS.labels(sink="db").inc()
+        log.exception("alerts.sink.db.error")
+
+    if settings.alert_file_enabled:
+        try:
+            _to_file(events)
+        except Exception:
+            ALERT_SINK_ERRORS.labels(sink="file").inc()
+            log.exception("alerts.sink.file.error")
+
+    if settings.alert_webhook_url:
+        task = asyncio.create_task(_to_webhook(settings.alert_webhook_url, events))
+        _pending.add(task)
+        task.add_done_callback(_pending.discard)
@@ -0,0 +1,23 @@
+from typing import Literal
+
+from pydantic import BaseModel
+
+
+class AlertRule(BaseModel):
+    """
+    Deklaratif alarm kuralı (rules/*.json). metric "<family>.<kolon>" biçimindedir (ör. cpu.usage_percent).
+
+    threshold: değer `op value` koşulunu for_seconds boyunca kesintisiz sağlarsa tetiklenir
+    rate:      dakikadaki değişim (ardışık iki örnek arası) `op value` koşulunu sağlarsa tetiklenir
+    absence:   metrik for_seconds boyunca hiç gelmezse (collector yazamıyor / sensör okunamıyor) tetiklenir
+    """
+
+    name: str
+    description: str
+    kind: Literal["threshold", "rate", "absence"]
+    metric: str
+    op: Literal[">", ">=", "<", "<="] = ">="
+    value: float | None = None  # absence için kullanılmaz
+    clear_value: float | None = None  # histerezis: düzelme bu sınırın geri tarafına inince (yoksa value)
+    for_seconds: float = 0.0
+    severity: Literal["info", "warning", "critical"] = "warning"
@@ -0,0 +1,33 @@
+from fastapi import APIRouter, HTTPException, Query
+
+from app.core.tracing import get_trace, recent_traces, render_waterfall
+
+router = APIRouter(tags=["debug"])
+
+
+@router.get("/debug/traces")
+async def list_traces(
+    min_ms: float = Query(0.0, ge=0),
+    limit: int = Query(20, ge=1, le=200),
+):
+    # En yavaş örneklenmiş istekler önce
+    return {
+        "traces": [
+            {
+                "trace_id": t["trace_id"],
+                "name": t["name"],
+                "start_unix_ms": t["start_unix_ms"],
+                "duration_ms": t["duration_ms"],
+                "span_count": len(t["spans"]),
+            }
+            for t in recent_traces(min_ms=min_ms, limit=limit)
+        ]
+    }
+
+
+@router.get("/debug/traces/{trace_id}")
+async def trace_waterfall(trace_id: str):
+    trace = get_trace(trace_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="trace not found (not sampled or evicted)")
+    return {**trace, "waterfall": render_waterfall(trace)}
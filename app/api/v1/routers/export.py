@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta, timezone
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app.services.export import COMPRESSIONS, FORMATS, ExportError, ExportUnavailable, stream_export, validate_export
+
+router = APIRouter(tags=["export"])
+
+_COMPRESSED_MEDIA_TYPES = {"gzip": "application/gzip", "zstd": "application/zstd"}
+
+
+@router.get("/export")
+async def export_metrics(
+    family: str = Query("cpu", description="cpu,ram,gpu (virgülle); csv/parquet için tek family"),
+    ts_from: datetime | None = Query(None, alias="from"),
+    ts_to: datetime | None = Query(None, alias="to"),
+    format: str = Query("csv", description="csv | ndjson | parquet"),
+    compression: str = Query("none", description="none | gzip | zstd"),
+):
+    now = datetime.now(timezone.utc)
+    ts_to = ts_to or now
+    ts_from = ts_from or (ts_to - timedelta(days=1))
+    if ts_from.tzinfo is None:
+        ts_from = ts_from.replace(tzinfo=timezone.utc)
+    if ts_to.tzinfo is None:
+        ts_to = ts_to.replace(tzinfo=timezone.utc)
+    if ts_from >= ts_to:
+        raise HTTPException(status_code=422, detail="'from' must be before 'to'")
+
+    families = [f.strip() for f in family.split(",") if f.strip()]
+    try:
+        validate_export(format, compression, families)
+    except ExportUnavailable as e:
+        raise HTTPException(status_code=406, detail=str(e))
+    except ExportError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    filename = f"metrics_{'-'.join(families)}_{ts_from:%Y%m%dT%H%M%S}_{ts_to:%Y%m%dT%H%M%S}.{format}{COMPRESSIONS[compression]}"
+    return StreamingResponse(
+        stream_export(format, compression, families, ts_from, ts_to),
+        media_type=_COMPRESSED_MEDIA_TYPES.get(compression, FORMATS[format]),
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', "Cache-Control": "no-store"},
+    )
@@ -6,3 +6,14 @@ router = APIRouter(tags=["health"])
 @router.get("/health")
 async def health():
     return {"status": "ok"}
+
+
+@router.get("/health/llm")
+async def health_llm():
+    from app.llm.admission import get_admission_controller
+    from app.llm.client import get_endpoint_pool
+
+    return {
+        "endpoints": get_endpoint_pool().snapshot(),
+        "admission": get_admission_controller().stats(),
+    }
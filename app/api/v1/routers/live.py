@@ -0,0 +1,71 @@
+import asyncio
+from typing import AsyncIterator
+
+from fastapi import APIRouter, Query, WebSocket
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.services.live import hub
+
+router = APIRouter(tags=["live"])
+log = get_logger()
+
+
+@router.get("/live/metrics")
+async def live_metrics_sse(
+    min_interval: float = Query(0.0, ge=0, description="Saniye; abonelik başına downsampling"),
+):
+    sub = hub.subscribe(min_interval)
+
+    async def stream() -> AsyncIterator[bytes]:
+        try:
+            yield b"retry: 3000\n\n"
+            while True:
+                try:
+                    frame = await asyncio.wait_for(sub.queue.get(), timeout=settings.live_heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    # Proxy'ler boştaki bağlantıyı kapatmasın
+                    yield b": keepalive\n\n"
+                    continue
+                yield frame.sse
+        finally:
+            hub.unsubscribe(sub)
+            log.info("live.sse.closed", dropped=sub.dropped)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _wait_for_ws_disconnect(websocket: WebSocket) -> None:
+    # İstemci veri göndermez; receive() kapanışı (close frame / TCP kopması) feed'den bağımsız olarak hemen bildirir
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
+
+
+@router.websocket("/live/metrics/ws")
+async def live_metrics_ws(websocket: WebSocket, min_interval: float = 0.0):
+    await websocket.accept()
+    sub = hub.subscribe(max(0.0, min_interval))
+
+    async def send_frames() -> None:
+        while True:
+            frame = await sub.queue.get()
+            await websocket.send_text(frame.payload)
+
+    # Sadece gönderen döngü kopmayı bir sonraki frame'de fark eder; seyrek feed'de (min_interval) abonelik asılı kalırdı
+    sender = asyncio.create_task(send_frames())
+    watcher = asyncio.create_task(_wait_for_ws_disconnect(websocket))
+    try:
+        await asyncio.wait({sender, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        hub.unsubscribe(sub)
+        sender.cancel()
+        watcher.cancel()
+        log.info("live.ws.closed", dropped=sub.dropped)
+        await asyncio.gather(sender, watcher, return_exceptions=True)
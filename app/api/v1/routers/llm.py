@@ -1,19 +1,71 @@
-from fastapi import APIRouter, Depends
-from pydantic import BaseModel
+import asyncio
+from typing import Any, Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from pydantic import BaseModel, Field
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
+from app.core.deadline import request_deadline
 from app.core.logging import get_logger
-from app.core.db import get_db
+from app.core.db import get_read_db
+from app.core.metrics import LLM_ASK_CANCELLED
 from app.llm.orchestrator import ask_with_tools
+from app.llm.sessions import store as session_store
 
 router = APIRouter(tags=["llm"])
 log = get_logger()
 
+# nginx'in "client closed request" kodu; yanıtı okuyan kimse yok, sadece log/metrik için
+_CLIENT_CLOSED_REQUEST = 499
+
 class AskRequest(BaseModel):
     text: str
+    priority: Literal["interactive", "batch"] = "interactive"
+    # new_session=true konuşmayı sunucuda başlatır; cevaptaki session_id ile sonraki sorular aynı oturuma gider.
+    # Kimliği sadece sunucu üretir; bilinmeyen/süresi dolmuş session_id 404 döner
+    new_session: bool = False
+    session_id: str | None = Field(default=None, min_length=1, max_length=64, pattern=r"^[A-Za-z0-9_-]+$")
+
+
+async def _wait_for_disconnect(request: Request) -> None:
+    # Gövde okunduktan sonra receive() sadece istemci/proxy bağlantıyı kapatınca döner
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
 
 @router.post("/llm/ask")
-async def ask(req: AskRequest, db: AsyncSession = Depends(get_db)):
-    log.info("llm.user_input", user_text=req.text)
-    return await ask_with_tools(db, req.text)
+async def ask(req: AskRequest, request: Request, db: AsyncSession = Depends(get_read_db)) -> Any:
+    log.info("llm.user_input", user_text=req.text, priority=req.priority, session_id=req.session_id)
+    conv = None
+    if req.session_id is not None:
+        if req.new_session:
+            raise HTTPException(status_code=422, detail="'session_id' and 'new_session' are mutually exclusive")
+        conv = session_store.get(req.session_id)
+        if conv is None:
+            raise HTTPException(status_code=404, detail="session not found (expired or unknown); start one with new_session")
+    elif req.new_session:
+        conv = session_store.create()
+    with request_deadline(settings.llm_request_deadline_seconds):
+        # Task, deadline/timing/trace contextvar'larının kopyasıyla çalışır
+        work = asyncio.create_task(ask_with_tools(db, req.text, priority=req.priority, conv=conv))
+    watcher = asyncio.create_task(_wait_for_disconnect(request))
+    try:
+        await asyncio.wait({work, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    except asyncio.CancelledError:
+        work.cancel()
+        raise
+    finally:
+        watcher.cancel()
+
+    if not work.done():
+        # İstemci gitti: LLM isteği (httpx bağlantısı kapanır) ve çalışan SQL (asyncpg cancel) iptal edilir
+        work.cancel()
+        await asyncio.gather(work, return_exceptions=True)
+        LLM_ASK_CANCELLED.labels(reason="disconnect").inc()
+        log.info("llm.ask.cancelled", reason="client_disconnect")
+        return Response(status_code=_CLIENT_CLOSED_REQUEST)
+    return work.result()
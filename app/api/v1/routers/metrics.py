@@ -0,0 +1,104 @@
+import hashlib
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from typing import Literal
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.db import get_read_db
+from app.services.metrics_query import latest_ts, parse_bucket, query_columns
+
+router = APIRouter(tags=["metrics"])
+
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+JSON_MEDIA_TYPE = "application/json; charset=utf-8"
+
+
+def _to_arrow_ipc(columns: dict[str, list]) -> bytes:
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise HTTPException(status_code=406, detail="Arrow output requires pyarrow")
+
+    arrays = {"ts": pa.array(columns["ts"], type=pa.timestamp("ms", tz="UTC"))}
+    for name, values in columns.items():
+        if name != "ts":
+            arrays[name] = pa.array(values, type=pa.float64())
+    table = pa.table(arrays)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+@router.get("/metrics/{family}")
+async def get_metrics(
+    request: Request,
+    family: Literal["cpu", "ram", "gpu"],
+    ts_from: datetime | None = Query(None, alias="from"),
+    ts_to: datetime | None = Query(None, alias="to"),
+    bucket: str | None = Query(None, description="30s, 5m, 1h, 1d veya saniye; boşsa ham örnekler"),
+    agg: Literal["avg", "max", "min"] = "avg",
+    format: Literal["json", "arrow"] | None = None,
+    db: AsyncSession = Depends(get_read_db),
+):
+    now = datetime.now(timezone.utc)
+    ts_to = ts_to or now
+    ts_from = ts_from or (ts_to - timedelta(hours=1))
+    if ts_from.tzinfo is None:
+        ts_from = ts_from.replace(tzinfo=timezone.utc)
+    if ts_to.tzinfo is None:
+        ts_to = ts_to.replace(tzinfo=timezone.utc)
+    if ts_from >= ts_to:
+        raise HTTPException(status_code=422, detail="'from' must be before 'to'")
+
+    try:
+        bucket_seconds = parse_bucket(bucket)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    use_arrow = format == "arrow" or (format is None and ARROW_MEDIA_TYPE in request.headers.get("accept", ""))
+
+    # ETag: en son örnek zamanı + sorgu parametreleri. Yeni örnek gelmediyse cevap değişmez.
+    # from/to verilmemişse pencere "şimdi"ye göre göreli; anahtara ham parametre girer, hesaplanan an değil.
+    latest = await latest_ts(db, family)
+    key = "|".join(
+        [
+            family,
+            request.query_params.get("from", ""),
+            request.query_params.get("to", ""),
+            str(bucket_seconds),
+            agg,
+            "arrow" if use_arrow else "json",
+            latest.isoformat() if latest else "empty",
+        ]
+    )
+    etag = f'W/"{hashlib.blake2b(key.encode(), digest_size=12).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if latest is not None:
+        headers["Last-Modified"] = format_datetime(latest.astimezone(timezone.utc), usegmt=True)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in [t.strip() for t in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    columns = await query_columns(
+        db, family, ts_from, ts_to, bucket_seconds, agg, settings.metrics_query_max_points
+    )
+
+    if use_arrow:
+        return Response(content=_to_arrow_ipc(columns), media_type=ARROW_MEDIA_TYPE, headers=headers)
+
+    body = {
+        "family": family,
+        "from": ts_from,
+        "to": ts_to,
+        "bucket_seconds": bucket_seconds,
+        "agg": agg if bucket_seconds else None,
+        "count": len(columns["ts"]),
+        "columns": columns,
+    }
+    return Response(content=orjson.dumps(body), media_type=JSON_MEDIA_TYPE, headers=headers)
@@ -8,9 +8,42 @@ class Settings(BaseSettings):
     llm_model: str = "llama3.1"
     llm_timeout_seconds: int = 60
     llm_max_tool_iterations: int = 5
+    llm_request_deadline_seconds: float = 120.0  # /llm/ask toplam süre (kuyruk + tüm LLM çağrıları + SQL); 0 -> sınırsız
+
+    # Birden fazla OpenAI-compatible backend (virgülle ayrılmış). Boşsa llm_base_url kullanılır.
+    llm_base_urls: str | None = None
+    llm_routing_strategy: str = "least_outstanding"  # least_outstanding | ewma
+    llm_ewma_alpha: float = 0.3
+    llm_max_connect_retries: int = 2
+    llm_circuit_failure_threshold: int = 3
+    llm_circuit_reset_seconds: float = 30.0
+    llm_health_probe_interval_seconds: float = 15.0  # 0 -> probe kapalı
+    llm_health_probe_timeout_seconds: float = 3.0
+
+    # Admission control: backend'e aynı anda en fazla N istek, fazlası öncelikli kuyrukta bekler
+    llm_max_concurrency: int = 4  # 0 -> sınırsız
+    llm_admission_queue_size: int = 32
+    llm_admission_max_wait_seconds: float = 30.0
+
+    # Token bütçesi: soruya göre top-k tool şeması, eski tool alışverişlerini özetle
+    llm_tool_top_k: int = 3  # 0 -> tüm katalog
+    llm_prompt_compaction: bool = True
+    llm_compact_keep_exchanges: int = 1
+
+    # Konuşma oturumları (session_id): geçmiş ve tool sonuçları sunucuda, LRU + TTL + bellek sınırıyla
+    llm_session_ttl_seconds: float = 1800.0  # son kullanımdan sonra
+    llm_session_max_sessions: int = 1000
+    llm_session_max_bytes: int = 32 * 1024 * 1024  # tüm oturumların tahmini toplam boyutu
+    llm_session_max_turns: int = 6  # aşılınca eski turların yarısı tek özet mesajına katlanır
+    llm_session_summary_chars: int = 2000
+    llm_session_tool_cache_seconds: float = 30.0  # aynı tool + argümanlar bu süre içinde DB'ye tekrar gitmez
+
+    # native: tools/tool_calls | json_schema: response_format ile şemaya kısıtlı tek JSON cevap
+    llm_tool_call_mode: str = "native"
 
     # Collector
     metrics_interval_seconds: int = 10
+    collector_metrics_port: int = 9101  # collector'ın /metrics exporter'ı; 0 -> kapalı
 
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
@@ -18,10 +51,92 @@ class Settings(BaseSettings):
 
     database_url_async: str
     database_url_sync: str
+    # Okuma replikası: /llm/ask tool SQL'leri buraya gider; boşsa primary kullanılır
+    database_url_read: str | None = None
+
+    # Bağlantı havuzu (primary ve read engine ayrı ayrı bu değerlerle kurulur)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout_seconds: float = 30.0
+    db_pool_recycle_seconds: int = 1800  # -1 -> kapalı; bayat bağlantılar pre-ping yerine yaşla yenilenir
+    db_pool_pre_ping: bool = False  # her checkout'ta bir round trip; kopan bağlantı zaten hata anında havuzdan atılır
+    db_statement_cache_size: int = 128  # bağlantı başına prepared statement LRU; 0 -> kapalı
+    db_pgbouncer: bool = False  # pgbouncer transaction modu: statement cache'ler kapalı, benzersiz statement adları, startup parametresi yok
+    db_jit: bool = False  # kısa aggregate sorgularında JIT derleme süresi sorgunun kendisini geçebiliyor
 
     log_level: str = "INFO"
     log_dir: str = "/var/log/app"
     log_full_payload: bool = True
+    log_renderer: str = "console"  # console | json (orjson)
+    log_max_field_chars: int = 4000  # 0 -> kırpma yok; log_full_payload=false iken 200
+    log_sample_rates: str = ""  # "tool.exec.end=0.1,llm.tool_call.raw=0.5"
+    log_queue_size: int = 10000
+
+    # Yanıtlara aşama süreleri (llm/tool/finalize) için Server-Timing header'ı ekle
+    server_timing: bool = True
+
+    # Canlı yayın: collector her örneği pg_notify ile yayınlar, API tek LISTEN bağlantısıyla fan-out yapar
+    live_enabled: bool = True
+    live_channel: str = "metrics_sample"
+    live_heartbeat_seconds: float = 15.0
+    live_listen_url: str | None = None  # LISTEN için doğrudan Postgres DSN'i (pgbouncer transaction modunda gerekli); boş -> database_url_async
+
+    # Rolling window store: son N dakikalık max/min/avg tool'ları DB yerine bellekten cevaplanır (live feed gerekir)
+    rolling_enabled: bool = True
+    rolling_retention_minutes: int = 60
+    rolling_max_samples: int = 5000  # kolon başına ring buffer üst sınırı
+
+    # Percentile sketch'leri (DDSketch): collector kapanan dakika/saatleri metric_sketches tablosuna yazar
+    sketch_enabled: bool = True
+    sketch_relative_accuracy: float = 0.01  # değiştirilirse eski sketch'lerle birleştirilemez
+    sketch_backfill_minutes: int = 1440  # tek geçişte en fazla bu kadar geriye bakılır
+
+    # Sıkıştırılmış geçmiş: bu süreden eski saatler metrics_chunks'a paketlenir, ham satırlar silinir.
+    # rolling_retention_minutes ve sketch_backfill_minutes'tan büyük olmalı (onlar ham tabloyu okur).
+    chunk_enabled: bool = True
+    chunk_compress_after_hours: int = 48
+    chunk_max_per_pass: int = 24  # family başına tek geçişte en fazla bu kadar saat
+
+    # Cold tier: bu günden eski veriler (chunk + ham) günlük Parquet dosyalarına taşınır (pyarrow gerekir)
+    archive_enabled: bool = False
+    archive_dir: str = "/var/lib/app/archive"
+    archive_after_days: int = 30
+    archive_max_days_per_pass: int = 7
+
+    # Süreç örnekleme: her tick'te CPU'ya ve RSS'e göre ilk N süreç metrics_process'e yazılır (0 -> kapalı)
+    process_top_n: int = 5
+    process_scan_budget_ms: float = 50.0  # tick başına tarama bütçesi; aşılırsa kalan pid'ler sonraki tick'e kalır
+    process_retention_hours: int = 168
+
+    # Çekirdek başına CPU (metrics_cpu_cores, dizi kolonlar) ve GPU cihaz başına (metrics_gpu_devices) örnekler
+    device_metrics_enabled: bool = True
+    device_metrics_retention_hours: int = 168
+
+    # Disk/ağ I/O: collector sayaç farkından oran hesaplar, metrics_disk_io / metrics_net_io'ya sadece oranlar yazılır
+    io_metrics_enabled: bool = True
+    io_metrics_retention_hours: int = 168
+    io_disk_exclude_prefixes: str = "loop,ram,zram,sr,fd"  # sanal/çıkarılabilir aygıtlar; bölümler (sda1) zaten atlanır
+    io_nic_exclude_prefixes: str = "lo,veth,docker,br-,virbr"
+
+    # Alarm motoru: collector her örnekte kuralları değerlendirir; olaylar alerts tablosu + {log_dir}/alerts.jsonl (+ webhook)
+    alert_enabled: bool = True
+    alert_rules_dir: str = ""  # boş -> app/alerts/rules
+    alert_file_enabled: bool = True
+    alert_webhook_url: str | None = None
+    alert_webhook_timeout_seconds: float = 3.0
+    alert_retention_hours: int = 720  # kuralın son olayı (aktif durum) süreden bağımsız tutulur
+
+    # /api/v1/export: COPY/cursor çıktısı bu boyutta parçalarla, en fazla export_queue_chunks parça bekletilerek akar
+    export_chunk_bytes: int = 256 * 1024
+    export_queue_chunks: int = 8
+    export_batch_rows: int = 10000  # parquet row group / cursor batch
+
+    # /api/v1/metrics/{family} tek cevapta en fazla kaç nokta döner
+    metrics_query_max_points: int = 20000
+
+    # Span tracing: örneklenen istekler {log_dir}/traces.jsonl (OTLP JSON) ve /api/v1/debug/traces
+    trace_sample_rate: float = 0.1  # 0 -> kapalı, 1 -> her istek
+    trace_buffer_size: int = 200
 
     metrics_interval_seconds: int = 10
 
@@ -1,11 +1,67 @@
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+import time
+from typing import Any
+from uuid import uuid4
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.core.config import settings
+from app.core.metrics import DB_POOL, DB_POOL_WAIT_SECONDS
+
+
+class _TimedPool(AsyncAdaptedQueuePool):
+    # Havuzdan bağlantı alma süresi (boş slot bekleme + gerekirse yeni bağlantı açma)
+    engine_name = "primary"
+
+    def _do_get(self) -> Any:
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT_SECONDS.labels(engine=self.engine_name).observe(time.perf_counter() - start)
+
+
+def _make_engine(name: str, url: str) -> AsyncEngine:
+    # pool.recreate() (dispose) sınıfı korur; etiket sınıf özelliğinde tutulur
+    pool_class = type(f"_TimedPool_{name}", (_TimedPool,), {"engine_name": name})
+    connect_args: dict[str, Any] = {"prepared_statement_cache_size": settings.db_statement_cache_size}
+    if settings.db_pgbouncer:
+        # Transaction modunda ardışık sorgular farklı sunucu bağlantılarına düşebilir: asyncpg'nin kendi cache'i de
+        # kapatılır; sunucu bağlantısında kalmış bir statement adıyla çakışmasın diye her prepare benzersiz ad alır
+        connect_args["prepared_statement_cache_size"] = 0
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+    if not settings.db_jit and not settings.db_pgbouncer:
+        # pgbouncer bilmediği startup parametresini reddeder (ignore_startup_parameters); orada jit rol/DB ayarıdır
+        connect_args["server_settings"] = {"jit": "off"}
+    engine = create_async_engine(
+        url,
+        poolclass=pool_class,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        pool_recycle=settings.db_pool_recycle_seconds,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        connect_args=connect_args,
+    )
+    DB_POOL.add_engine(name, engine.sync_engine)
+    return engine
+
+
+# Yazma (collector, alarmlar) ve okuma (tool SQL'leri, /metrics, export) ayrı engine'ler; replika yoksa aynı engine
+engine = _make_engine("primary", settings.database_url_async)
+read_engine = _make_engine("read", settings.database_url_read) if settings.database_url_read else engine
 
-engine = create_async_engine(settings.database_url_async, pool_pre_ping=True)
 SessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+ReadSessionLocal = async_sessionmaker(read_engine, expire_on_commit=False) if read_engine is not engine else SessionLocal
 
 
 async def get_db() -> AsyncSession:
     async with SessionLocal() as session:
         yield session
+
+
+async def get_read_db() -> AsyncSession:
+    # Replika gecikmesi (replication lag) kabul edilen salt okunur sorgular için
+    async with ReadSessionLocal() as session:
+        yield session
@@ -0,0 +1,68 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Iterator
+
+from app.core.metrics import REQUEST_WORK_ABORTED
+
+# İstek başına mutlak bitiş zamanı (time.monotonic). Route kurar; LLM çağrısı ve tool sorgusu kalan süreyle sınırlanır.
+_deadline: ContextVar[float | None] = ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    def __init__(self, stage: str) -> None:
+        super().__init__(f"request deadline exceeded during {stage}")
+        self.stage = stage
+
+
+@contextmanager
+def request_deadline(seconds: float) -> Iterator[None]:
+    if seconds <= 0:
+        yield
+        return
+    token = _deadline.set(time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> float | None:
+    dl = _deadline.get()
+    if dl is None:
+        return None
+    return max(0.0, dl - time.monotonic())
+
+
+@asynccontextmanager
+async def deadline_scope(stage: str) -> AsyncIterator[None]:
+    """
+    İçerideki işi istek deadline'ına kadar çalıştırır; süre dolarsa iş iptal edilir ve DeadlineExceeded fırlar.
+    İptal (deadline veya istemci kopması) uçuştaki httpx isteğini kapatır; asyncpg de sunucuya cancel request gönderir.
+    """
+    rem = remaining()
+    if rem is None:
+        try:
+            yield
+        except asyncio.CancelledError:
+            REQUEST_WORK_ABORTED.labels(stage=stage, reason="cancelled").inc()
+            raise
+        return
+
+    if rem <= 0:
+        REQUEST_WORK_ABORTED.labels(stage=stage, reason="deadline").inc()
+        raise DeadlineExceeded(stage)
+
+    cm = asyncio.timeout(rem)
+    try:
+        async with cm:
+            yield
+    except TimeoutError as e:
+        if not cm.expired():
+            raise
+        REQUEST_WORK_ABORTED.labels(stage=stage, reason="deadline").inc()
+        raise DeadlineExceeded(stage) from e
+    except asyncio.CancelledError:
+        REQUEST_WORK_ABORTED.labels(stage=stage, reason="cancelled").inc()
+        raise
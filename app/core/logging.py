@@ -1,14 +1,102 @@
+import atexit
 import logging
 import os
-from logging.handlers import TimedRotatingFileHandler
+import queue
+import random
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
+from typing import Any
 
+import orjson
 import structlog
 from structlog.contextvars import merge_contextvars
 
 from app.core.config import settings
 
+_listener: QueueListener | None = None
+
+_NEVER_TRUNCATE = {"event", "exception", "stack"}
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    Kaydı formatlamadan kuyruğa atar; render (Console/JSON) ve dosya I/O listener thread'inde yapılır.
+    Kuyruk doluysa event loop'u bloklamak yerine kaydı düşürür.
+    """
+
+    dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _DeferredQueueHandler.dropped += 1
+
+
+def _parse_sample_rates(raw: str) -> dict[str, float]:
+    # "tool.exec.end=0.1,llm.tool_call.raw=0.5"
+    rates: dict[str, float] = {}
+    for part in (raw or "").split(","):
+        name, _, rate = part.partition("=")
+        if name.strip() and rate.strip():
+            rates[name.strip()] = max(0.0, min(1.0, float(rate)))
+    return rates
+
+
+def _make_sampler(rates: dict[str, float]):
+    def sample_events(logger: Any, method_name: str, event_dict: dict[str, Any]) -> dict[str, Any]:
+        rate = rates.get(event_dict.get("event"))  # type: ignore[arg-type]
+        if rate is not None and method_name not in {"warning", "error", "exception", "critical"}:
+            if random.random() >= rate:
+                raise structlog.DropEvent
+        return event_dict
+
+    return sample_events
+
+
+def _make_truncator(limit: int):
+    # Çağıranın thread'inde (event loop) çalışır; sadece ucuz işler: str kırpma ve container'ların sığ kopyası
+    # (kayıt listener'da render edilene kadar çağıran listeye/dict'e eklemeye devam edebilir)
+    def truncate_payloads(logger: Any, method_name: str, event_dict: dict[str, Any]) -> dict[str, Any]:
+        for key, value in event_dict.items():
+            if key in _NEVER_TRUNCATE:
+                continue
+            if isinstance(value, str):
+                if len(value) > limit:
+                    event_dict[key] = f"{value[:limit]}…(+{len(value) - limit} chars)"
+            elif isinstance(value, (list, tuple)):
+                event_dict[key] = list(value)
+            elif isinstance(value, dict):
+                event_dict[key] = dict(value)
+        return event_dict
+
+    return truncate_payloads
+
+
+def _make_payload_serializer(limit: int):
+    # Listener thread'inde render'dan hemen önce: container'lar serialize edilip kırpılır
+    def serialize_payloads(logger: Any, method_name: str, event_dict: dict[str, Any]) -> dict[str, Any]:
+        for key, value in event_dict.items():
+            if key in _NEVER_TRUNCATE or value is None or isinstance(value, (str, bool, int, float)):
+                continue
+            dumped = orjson.dumps(value, default=str)
+            if len(dumped) > limit:
+                event_dict[key] = f"{dumped[:limit].decode('utf-8', 'ignore')}…(+{len(dumped) - limit} bytes)"
+        return event_dict
+
+    return serialize_payloads
+
+
+def _orjson_dumps(obj: Any, **kwargs: Any) -> str:
+    return orjson.dumps(obj, default=str).decode("utf-8")
+
 
 def configure_logging() -> None:
+    global _listener
+    shutdown_logging()
+
     os.makedirs(settings.log_dir, exist_ok=True)
     log_path = os.path.join(settings.log_dir, "app.log")
 
@@ -30,32 +118,46 @@ def configure_logging() -> None:
 
     pre_chain = [
         merge_contextvars,
+        _make_sampler(_parse_sample_rates(settings.log_sample_rates)),
         structlog.processors.add_log_level,
         structlog.processors.TimeStamper(fmt="iso", utc=True),
         structlog.processors.StackInfoRenderer(),
         structlog.processors.format_exc_info,
     ]
+    # log_full_payload kapalıysa büyük payload'lar (tool sonuçları, mesajlar) kısa tutulur
+    limit = settings.log_max_field_chars if settings.log_full_payload else 200
+    render_chain: list[Any] = [structlog.stdlib.ProcessorFormatter.remove_processors_meta]
+    if limit > 0:
+        pre_chain.append(_make_truncator(limit))
+        render_chain.append(_make_payload_serializer(limit))
 
-    renderer = structlog.dev.ConsoleRenderer(
-        colors=False,
-        pad_event=0,
-        pad_level=False,
-    )
+    if settings.log_renderer == "json":
+        renderer = structlog.processors.JSONRenderer(serializer=_orjson_dumps)
+    else:
+        renderer = structlog.dev.ConsoleRenderer(
+            colors=False,
+            pad_event=0,
+            pad_level=False,
+        )
 
     formatter = structlog.stdlib.ProcessorFormatter(
         foreign_pre_chain=pre_chain,
-        processors=[
-            structlog.stdlib.ProcessorFormatter.remove_processors_meta,
-            renderer,
-        ],
+        processors=[*render_chain, renderer],
     )
 
     sh.setFormatter(formatter)
     fh.setFormatter(formatter)
 
+    # Handler'lar arka plan thread'inde çalışır; event loop sadece kuyruğa koyar
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.log_queue_size)
+    qh = _DeferredQueueHandler(log_queue)
+    qh.setLevel(settings.log_level)
+
     root.handlers.clear()
-    root.addHandler(sh)
-    root.addHandler(fh)
+    root.addHandler(qh)
+
+    _listener = QueueListener(log_queue, sh, fh, respect_handler_level=True)
+    _listener.start()
 
     structlog.configure(
         processors=pre_chain + [
@@ -66,5 +168,18 @@ def configure_logging() -> None:
     )
 
 
+def shutdown_logging() -> None:
+    # Kuyrukta kalan kayıtları yazıp listener thread'ini durdurur
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for h in _listener.handlers:
+            h.close()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
+
+
 def get_logger():
     return structlog.get_logger()
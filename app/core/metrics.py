@@ -0,0 +1,153 @@
+from typing import Iterable
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily, REGISTRY
+from prometheus_client.registry import Collector
+
+# LLM çağrıları saniyeler, SQL/HTTP milisaniyeler mertebesinde
+_FAST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+_LLM_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0, 120.0)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency",
+    ["method", "route", "status"],
+    buckets=_FAST_BUCKETS + (10.0, 30.0, 60.0, 120.0),
+)
+
+LLM_CHAT_SECONDS = Histogram(
+    "llm_chat_duration_seconds",
+    "LLMClient.chat latency (admission queue wait excluded)",
+    ["outcome"],
+    buckets=_LLM_BUCKETS,
+)
+LLM_QUEUE_WAIT_SECONDS = Histogram(
+    "llm_admission_queue_wait_seconds",
+    "Time spent waiting for an LLM admission slot",
+    ["priority"],
+    buckets=_LLM_BUCKETS,
+)
+LLM_ADMISSION_REJECTED = Counter(
+    "llm_admission_rejected_total",
+    "LLM calls rejected by admission control",
+    ["reason"],
+)
+LLM_ITERATIONS = Histogram(
+    "llm_tool_iterations",
+    "Tool-loop iterations per /llm/ask request",
+    ["mode"],
+    buckets=(1, 2, 3, 4, 5, 8, 10),
+)
+LLM_FINALIZE_FALLBACK = Counter(
+    "llm_finalize_fallback_total",
+    "Finalize answers replaced by the formatted tool answer",
+    ["reason"],
+)
+LLM_TOKENS = Counter(
+    "llm_tokens_total",
+    "Tokens sent to / received from the LLM backend",
+    ["kind"],
+)
+LLM_ASK_CANCELLED = Counter(
+    "llm_ask_cancelled_total",
+    "/llm/ask requests abandoned before an answer (client disconnect or request deadline)",
+    ["reason"],
+)
+LLM_SESSION_TOOL_CACHE = Counter(
+    "llm_session_tool_cache_total",
+    "Tool executions served from the conversation session cache",
+    ["outcome"],
+)
+LLM_SESSION_EVICTED = Counter(
+    "llm_session_evicted_total",
+    "Conversation sessions dropped from the server-side store",
+    ["reason"],
+)
+REQUEST_WORK_ABORTED = Counter(
+    "request_work_aborted_total",
+    "In-flight LLM calls and tool queries aborted by cancellation or the request deadline",
+    ["stage", "reason"],
+)
+
+TOOL_EXEC_SECONDS = Histogram(
+    "tool_exec_duration_seconds",
+    "execute_tool SQL execution latency",
+    ["tool"],
+    buckets=_FAST_BUCKETS,
+)
+
+TOOL_ROLLING_LOOKUPS = Counter(
+    "tool_rolling_store_lookups_total",
+    "Window-aggregate tool calls answered from the in-memory rolling store (hit) or SQL (miss)",
+    ["tool", "outcome"],
+)
+
+COLLECTOR_TICK_SECONDS = Histogram(
+    "collector_tick_duration_seconds",
+    "collect_once duration",
+    buckets=_FAST_BUCKETS,
+)
+COLLECTOR_RANDOMIZED = Counter(
+    "collector_randomized_sensor_total",
+    "Samples where a sensor was unreadable and a random value was written",
+    ["sensor"],
+)
+COLLECTOR_PROCESS_SCAN_SECONDS = Histogram(
+    "collector_process_scan_duration_seconds",
+    "Per-tick top-N process scan duration",
+    buckets=_FAST_BUCKETS,
+)
+COLLECTOR_PROCESS_SCAN_TRUNCATED = Counter(
+    "collector_process_scan_truncated_total",
+    "Process scans stopped by the cost budget before visiting every pid",
+)
+ALERT_EVENTS = Counter(
+    "collector_alert_events_total",
+    "Alert state transitions emitted by the collector rule engine",
+    ["rule", "state"],
+)
+ALERT_SINK_ERRORS = Counter(
+    "collector_alert_sink_errors_total",
+    "Alert deliveries that failed, per sink",
+    ["sink"],
+)
+
+DB_POOL_WAIT_SECONDS = Histogram(
+    "db_pool_wait_seconds",
+    "Time to get a connection from the pool (queueing for a free slot or opening a new connection)",
+    ["engine"],
+    buckets=_FAST_BUCKETS + (10.0, 30.0),
+)
+
+
+class DBPoolCollector(Collector):
+    """Scrape anında SQLAlchemy pool durumunu okur (QueuePool)."""
+
+    def __init__(self) -> None:
+        self._engines: dict[str, object] = {}
+
+    def add_engine(self, name: str, engine: object) -> None:
+        self._engines[name] = engine
+
+    def collect(self) -> Iterable[GaugeMetricFamily]:
+        size = GaugeMetricFamily("db_pool_size", "Configured pool size", labels=["engine"])
+        checked_out = GaugeMetricFamily("db_pool_checked_out", "Connections in use", labels=["engine"])
+        overflow = GaugeMetricFamily("db_pool_overflow", "Overflow connections in use", labels=["engine"])
+        for name, engine in self._engines.items():
+            pool = engine.pool  # type: ignore[attr-defined]
+            if not hasattr(pool, "checkedout"):
+                continue
+            size.add_metric([name], pool.size())
+            checked_out.add_metric([name], pool.checkedout())
+            overflow.add_metric([name], max(0, pool.overflow()))
+        yield size
+        yield checked_out
+        yield overflow
+
+
+DB_POOL = DBPoolCollector()
+REGISTRY.register(DB_POOL)
+
+
+def render_latest() -> tuple[bytes, str]:
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
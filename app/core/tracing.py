@@ -0,0 +1,227 @@
+import os
+import queue
+import random
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator
+
+import orjson
+
+from app.core.config import settings
+
+_TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+
+class Span:
+    __slots__ = ("trace", "span_id", "parent_id", "name", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, trace: "Trace", name: str, parent_id: str | None, attributes: dict[str, Any]) -> None:
+        self.trace = trace
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = time.time_ns()
+        self.end_ns: int | None = None
+        self.attributes = attributes
+        self.error: str | None = None
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+
+class Trace:
+    def __init__(self, trace_id: str) -> None:
+        self.trace_id = trace_id
+        self.spans: list[Span] = []
+
+
+_current: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+# Son tamamlanan trace'ler (debug endpoint'i için) ve dosyaya yazma kuyruğu
+_recent: deque[dict[str, Any]] = deque(maxlen=settings.trace_buffer_size)
+_sink_queue: "queue.SimpleQueue[bytes | None]" = queue.SimpleQueue()
+_sink_thread: threading.Thread | None = None
+
+
+def _otlp_value(v: Any) -> dict[str, Any]:
+    if isinstance(v, bool):
+        return {"boolValue": v}
+    if isinstance(v, int):
+        return {"intValue": str(v)}
+    if isinstance(v, float):
+        return {"doubleValue": v}
+    return {"stringValue": str(v)}
+
+
+def _otlp_span(s: Span) -> dict[str, Any]:
+    out: dict[str, Any] = {
+        "traceId": s.trace.trace_id,
+        "spanId": s.span_id,
+        "name": s.name,
+        "kind": 1,
+        "startTimeUnixNano": str(s.start_ns),
+        "endTimeUnixNano": str(s.end_ns or s.start_ns),
+        "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items() if v is not None],
+        "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+    }
+    if s.parent_id:
+        out["parentSpanId"] = s.parent_id
+    return out
+
+
+def _otlp_export(trace: Trace) -> bytes:
+    # OTLP/JSON ExportTraceServiceRequest; her satır bağımsız bir istek (otel-collector file receiver okuyabilir)
+    return orjson.dumps(
+        {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": "hardware-metrics-llm"}}]},
+                    "scopeSpans": [{"scope": {"name": "app"}, "spans": [_otlp_span(s) for s in trace.spans]}],
+                }
+            ]
+        }
+    ) + b"\n"
+
+
+def _sink_worker(path: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "ab") as f:
+        while True:
+            item = _sink_queue.get()
+            if item is None:
+                return
+            f.write(item)
+            f.flush()
+
+
+def _ensure_sink() -> None:
+    global _sink_thread
+    if _sink_thread is None or not _sink_thread.is_alive():
+        path = os.path.join(settings.log_dir, "traces.jsonl")
+        _sink_thread = threading.Thread(target=_sink_worker, args=(path,), name="trace-sink", daemon=True)
+        _sink_thread.start()
+
+
+def shutdown_tracing() -> None:
+    global _sink_thread
+    if _sink_thread is not None:
+        _sink_queue.put(None)
+        _sink_thread.join(timeout=5)
+        _sink_thread = None
+
+
+def _summarize(trace: Trace, root: Span) -> dict[str, Any]:
+    return {
+        "trace_id": trace.trace_id,
+        "name": root.name,
+        "start_unix_ms": root.start_ns // 1_000_000,
+        "duration_ms": round(root.duration_ms, 2),
+        "attributes": dict(root.attributes),
+        "spans": [
+            {
+                "span_id": s.span_id,
+                "parent_id": s.parent_id,
+                "name": s.name,
+                "offset_ms": round((s.start_ns - root.start_ns) / 1e6, 2),
+                "duration_ms": round(s.duration_ms, 2),
+                "attributes": dict(s.attributes),
+                "error": s.error,
+            }
+            for s in trace.spans
+        ],
+    }
+
+
+@contextmanager
+def start_trace(name: str, traceparent: str | None = None, **attributes: Any) -> Iterator[Span | None]:
+    """Kök span. Örneklenmeyen isteklerde None döner ve alt span'ler no-op olur."""
+    if settings.trace_sample_rate <= 0 or random.random() >= settings.trace_sample_rate:
+        yield None
+        return
+
+    parent_id = None
+    m = _TRACEPARENT_RE.match((traceparent or "").strip())
+    trace = Trace(m.group(1) if m else os.urandom(16).hex())
+    if m:
+        parent_id = m.group(2)
+
+    root = Span(trace, name, parent_id, attributes)
+    trace.spans.append(root)
+    token = _current.set(root)
+    try:
+        yield root
+    except BaseException as e:
+        root.error = type(e).__name__
+        raise
+    finally:
+        root.end_ns = time.time_ns()
+        _current.reset(token)
+        _recent.append(_summarize(trace, root))
+        _ensure_sink()
+        _sink_queue.put(_otlp_export(trace))
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span | None]:
+    parent = _current.get()
+    if parent is None:
+        yield None
+        return
+
+    s = Span(parent.trace, name, parent.span_id, attributes)
+    parent.trace.spans.append(s)
+    token = _current.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.error = type(e).__name__
+        raise
+    finally:
+        s.end_ns = time.time_ns()
+        _current.reset(token)
+
+
+def current_span() -> Span | None:
+    return _current.get()
+
+
+def recent_traces(min_ms: float = 0.0, limit: int = 20) -> list[dict[str, Any]]:
+    items = [t for t in list(_recent) if t["duration_ms"] >= min_ms]
+    items.sort(key=lambda t: t["duration_ms"], reverse=True)
+    return items[:limit]
+
+
+def get_trace(trace_id: str) -> dict[str, Any] | None:
+    for t in reversed(list(_recent)):
+        if t["trace_id"] == trace_id:
+            return t
+    return None
+
+
+def render_waterfall(trace: dict[str, Any], width: int = 60) -> list[str]:
+    total = max(trace["duration_ms"], 0.001)
+    by_id = {s["span_id"]: s for s in trace["spans"]}
+
+    def depth(s: dict[str, Any]) -> int:
+        d = 0
+        while s.get("parent_id") in by_id:
+            s = by_id[s["parent_id"]]
+            d += 1
+        return d
+
+    lines: list[str] = []
+    for s in sorted(trace["spans"], key=lambda s: s["offset_ms"]):
+        start = int(s["offset_ms"] / total * width)
+        length = max(1, int(s["duration_ms"] / total * width))
+        bar = " " * start + "█" * min(length, width - start)
+        label = ("  " * depth(s) + s["name"])[:32]
+        lines.append(f"{label:<32} |{bar:<{width}}| {s['duration_ms']:>9.1f} ms")
+    return lines
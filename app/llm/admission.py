@@ -0,0 +1,162 @@
+# app/llm/admission.py
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+from app.core.config import settings
+from app.core.deadline import deadline_scope
+from app.core.logging import get_logger
+from app.core.metrics import LLM_QUEUE_WAIT_SECONDS
+from app.core.tracing import span
+
+log = get_logger()
+
+PRIORITIES = {"interactive": 0, "batch": 1}
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason: str, retry_after: int, status_code: int) -> None:
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+        self.status_code = status_code
+
+
+class AdmissionController:
+    """
+    LLM backend'ini aynı anda kullanan /llm/ask isteği sayısını sınırlar.
+    Slot istek başına bir kez alınır ve finalize dahil tüm tur boyunca tutulur; kabul edilmiş bir istek
+    ikinci LLM çağrısında reddedilip harcanan LLM/tool süresini boşa çıkarmaz.
+    Slot yoksa istek öncelik sıralı, sınırlı bir kuyrukta bekler; kuyruk doluysa hemen reddedilir.
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int, max_wait_seconds: float) -> None:
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait_seconds = max_wait_seconds
+        self.active = 0
+        # Heap'te iptal edilmiş (done) girdiler kalabilir; bekleyen sayısı ayrı sayaçta tutulur
+        self._heap: list[tuple[int, int, asyncio.Future]] = []
+        self._queued = 0
+        self._seq = itertools.count()
+        self._hold_ewma_s: float | None = None
+
+        self.admitted_total = 0
+        self.rejected_total = 0
+        self.timed_out_total = 0
+        self.queue_wait_ms_max = 0.0
+
+    @property
+    def queued(self) -> int:
+        return self._queued
+
+    def _retry_after(self) -> int:
+        hold = self._hold_ewma_s if self._hold_ewma_s is not None else float(settings.llm_timeout_seconds)
+        waves = (self.queued + 1) / max(1, self.max_concurrency)
+        return max(1, math.ceil(hold * waves))
+
+    def _grant_next(self) -> bool:
+        while self._heap:
+            _, _, fut = heapq.heappop(self._heap)
+            if not fut.done():
+                fut.set_result(None)
+                self._queued -= 1
+                return True
+        return False
+
+    async def acquire(self, priority: int) -> float:
+        start = time.perf_counter()
+        if self.max_concurrency <= 0:
+            return 0.0
+
+        if self.active < self.max_concurrency and not self.queued:
+            self.active += 1
+            self.admitted_total += 1
+            return 0.0
+
+        if self.queued >= self.max_queue:
+            self.rejected_total += 1
+            raise AdmissionRejected("llm queue full", self._retry_after(), 429)
+
+        fut: asyncio.Future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._heap, (priority, next(self._seq), fut))
+        self._queued += 1
+        try:
+            await asyncio.wait_for(asyncio.shield(fut), timeout=self.max_wait_seconds)
+        except asyncio.TimeoutError:
+            if fut.done() and not fut.cancelled():
+                # slot tam timeout anında devredildi; geri ver
+                self.release()
+            else:
+                fut.cancel()
+                self._queued -= 1
+            self.timed_out_total += 1
+            raise AdmissionRejected("llm queue wait timeout", self._retry_after(), 503)
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self.release()
+            else:
+                fut.cancel()
+                self._queued -= 1
+            raise
+
+        # release() slotu doğrudan bu isteğe devretti; active değişmedi
+        self.admitted_total += 1
+        wait_ms = (time.perf_counter() - start) * 1000
+        self.queue_wait_ms_max = max(self.queue_wait_ms_max, wait_ms)
+        return wait_ms / 1000
+
+    def release(self, held_seconds: float | None = None) -> None:
+        if held_seconds is not None:
+            a = 0.2
+            self._hold_ewma_s = held_seconds if self._hold_ewma_s is None else a * held_seconds + (1 - a) * self._hold_ewma_s
+        if self.max_concurrency <= 0:
+            return
+        if not self._grant_next():
+            self.active -= 1
+
+    @asynccontextmanager
+    async def slot(self, priority: str = "interactive") -> AsyncIterator[float]:
+        with span("llm.admission", priority=priority) as sp:
+            # Kuyruk beklemesi istek deadline'ının kalanıyla sınırlı
+            async with deadline_scope("llm"):
+                wait_s = await self.acquire(PRIORITIES.get(priority, PRIORITIES["batch"]))
+            if sp is not None:
+                sp.set(queue_wait_ms=round(wait_s * 1000, 1))
+        LLM_QUEUE_WAIT_SECONDS.labels(priority=priority).observe(wait_s)
+        if wait_s > 0:
+            log.info("llm.admission.queued", priority=priority, queue_wait_ms=int(wait_s * 1000), active=self.active)
+        start = time.perf_counter()
+        try:
+            yield wait_s
+        finally:
+            self.release(time.perf_counter() - start)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "active": self.active,
+            "queued": self.queued,
+            "admitted_total": self.admitted_total,
+            "rejected_total": self.rejected_total,
+            "timed_out_total": self.timed_out_total,
+            "queue_wait_ms_max": int(self.queue_wait_ms_max),
+        }
+
+
+_controller: AdmissionController | None = None
+
+
+def get_admission_controller() -> AdmissionController:
+    global _controller
+    if _controller is None:
+        _controller = AdmissionController(
+            settings.llm_max_concurrency,
+            settings.llm_admission_queue_size,
+            settings.llm_admission_max_wait_seconds,
+        )
+    return _controller
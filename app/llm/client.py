@@ -1,21 +1,103 @@
 # app/llm/client.py
-import httpx
-from typing import Any
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
 
 from app.core.config import settings
+from app.core.deadline import DeadlineExceeded, deadline_scope
+from app.core.metrics import LLM_CHAT_SECONDS, LLM_TOKENS
+from app.core.tracing import span
+from app.llm.admission import get_admission_controller
+from app.llm.prompt import estimate_tokens
+from app.llm.routing import EndpointPool
+
+_pool: EndpointPool | None = None
+
+
+def _auth_headers() -> dict[str, str]:
+    headers: dict[str, str] = {}
+    if settings.llm_api_key:
+        headers["Authorization"] = f"Bearer {settings.llm_api_key}"
+    return headers
+
+
+def get_endpoint_pool() -> EndpointPool:
+    # Tüm istekler aynı havuzu paylaşır: outstanding sayaçları, EWMA ve circuit state süreç genelinde tutulur
+    global _pool
+    if _pool is None:
+        urls = [u.strip() for u in (settings.llm_base_urls or "").split(",") if u.strip()]
+        _pool = EndpointPool(urls or [settings.llm_base_url])
+    return _pool
+
+
+async def start_llm_pool() -> None:
+    get_endpoint_pool().start_health_probe(_auth_headers())
+
+
+async def close_llm_pool() -> None:
+    global _pool
+    if _pool is not None:
+        await _pool.aclose()
+        _pool = None
+
 
 class LLMClient:  # Renamed from OpenAICompatClient
-    def __init__(self) -> None:
+    def __init__(self, priority: str = "interactive") -> None:
         # Orchestrator uses client.model, so we must set it here
         self.model = settings.llm_model
+        self.priority = priority
+        self.pool = get_endpoint_pool()
+        self.admission = get_admission_controller()
+        # İstek boyunca toplanan token kullanımı (backend usage döndürmezse tahmin)
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.estimated_prompt_tokens = 0
+
+    @asynccontextmanager
+    async def admitted(self) -> AsyncIterator[float]:
+        # İstek başına tek admission slotu; içerideki tüm chat çağrıları (tool turları + finalize) bu slotla yapılır.
+        # Slot yoksa öncelikli kuyrukta bekler; kuyruk doluysa AdmissionRejected fırlar
+        async with self.admission.slot(self.priority) as queue_wait_s:
+            yield queue_wait_s
 
     async def chat(self, payload: dict[str, Any]) -> dict[str, Any]:
-        headers = {}
-        if settings.llm_api_key:
-            headers["Authorization"] = f"Bearer {settings.llm_api_key}"
-
-        async with httpx.AsyncClient(timeout=settings.llm_timeout_seconds) as client:
-            # Note: We use settings.llm_base_url directly here
-            r = await client.post(f"{settings.llm_base_url}/chat/completions", json=payload, headers=headers)
-            r.raise_for_status()
-            return r.json()
\ No newline at end of file
+        estimated = estimate_tokens(payload.get("messages")) + estimate_tokens(payload.get("tools") or [])
+
+        start = time.perf_counter()
+        outcome = "error"
+        with span("llm.chat", model=self.model, priority=self.priority, estimated_prompt_tokens=estimated):
+            try:
+                # HTTP isteği istek deadline'ının kalanıyla sınırlı; iptalde bağlantı kapanır
+                async with deadline_scope("llm"):
+                    # Endpoint seçimi, circuit breaker ve bağlantı hatasında başka endpoint'e retry havuzda yapılır
+                    data = await self.pool.post_json("/chat/completions", payload, _auth_headers())
+                outcome = "ok"
+            except asyncio.CancelledError:
+                outcome = "cancelled"
+                raise
+            except DeadlineExceeded:
+                outcome = "deadline"
+                raise
+            finally:
+                LLM_CHAT_SECONDS.labels(outcome=outcome).observe(time.perf_counter() - start)
+
+        usage = data.get("usage") or {}
+        prompt_tokens = int(usage.get("prompt_tokens") or estimated)
+        completion_tokens = int(usage.get("completion_tokens") or 0)
+        self.calls += 1
+        self.estimated_prompt_tokens += estimated
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        LLM_TOKENS.labels(kind="prompt").inc(prompt_tokens)
+        LLM_TOKENS.labels(kind="completion").inc(completion_tokens)
+        return data
+
+    def usage_summary(self) -> dict[str, int]:
+        return {
+            "llm_calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "estimated_prompt_tokens": self.estimated_prompt_tokens,
+        }
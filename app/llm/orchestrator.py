@@ -2,13 +2,20 @@ from __future__ import annotations
 
 import json
 import re
+import time
 from typing import Any
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
+from app.core.deadline import DeadlineExceeded
 from app.core.logging import get_logger
+from app.core.metrics import LLM_FINALIZE_FALLBACK, LLM_ITERATIONS, LLM_SESSION_TOOL_CACHE
+from app.core.timing import stage
+from app.core.tracing import span
 from app.llm.client import LLMClient
+from app.llm.prompt import compact_history, select_tools
+from app.llm.sessions import Conversation, store as session_store
 from app.llm.tools.executor import execute_tool
 from app.llm.tools.registry import ToolRegistry
 
@@ -23,6 +30,18 @@ Sen bir tool-orchestrator'sun.
 - Tool çağırman gerekiyorsa JSON'u metin olarak yazma; tool_calls ile çağır.
 """.strip()
 
+SYSTEM_PROMPT_STRUCTURED = """
+Sen bir tool-orchestrator'sun.
+- SQL üretme. Sadece şemadaki tool'lardan birini seç.
+- Cevabın her zaman tek bir JSON nesnesidir: {"name": "<tool adı>", "parameters": {...}}.
+- Tool gerekmiyorsa veya tool sonucu geldiyse {"name": "final_answer", "parameters": {"text": "<cevap>"}} döndür.
+- minutes parametresi integer olmalı.
+- Kullanıcı "son 1 saat / geçen 30 dk / bugün / şu an" gibi zaman ifadeleri kullanırsa minutes parametresini buna göre doldur.
+- Tool sonucu geldiyse "imkansız" deme; sonuç null ise "bu aralıkta veri yok" diye cevap ver.
+""".strip()
+
+FINAL_ANSWER_TOOL = "final_answer"
+
 _TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
 
 _TR_NUM = {
@@ -55,9 +74,13 @@ _TR_NUM = {
 _TIME_WINDOW_RE = re.compile(
     r"\b(?:son|gecen|geçen|last)\s+"
     r"(?P<num>\d+|[a-zçğıöşü\s]+)\s*"
-    r"(?P<unit>dk|dakika|saat|gun|gün)\b",
+    r"(?P<unit>dk|dakika|saat|gun|gün|hafta|ay)\b",
     re.IGNORECASE,
 )
+_UNIT_MINUTES = {"dk": 1, "dakika": 1, "saat": 60, "gun": 1440, "gün": 1440, "hafta": 10080, "ay": 43200}
+# Çıkarım üst sınırı; her tool'un kendi `maximum`'u sanitize_args'ta ayrıca uygulanır
+# (get_max_* pencereleri chunk/Parquet geçmişine kadar uzanır)
+_MAX_INFERRED_MINUTES = 525600
 
 _NOW_WORDS_RE = re.compile(r"\b(şu an|su an|şimdi|simdi|anlık|anlik)\b", re.IGNORECASE)
 _TODAY_RE = re.compile(r"\b(bugün|bugun)\b", re.IGNORECASE)
@@ -101,16 +124,9 @@ def infer_minutes_from_text(user_text: str) -> int | None:
         if n is None:
             return None
 
-        if unit in {"dk", "dakika"}:
-            minutes = n
-        elif unit == "saat":
-            minutes = n * 60
-        elif unit in {"gun", "gün"}:
-            minutes = n * 1440
-        else:
+        if unit not in _UNIT_MINUTES:
             return None
-
-        return max(1, min(1440, minutes))
+        return max(1, min(_MAX_INFERRED_MINUTES, n * _UNIT_MINUTES[unit]))
 
     # bugün/şimdi basit varsayımlar
     if _TODAY_RE.search(tl):
@@ -141,6 +157,14 @@ def _try_parse_inline_tool_json(content: str) -> tuple[str, dict[str, Any]] | No
     return None
 
 
+def _unwrap_final_answer(content: str) -> str:
+    # structured modda {"name": "final_answer", "parameters": {"text": ...}} -> düz metin
+    parsed = _try_parse_inline_tool_json(content)
+    if parsed and parsed[0] == FINAL_ANSWER_TOOL:
+        return str(parsed[1].get("text") or "")
+    return content
+
+
 def _tool_accepts_minutes(registry: ToolRegistry, tool_name: str) -> bool:
     try:
         spec = registry.get(tool_name)
@@ -176,6 +200,26 @@ def _fmt_dt(v: Any) -> str | None:
     return str(v)
 
 
+_METRIC_LABELS: dict[str, tuple[str, str]] = {
+    "cpu.usage_percent": ("CPU kullanımı", "%"),
+    "cpu.temperature_c": ("CPU sıcaklığı", "°C"),
+    "cpu.freq_mhz": ("CPU frekansı", " MHz"),
+    "ram.used_mb": ("kullanılan RAM", " MB"),
+    "ram.available_mb": ("boş RAM", " MB"),
+    "ram.usage_percent": ("RAM kullanımı", "%"),
+    "gpu.utilization_percent": ("GPU kullanımı", "%"),
+    "gpu.temperature_c": ("GPU sıcaklığı", "°C"),
+    "gpu.memory_used_mb": ("GPU bellek kullanımı", " MB"),
+}
+
+
+def _fmt_metric_value(metric: str, v: Any) -> str:
+    _, unit = _METRIC_LABELS.get(metric, (metric, ""))
+    if unit == "%":
+        return f"%{float(v):.1f}"
+    return f"{float(v):.1f}{unit}"
+
+
 def _format_tool_answer(tool_name: str, tool_args: dict[str, Any], result: dict[str, Any]) -> str | None:
     minutes = tool_args.get("minutes")
 
@@ -203,6 +247,112 @@ def _format_tool_answer(tool_name: str, tool_args: dict[str, Any], result: dict[
             return f"Son {minutes} dakika içinde GPU kullanım verisi yok."
         return f"Son {minutes} dakika içinde maksimum GPU kullanımı: %{float(v):.1f}"
 
+    if tool_name == "get_metric_percentile":
+        metric = str(result.get("metric") or tool_args.get("metric"))
+        label, _ = _METRIC_LABELS.get(metric, (metric, ""))
+        p = float(result.get("percentile") or tool_args.get("percentile") or 0)
+        v = result.get("value")
+        if v is None:
+            return f"Son {minutes} dakika içinde {label} verisi yok."
+        return f"Son {minutes} dakika içinde {label} p{p:g}: {_fmt_metric_value(metric, v)} ({result.get('count')} örnek)"
+
+    if tool_name == "get_alerts":
+        events = result.get("events") or []
+        active = result.get("active") or []
+        fired = int(result.get("fired_count") or 0)
+        lines = [
+            f"Son {minutes} dakika içinde {fired} alarm tetiklendi." if fired else f"Son {minutes} dakika içinde tetiklenen alarm yok."
+        ]
+        for e in events:
+            state = "tetiklendi" if e.get("state") == "firing" else "düzeldi"
+            value = f" (değer {e.get('value')})" if e.get("value") is not None else ""
+            lines.append(f"- {_fmt_dt(e.get('ts'))} [{e.get('severity')}] {e.get('message')}: {state}{value}")
+        if active:
+            lines.append("Şu an aktif: " + ", ".join(f"{a.get('rule')} ({_fmt_dt(a.get('since'))} itibarıyla)" for a in active))
+        return "\n".join(lines)
+
+    if tool_name == "get_cpu_core_usage":
+        cores = result.get("cores") or []
+        if not cores:
+            return f"Son {minutes} dakika içinde çekirdek bazında CPU verisi yok."
+        threshold = float(tool_args.get("threshold") or 90)
+        avg = result.get("avg_usage_percent")
+        head = f"Son {minutes} dakika içinde en yüklü çekirdekler ({result.get('core_count')} çekirdek"
+        head += f", ortalama %{float(avg):.1f}):" if avg is not None else "):"
+        lines = [head]
+        for c in cores:
+            line = (
+                f"- çekirdek {c.get('core')}: max %{float(c.get('max_usage_percent')):.1f}, "
+                f"ort %{float(c.get('avg_usage_percent')):.1f}, "
+                f"%{threshold:g} ve üstü örnek oranı %{float(c.get('busy_ratio') or 0) * 100:.0f}"
+            )
+            if c.get("max_freq_mhz") is not None:
+                line += f", max {float(c.get('max_freq_mhz')):.0f} MHz"
+            lines.append(line)
+        return "\n".join(lines)
+
+    if tool_name == "get_gpu_device_usage":
+        devices = result.get("devices") or []
+        if not devices:
+            return f"Son {minutes} dakika içinde cihaz bazında GPU verisi yok."
+        lines = [f"Son {minutes} dakika içinde GPU'lar ({len(devices)} cihaz):"]
+        for d in devices:
+            lines.append(
+                f"- GPU {d.get('device')}: kullanım max %{float(d.get('max_utilization_percent')):.1f} "
+                f"(ort %{float(d.get('avg_utilization_percent')):.1f}), "
+                f"sıcaklık max {float(d.get('max_temperature_c')):.1f}°C, bellek max {d.get('max_memory_used_mb')} MB"
+            )
+        if len(devices) > 1:
+            hot = max(devices, key=lambda d: float(d.get("max_temperature_c") or 0))
+            busy = max(devices, key=lambda d: float(d.get("avg_utilization_percent") or 0))
+            lines.append(f"En sıcak: GPU {hot.get('device')}; ortalamada en yüklü: GPU {busy.get('device')}")
+        return "\n".join(lines)
+
+    if tool_name == "get_disk_io":
+        devices = result.get("devices") or []
+        if not devices:
+            return f"Son {minutes} dakika içinde disk I/O verisi yok."
+        lines = [f"Son {minutes} dakika içinde disk I/O ({len(devices)} disk):"]
+        for d in devices:
+            line = (
+                f"- {d.get('device')}: okuma ort {float(d.get('avg_read_mb_s') or 0):.2f} / max {float(d.get('max_read_mb_s') or 0):.2f} MB/s, "
+                f"yazma ort {float(d.get('avg_write_mb_s') or 0):.2f} / max {float(d.get('max_write_mb_s') or 0):.2f} MB/s, "
+                f"max IOPS {float(d.get('max_read_iops') or 0):.0f} okuma / {float(d.get('max_write_iops') or 0):.0f} yazma"
+            )
+            if d.get("max_busy_percent") is not None:
+                line += f", meşguliyet ort %{float(d.get('avg_busy_percent') or 0):.1f} / max %{float(d.get('max_busy_percent')):.1f}"
+            lines.append(line)
+        return "\n".join(lines)
+
+    if tool_name == "get_network_io":
+        nics = result.get("nics") or []
+        if not nics:
+            return f"Son {minutes} dakika içinde ağ trafiği verisi yok."
+        lines = [f"Son {minutes} dakika içinde ağ trafiği ({len(nics)} arayüz):"]
+        for n in nics:
+            line = (
+                f"- {n.get('nic')}: gelen ort {float(n.get('avg_rx_mbit_s') or 0):.2f} / max {float(n.get('max_rx_mbit_s') or 0):.2f} Mbit/s, "
+                f"giden ort {float(n.get('avg_tx_mbit_s') or 0):.2f} / max {float(n.get('max_tx_mbit_s') or 0):.2f} Mbit/s"
+            )
+            errors = float(n.get("max_errors_per_s") or 0)
+            drops = float(n.get("max_drops_per_s") or 0)
+            if errors or drops:
+                line += f", max hata {errors:g}/s, max drop {drops:g}/s"
+            lines.append(line)
+        return "\n".join(lines)
+
+    if tool_name == "get_top_processes":
+        procs = result.get("processes") or []
+        if not procs:
+            return f"Son {minutes} dakika içinde süreç verisi yok."
+        what = "belleği (RSS)" if tool_args.get("by") == "memory" else "CPU'yu"
+        lines = [f"Son {minutes} dakika içinde {what} en çok kullanan süreçler:"]
+        for p in procs:
+            cpu = p.get("max_cpu_percent")
+            cpu_txt = f"CPU max %{float(cpu):.1f}, ort %{float(p.get('avg_cpu_percent') or 0):.1f}" if cpu is not None else "CPU -"
+            lines.append(f"- {p.get('name')} (pid {p.get('pid')}): {cpu_txt}, RSS max {p.get('max_rss_mb')} MB")
+        return "\n".join(lines)
+
     if tool_name == "get_latest_snapshot":
         snap = result.get("snapshot")
         if not isinstance(snap, dict):
@@ -261,6 +411,75 @@ def _tool_result_as_text(tool_name: str, tool_args: dict[str, Any], result: dict
         return kv(tool=tool_name, minutes=minutes, max_ram_usage_percent=result.get("max_ram_usage_percent"))
     if tool_name == "get_max_gpu_utilization":
         return kv(tool=tool_name, minutes=minutes, max_gpu_utilization_percent=result.get("max_gpu_utilization_percent"))
+    if tool_name == "get_metric_percentile":
+        return kv(
+            tool=tool_name,
+            minutes=minutes,
+            metric=result.get("metric"),
+            percentile=result.get("percentile"),
+            value=result.get("value"),
+            count=result.get("count"),
+        )
+
+    if tool_name == "get_alerts":
+        return kv(
+            tool=tool_name,
+            minutes=minutes,
+            fired_count=result.get("fired_count"),
+            events=",".join(f"{e.get('rule')}:{e.get('state')}" for e in result.get("events") or []),
+            active=",".join(str(a.get("rule")) for a in result.get("active") or []),
+        )
+    if tool_name == "get_cpu_core_usage":
+        return kv(
+            tool=tool_name,
+            minutes=minutes,
+            core_count=result.get("core_count"),
+            avg_usage_percent=result.get("avg_usage_percent"),
+            cores=",".join(
+                f"{c.get('core')}:max={c.get('max_usage_percent')}:avg={c.get('avg_usage_percent')}:busy={c.get('busy_ratio')}"
+                for c in result.get("cores") or []
+            ),
+        )
+    if tool_name == "get_gpu_device_usage":
+        return kv(
+            tool=tool_name,
+            minutes=minutes,
+            devices=",".join(
+                f"{d.get('device')}:util_max={d.get('max_utilization_percent')}:temp_max={d.get('max_temperature_c')}"
+                f":mem_max={d.get('max_memory_used_mb')}"
+                for d in result.get("devices") or []
+            ),
+        )
+    if tool_name == "get_disk_io":
+        return kv(
+            tool=tool_name,
+            minutes=minutes,
+            devices=",".join(
+                f"{d.get('device')}:read_max_mb_s={d.get('max_read_mb_s')}:write_max_mb_s={d.get('max_write_mb_s')}"
+                f":busy_max={d.get('max_busy_percent')}"
+                for d in result.get("devices") or []
+            ),
+        )
+    if tool_name == "get_network_io":
+        return kv(
+            tool=tool_name,
+            minutes=minutes,
+            nics=",".join(
+                f"{n.get('nic')}:rx_max_mbit_s={n.get('max_rx_mbit_s')}:tx_max_mbit_s={n.get('max_tx_mbit_s')}"
+                f":errors_max={n.get('max_errors_per_s')}"
+                for n in result.get("nics") or []
+            ),
+        )
+    if tool_name == "get_top_processes":
+        procs = result.get("processes") or []
+        return kv(
+            tool=tool_name,
+            minutes=minutes,
+            by=tool_args.get("by"),
+            processes=",".join(
+                f"{p.get('name')}:{p.get('pid')}:cpu={p.get('max_cpu_percent')}:rss_mb={p.get('max_rss_mb')}" for p in procs
+            ),
+        )
 
     if tool_name == "get_latest_snapshot":
         snap = result.get("snapshot")
@@ -292,6 +511,27 @@ def _required_markers(tool_name: str, tool_args: dict[str, Any], result: dict[st
     if tool_name == "get_max_gpu_utilization":
         v = result.get("max_gpu_utilization_percent")
         return [f"{float(v):.1f}"] if v is not None else []
+    if tool_name == "get_metric_percentile":
+        v = result.get("value")
+        return [f"{float(v):.1f}"] if v is not None else []
+    if tool_name == "get_top_processes":
+        procs = result.get("processes") or []
+        return [str(procs[0].get("name"))] if procs else []
+    if tool_name == "get_alerts":
+        fired = int(result.get("fired_count") or 0)
+        return [str(fired)] if fired else []
+    if tool_name == "get_cpu_core_usage":
+        cores = result.get("cores") or []
+        return [f"{float(cores[0].get('max_usage_percent')):.1f}"] if cores else []
+    if tool_name == "get_gpu_device_usage":
+        devices = result.get("devices") or []
+        return [f"{float(d.get('max_utilization_percent')):.1f}" for d in devices[:1]]
+    if tool_name == "get_disk_io":
+        devices = result.get("devices") or []
+        return [f"{float(d.get('max_write_mb_s') or 0):.2f}" for d in devices[:1]]
+    if tool_name == "get_network_io":
+        nics = result.get("nics") or []
+        return [f"{float(n.get('max_rx_mbit_s') or 0):.2f}" for n in nics[:1]]
     if tool_name == "get_latest_snapshot":
         snap = result.get("snapshot")
         if isinstance(snap, dict):
@@ -310,6 +550,14 @@ def _contains_all_markers(text: str, markers: list[str]) -> bool:
 
 
 async def _finalize_with_llm(client: LLMClient, messages: list[dict[str, Any]], formatted: str, markers: list[str]) -> str:
+    with span("llm.finalize", markers=len(markers)) as sp:
+        answer = await _finalize_answer(client, messages, formatted, markers)
+        if sp is not None:
+            sp.set(fallback=answer is formatted)
+        return answer
+
+
+async def _finalize_answer(client: LLMClient, messages: list[dict[str, Any]], formatted: str, markers: list[str]) -> str:
     instruct = (
         "Aşağıdaki bilgi KESİN ve tool çıktısından gelmiştir. "
         "Bu bilgiyi AYNEN kullan. Sayıları/değerleri değiştirme, uydurma ekleme. "
@@ -317,134 +565,270 @@ async def _finalize_with_llm(client: LLMClient, messages: list[dict[str, Any]],
         f"BİLGİ: {formatted}\n"
     )
 
+    if settings.llm_prompt_compaction:
+        # BİLGİ zaten tool sonucunu taşıyor; tool alışverişini tekrar göndermeye gerek yok.
+        # Oturum geçmişindeki düz assistant cevapları kalır (önek ana döngüyle aynı kalsın)
+        base = [
+            m for m in messages
+            if m.get("role") in {"system", "user"}
+            or (m.get("role") == "assistant" and m.get("content") and not m.get("tool_calls"))
+        ]
+    else:
+        base = messages
+
     payload = {
         "model": client.model,
-        "messages": messages + [{"role": "system", "content": instruct}],
+        "messages": base + [{"role": "system", "content": instruct}],
         "tools": [],
         "tool_choice": "none",
     }
 
     try:
-        data = await client.chat(payload)
+        with stage("finalize"):
+            data = await client.chat(payload)
         choice = (data.get("choices") or [{}])[0]
         msg = choice.get("message") or {}
         content = (msg.get("content") or "").strip()
+    except DeadlineExceeded:
+        # Tool sonucu elde; deadline finalize sırasında dolduysa biçimlenmiş cevapla dön
+        LLM_FINALIZE_FALLBACK.labels(reason="deadline").inc()
+        return formatted
     except Exception:
         log.exception("llm.finalize.error")
+        LLM_FINALIZE_FALLBACK.labels(reason="error").inc()
         return formatted
 
     if not content:
+        LLM_FINALIZE_FALLBACK.labels(reason="empty").inc()
         return formatted
 
     if not _contains_all_markers(content, markers):
         log.info("llm.finalize.fallback", model_answer=content, fallback=formatted, markers=markers)
+        LLM_FINALIZE_FALLBACK.labels(reason="markers").inc()
         return formatted
 
     return content
 
 
-async def ask_with_tools(session: AsyncSession, user_text: str) -> dict[str, Any]:
+def _session_tools(registry: ToolRegistry, tools: list[dict[str, Any]], conv: Conversation) -> list[dict[str, Any]]:
+    """
+    Oturumda daha önce gönderilen tool'lar listede kalır; tools alanı turdan tura aynı byte dizisi olur (prompt cache).
+    Soru hiçbir tool'a eşleşmezse (tüm katalog döner) önceki turların alt kümesi kullanılır.
+    """
+    all_tools = registry.openai_tools()
+    top_k = settings.llm_tool_top_k
+    if top_k <= 0 or top_k >= len(all_tools):
+        return tools
+
+    picked = {t["function"]["name"] for t in tools}
+    if len(tools) == len(all_tools) and conv.tool_names:
+        picked = set(conv.tool_names)
+    elif len(picked | conv.tool_names) <= 2 * top_k:
+        picked |= conv.tool_names
+    # Sınır aşıldıysa küme bu sorunun seçimine sıfırlanır (önek bir kez değişir)
+    conv.tool_names = picked
+    return [t for t in all_tools if t["function"]["name"] in picked]
+
+
+async def _execute(
+    registry: ToolRegistry,
+    session: AsyncSession,
+    conv: Conversation | None,
+    tool_name: str,
+    tool_args: dict[str, Any],
+) -> dict[str, Any]:
+    if conv is None:
+        return await execute_tool(registry, session, tool_name, tool_args)
+
+    # Aynı oturumda aynı pencere (tool + argümanlar) kısa süre içinde tekrar sorulursa DB'ye gidilmez
+    key = conv.cache_key(tool_name, tool_args)
+    now = time.monotonic()
+    result = conv.cached_result(key, now)
+    if result is not None:
+        LLM_SESSION_TOOL_CACHE.labels(outcome="hit").inc()
+        log.info("llm.session.tool_cache_hit", session_id=conv.id, tool_name=tool_name, tool_args=tool_args)
+    else:
+        LLM_SESSION_TOOL_CACHE.labels(outcome="miss").inc()
+        result = await execute_tool(registry, session, tool_name, tool_args)
+        conv.cache_result(key, result, now)
+
+    if isinstance(tool_args.get("minutes"), int):
+        conv.last_minutes = tool_args["minutes"]
+    return result
+
+
+async def ask_with_tools(
+    session: AsyncSession,
+    user_text: str,
+    priority: str = "interactive",
+    conv: Conversation | None = None,
+) -> dict[str, Any]:
     registry = ToolRegistry()
-    client = LLMClient()
-    tools = registry.openai_tools()
+    client = LLMClient(priority=priority)
+    stats = {"iterations": 0}
+    mode = settings.llm_tool_call_mode
+    try:
+        if conv is None:
+            async with client.admitted():
+                return await _run_tool_loop(session, registry, client, user_text, stats)
+        # Önce oturum kilidi: aynı oturumun sıradaki isteği slot tutarak beklemesin
+        async with conv.lock:
+            async with client.admitted():
+                result = await _run_tool_loop(session, registry, client, user_text, stats, conv)
+            # İptal/deadline durumunda tur kaydedilmez; oturum bir önceki cevaptaki haliyle kalır
+            conv.add_turn(user_text, str(result.get("answer") or ""))
+            session_store.update(conv)
+        log.info("llm.session", session_id=conv.id, turns=len(conv.turns), bytes=conv.size, sessions=len(session_store))
+        return {**result, "session_id": conv.id}
+    finally:
+        LLM_ITERATIONS.labels(mode=mode).observe(stats["iterations"])
+        log.info("llm.iterations", mode=mode, iterations=stats["iterations"])
+        log.info("llm.tokens", **client.usage_summary())
+
+
+async def _run_tool_loop(
+    session: AsyncSession,
+    registry: ToolRegistry,
+    client: LLMClient,
+    user_text: str,
+    stats: dict[str, int],
+    conv: Conversation | None = None,
+) -> dict[str, Any]:
+    tools = select_tools(registry, user_text, settings.llm_tool_top_k)
+    if conv is not None:
+        tools = _session_tools(registry, tools, conv)
+    structured = settings.llm_tool_call_mode == "json_schema"
+    response_format = (
+        registry.tool_choice_response_format([t["function"]["name"] for t in tools], FINAL_ANSWER_TOOL)
+        if structured
+        else None
+    )
 
     inferred_minutes = infer_minutes_from_text(user_text)
-    log.info("llm.user_text", user_text=user_text, inferred_minutes=inferred_minutes)
-
-    messages: list[dict[str, Any]] = [{"role": "system", "content": SYSTEM_PROMPT}]
+    carried = inferred_minutes is None and conv is not None and conv.last_minutes is not None
+    if carried:
+        # "peki GPU?" gibi devam sorusu: önceki turun zaman aralığı geçerli
+        inferred_minutes = conv.last_minutes
+    log.info("llm.user_text", user_text=user_text, inferred_minutes=inferred_minutes, carried=carried)
+
+    # Sıra sabit: sistem prompt'u, oturum geçmişi, bu tura özel ipucu, soru
+    messages: list[dict[str, Any]] = [
+        {"role": "system", "content": SYSTEM_PROMPT_STRUCTURED if structured else SYSTEM_PROMPT}
+    ]
+    if conv is not None:
+        messages.extend(conv.history())
     if inferred_minutes is not None:
-        messages.append(
-            {"role": "system", "content": f"Kullanıcı zaman aralığı ifadesinden çıkarım: {inferred_minutes} dakika."}
-        )
+        hint = "Önceki sorudaki zaman aralığı" if carried else "Kullanıcı zaman aralığı ifadesinden çıkarım"
+        messages.append({"role": "system", "content": f"{hint}: {inferred_minutes} dakika."})
     messages.append({"role": "user", "content": user_text})
 
     tools_used = 0
 
     for i in range(settings.llm_max_tool_iterations):
-        payload = {
-            "model": client.model,
-            "messages": messages,
-            "tools": tools,
-            "tool_choice": "auto",
-        }
-
-        log.info("llm.request", iter=i, model=client.model, tools_count=len(tools), messages_count=len(messages))
-        data = await client.chat(payload)
+        with span("llm.iteration", iter=i):
+            if settings.llm_prompt_compaction:
+                request_messages = compact_history(messages, settings.llm_compact_keep_exchanges)
+            else:
+                request_messages = messages
 
-        choice = (data.get("choices") or [{}])[0]
-        msg = choice.get("message") or {}
-        tool_calls = msg.get("tool_calls") or []
-        content = msg.get("content") or ""
-
-        # inline tool json (rare)
-        if not tool_calls:
-            inline = _try_parse_inline_tool_json(content)
-            if inline:
-                tool_name, tool_args = inline
-                tool_args = tool_args or {}
-                tool_args = _apply_inferred_minutes_if_needed(registry, tool_name, tool_args, inferred_minutes)
-
-                result = await execute_tool(registry, session, tool_name, tool_args)
+            if structured:
+                # Tool şemaları response_format içinde; her cevap ilk denemede geçerli bir tool seçimine parse olur
+                payload = {"model": client.model, "messages": request_messages, "response_format": response_format}
+            else:
+                payload = {
+                    "model": client.model,
+                    "messages": request_messages,
+                    "tools": tools,
+                    "tool_choice": "auto",
+                }
+
+            log.info("llm.request", iter=i, model=client.model, tools_count=len(tools), messages_count=len(request_messages))
+            stats["iterations"] = i + 1
+            with stage("llm"):
+                data = await client.chat(payload)
+
+            with span("llm.parse"):
+                choice = (data.get("choices") or [{}])[0]
+                msg = choice.get("message") or {}
+                tool_calls = msg.get("tool_calls") or []
+                content = msg.get("content") or ""
+                if structured:
+                    content = _unwrap_final_answer(content)
+                inline = None if tool_calls else _try_parse_inline_tool_json(content)
+
+            # inline tool json (rare; structured modda her tool seçimi bu yoldan gelir)
+            if not tool_calls:
+                if inline:
+                    tool_name, tool_args = inline
+                    tool_args = tool_args or {}
+                    tool_args = _apply_inferred_minutes_if_needed(registry, tool_name, tool_args, inferred_minutes)
+
+                    with stage("tool"):
+                        result = await _execute(registry, session, conv, tool_name, tool_args)
+                    tools_used += 1
+
+                    tool_text = _tool_result_as_text(tool_name, tool_args, result)
+                    messages.append({"role": "assistant", "content": ""})
+                    messages.append({"role": "tool", "tool_call_id": f"inline-{i}", "name": tool_name, "content": tool_text})
+
+                    formatted = _format_tool_answer(tool_name, tool_args, result)
+                    if formatted:
+                        markers = _required_markers(tool_name, tool_args, result)
+                        final_text = await _finalize_with_llm(client, messages, formatted, markers)
+                        return {"answer": final_text}
+                    continue
+
+            # final
+            if not tool_calls:
+                if tools_used > 0 and (_looks_like_escape_answer(content) or _looks_like_no_data(content)):
+                    return {"answer": "Tool çalıştı ama model tutarlı cevap üretmedi. Logları kontrol edebilirsin."}
+                return {"answer": content}
+
+            # tool_calls
+            messages.append({"role": "assistant", "content": content, "tool_calls": tool_calls})
+
+            # Bir turda birden çok tool çağrılabilir ("CPU ve GPU sıcaklığı"); finalize hepsinin sonucunu görmeli.
+            # Biçimlenmeyen sonuçlar düz metin olarak BİLGİ'ye girer (compaction açıkken tool mesajları gönderilmez)
+            formatted_parts: list[str] = []
+            markers: list[str] = []
+            any_formatted = False
+
+            for tc in tool_calls:
+                fn = (tc.get("function") or {})
+                tool_name = fn.get("name")
+                raw_args = fn.get("arguments") or "{}"
+
+                log.info("llm.tool_call.raw", tool_name=tool_name, raw_args=raw_args)
+
+                try:
+                    tool_args = json.loads(raw_args) if isinstance(raw_args, str) else (raw_args or {})
+                except Exception:
+                    tool_args = {}
+
+                if isinstance(tool_args, dict):
+                    tool_args = _apply_inferred_minutes_if_needed(registry, tool_name, tool_args, inferred_minutes)
+                else:
+                    tool_args = {}
+
+                with stage("tool"):
+                    result = await _execute(registry, session, conv, tool_name, tool_args)
                 tools_used += 1
 
                 tool_text = _tool_result_as_text(tool_name, tool_args, result)
-                messages.append({"role": "assistant", "content": ""})
-                messages.append({"role": "tool", "tool_call_id": f"inline-{i}", "name": tool_name, "content": tool_text})
+                messages.append({"role": "tool", "tool_call_id": tc.get("id"), "name": tool_name, "content": tool_text})
 
                 formatted = _format_tool_answer(tool_name, tool_args, result)
                 if formatted:
-                    markers = _required_markers(tool_name, tool_args, result)
-                    final_text = await _finalize_with_llm(client, messages, formatted, markers)
-                    return {"answer": final_text}
-                continue
-
-        # final
-        if not tool_calls:
-            if tools_used > 0 and (_looks_like_escape_answer(content) or _looks_like_no_data(content)):
-                return {"answer": "Tool çalıştı ama model tutarlı cevap üretmedi. Logları kontrol edebilirsin."}
-            return {"answer": content}
-
-        # tool_calls
-        messages.append({"role": "assistant", "content": content, "tool_calls": tool_calls})
-
-        last_formatted: str | None = None
-        last_tool_name: str | None = None
-        last_tool_args: dict[str, Any] | None = None
-        last_tool_result: dict[str, Any] | None = None
-
-        for tc in tool_calls:
-            fn = (tc.get("function") or {})
-            tool_name = fn.get("name")
-            raw_args = fn.get("arguments") or "{}"
-
-            log.info("llm.tool_call.raw", tool_name=tool_name, raw_args=raw_args)
-
-            try:
-                tool_args = json.loads(raw_args) if isinstance(raw_args, str) else (raw_args or {})
-            except Exception:
-                tool_args = {}
-
-            if isinstance(tool_args, dict):
-                tool_args = _apply_inferred_minutes_if_needed(registry, tool_name, tool_args, inferred_minutes)
-            else:
-                tool_args = {}
-
-            result = await execute_tool(registry, session, tool_name, tool_args)
-            tools_used += 1
-
-            tool_text = _tool_result_as_text(tool_name, tool_args, result)
-            messages.append({"role": "tool", "tool_call_id": tc.get("id"), "name": tool_name, "content": tool_text})
-
-            last_tool_name = tool_name
-            last_tool_args = tool_args
-            last_tool_result = result
-            last_formatted = _format_tool_answer(tool_name, tool_args, result)
+                    any_formatted = True
+                    formatted_parts.append(formatted)
+                    markers.extend(_required_markers(tool_name, tool_args, result))
+                else:
+                    formatted_parts.append(tool_text)
 
-        log.info("llm.tool_results.sent", tools_used=tools_used)
+            log.info("llm.tool_results.sent", tools_used=tools_used)
 
-        if last_formatted and last_tool_name and last_tool_args is not None and last_tool_result is not None:
-            markers = _required_markers(last_tool_name, last_tool_args, last_tool_result)
-            final_text = await _finalize_with_llm(client, messages, last_formatted, markers)
-            return {"answer": final_text}
+            if any_formatted:
+                final_text = await _finalize_with_llm(client, messages, "\n".join(formatted_parts), markers)
+                return {"answer": final_text}
 
     return {"answer": "Tool çağrıları çok kez tekrarlandı; lütfen soruyu daha net sor."}
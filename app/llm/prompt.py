@@ -0,0 +1,88 @@
+# app/llm/prompt.py
+import re
+from typing import Any
+
+import orjson
+
+from app.llm.tools.registry import ToolRegistry
+
+# Kaba token tahmini: backend usage döndürmezse loglamak için yeterli (~4 karakter/token)
+_CHARS_PER_TOKEN = 4
+
+
+def normalize_text(text: str) -> str:
+    # Türkçe büyük harfler: "İ".lower() birleşik nokta üretir, "I" -> "ı" olmalı
+    return (text or "").replace("İ", "i").replace("I", "ı").lower()
+
+
+def estimate_tokens(obj: Any) -> int:
+    if isinstance(obj, str):
+        return len(obj) // _CHARS_PER_TOKEN
+    return len(orjson.dumps(obj)) // _CHARS_PER_TOKEN
+
+
+def _keyword_hits(normalized: str, lowered: str, patterns: list[tuple[re.Pattern[str], bool]]) -> int:
+    # Türkçe küçültme "IOPS"/"DISK"i "ıops"/"dısk" yapar: ASCII anahtar kelimeler düz lower() üzerinde,
+    # Türkçe karakterli olanlar normalize_text() üzerinde aranır (her anahtar kelime tek metinde)
+    return sum(1 for pattern, ascii_only in patterns if pattern.search(lowered if ascii_only else normalized))
+
+
+def select_tools(registry: ToolRegistry, user_text: str, top_k: int) -> list[dict[str, Any]]:
+    """
+    Soruyla en alakalı top-k tool şemasını döndürür. Hiçbir tool eşleşmezse tüm katalog gider.
+    Sıra her zaman isme göredir; aynı alt küme aynı byte dizisini üretir (prompt cache).
+    """
+    all_tools = registry.openai_tools()
+    if top_k <= 0 or top_k >= len(all_tools):
+        return all_tools
+
+    normalized, lowered = normalize_text(user_text), (user_text or "").lower()
+    scored = [
+        (_keyword_hits(normalized, lowered, registry.get(t["function"]["name"]).keyword_patterns), t) for t in all_tools
+    ]
+    scored = [(s, t) for s, t in scored if s > 0]
+    if not scored:
+        return all_tools
+
+    scored.sort(key=lambda st: -st[0])
+    picked = {t["function"]["name"] for _, t in scored[:top_k]}
+    return [t for t in all_tools if t["function"]["name"] in picked]
+
+
+def compact_history(messages: list[dict[str, Any]], keep_exchanges: int) -> list[dict[str, Any]]:
+    """
+    Son `keep_exchanges` tool alışverişi dışındaki (assistant tool_calls + tool cevapları)
+    mesajları tek bir kısa assistant özetine indirir. Sistem/kullanıcı mesajları olduğu gibi kalır.
+    """
+    starts = [
+        i for i, m in enumerate(messages)
+        if m.get("role") == "assistant" and (m.get("tool_calls") or _is_inline_marker(messages, i))
+    ]
+    if len(starts) <= keep_exchanges:
+        return messages
+
+    cut = starts[len(starts) - keep_exchanges] if keep_exchanges > 0 else len(messages)
+    first = starts[0]
+
+    summary: list[str] = []
+    head: list[dict[str, Any]] = []
+    for m in messages[first:cut]:
+        role = m.get("role")
+        if role == "tool":
+            summary.append(str(m.get("content") or ""))
+        elif role in {"system", "user"}:
+            head.append(m)
+
+    compacted = messages[:first] + head
+    if summary:
+        compacted.append({"role": "assistant", "content": "Önceki tool sonuçları: " + " | ".join(summary)})
+    return compacted + messages[cut:]
+
+
+def _is_inline_marker(messages: list[dict[str, Any]], i: int) -> bool:
+    # inline tool JSON yolu: boş assistant + ardından gelen tool mesajı
+    return (
+        not messages[i].get("content")
+        and i + 1 < len(messages)
+        and messages[i + 1].get("role") == "tool"
+    )
@@ -0,0 +1,194 @@
+# app/llm/routing.py
+import asyncio
+import time
+from typing import Any
+
+import httpx
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+log = get_logger()
+
+# Bağlantı kurulamadan düşen hatalar: istek backend'e hiç ulaşmadı, başka endpoint'te tekrar denemek güvenli.
+RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class NoHealthyEndpointError(RuntimeError):
+    pass
+
+
+class CircuitBreaker:
+    """closed -> (N ardışık hata) -> open -> (reset süresi) -> half_open -> tek deneme."""
+
+    def __init__(self, failure_threshold: int, reset_seconds: float) -> None:
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.half_open_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "open":
+            if time.monotonic() - self.opened_at < self.reset_seconds:
+                return False
+            self.state = "half_open"
+            self.half_open_in_flight = False
+        # half_open: aynı anda sadece bir deneme isteği
+        return not self.half_open_in_flight
+
+    def on_start(self) -> None:
+        if self.state == "half_open":
+            self.half_open_in_flight = True
+
+    def on_success(self) -> None:
+        self.state = "closed"
+        self.failures = 0
+        self.half_open_in_flight = False
+
+    def on_failure(self) -> None:
+        self.failures += 1
+        self.half_open_in_flight = False
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+
+class Endpoint:
+    def __init__(self, base_url: str) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.outstanding = 0
+        self.ewma_ms: float | None = None
+        self.breaker = CircuitBreaker(
+            settings.llm_circuit_failure_threshold,
+            settings.llm_circuit_reset_seconds,
+        )
+
+    def observe_latency(self, ms: float) -> None:
+        alpha = settings.llm_ewma_alpha
+        self.ewma_ms = ms if self.ewma_ms is None else alpha * ms + (1 - alpha) * self.ewma_ms
+
+    def score(self, strategy: str) -> float:
+        if strategy == "ewma":
+            # Hiç ölçülmemiş endpoint'e önce şans ver; bekleyen istekler tahmini gecikmeyi büyütür.
+            base = self.ewma_ms if self.ewma_ms is not None else 0.0
+            return base * (self.outstanding + 1)
+        return float(self.outstanding)
+
+
+class EndpointPool:
+    def __init__(self, base_urls: list[str]) -> None:
+        if not base_urls:
+            raise ValueError("At least one LLM base url is required")
+        self.endpoints = [Endpoint(u) for u in base_urls]
+        self.strategy = settings.llm_routing_strategy
+        self._client: httpx.AsyncClient | None = None
+        self._probe_task: asyncio.Task | None = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Bağlantılar istekler arasında yeniden kullanılır (keep-alive)
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=settings.llm_timeout_seconds)
+        return self._client
+
+    def pick(self, exclude: set[str] | None = None) -> Endpoint:
+        exclude = exclude or set()
+        candidates = [e for e in self.endpoints if e.base_url not in exclude and e.breaker.allow()]
+        if not candidates:
+            raise NoHealthyEndpointError("No healthy LLM endpoint available")
+        return min(candidates, key=lambda e: e.score(self.strategy))
+
+    async def post_json(self, path: str, payload: dict[str, Any], headers: dict[str, str]) -> dict[str, Any]:
+        tried: set[str] = set()
+        attempts = 1 + max(0, settings.llm_max_connect_retries)
+
+        for attempt in range(attempts):
+            ep = self.pick(exclude=tried)
+            tried.add(ep.base_url)
+
+            ep.breaker.on_start()
+            ep.outstanding += 1
+            start = time.perf_counter()
+            try:
+                r = await self.client.post(f"{ep.base_url}{path}", json=payload, headers=headers)
+            except RETRYABLE_ERRORS as e:
+                ep.breaker.on_failure()
+                log.warning("llm.endpoint.connect_error", endpoint=ep.base_url, attempt=attempt, error=str(e))
+                if attempt + 1 >= attempts or len(tried) >= len(self.endpoints):
+                    raise
+                continue
+            except httpx.HTTPError:
+                # Asılı kalan backend (read timeout vb.): başka endpoint'e tekrar gönderme, istek işlenmiş olabilir
+                ep.breaker.on_failure()
+                raise
+            except asyncio.CancelledError:
+                ep.breaker.half_open_in_flight = False
+                raise
+            finally:
+                ep.outstanding -= 1
+
+            if r.status_code >= 500:
+                ep.breaker.on_failure()
+            else:
+                ep.breaker.on_success()
+                ep.observe_latency((time.perf_counter() - start) * 1000)
+            r.raise_for_status()
+            return r.json()
+
+        raise NoHealthyEndpointError("No healthy LLM endpoint available")
+
+    async def probe_once(self, headers: dict[str, str]) -> None:
+        for ep in self.endpoints:
+            try:
+                r = await self.client.get(
+                    f"{ep.base_url}/models",
+                    headers=headers,
+                    timeout=settings.llm_health_probe_timeout_seconds,
+                )
+                r.raise_for_status()
+                if ep.breaker.state != "closed":
+                    log.info("llm.endpoint.recovered", endpoint=ep.base_url)
+                ep.breaker.on_success()
+            except Exception as e:
+                if ep.breaker.state == "closed":
+                    log.warning("llm.endpoint.probe_failed", endpoint=ep.base_url, error=str(e))
+                ep.breaker.on_failure()
+
+    async def _probe_loop(self, headers: dict[str, str]) -> None:
+        while True:
+            await asyncio.sleep(settings.llm_health_probe_interval_seconds)
+            try:
+                await self.probe_once(headers)
+            except Exception:
+                log.exception("llm.endpoint.probe_loop_error")
+
+    def start_health_probe(self, headers: dict[str, str]) -> None:
+        if self._probe_task is None and settings.llm_health_probe_interval_seconds > 0:
+            self._probe_task = asyncio.create_task(self._probe_loop(headers))
+
+    async def aclose(self) -> None:
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            try:
+                await self._probe_task
+            except asyncio.CancelledError:
+                pass
+            self._probe_task = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        return [
+            {
+                "base_url": e.base_url,
+                "state": e.breaker.state,
+                "outstanding": e.outstanding,
+                "ewma_ms": e.ewma_ms,
+            }
+            for e in self.endpoints
+        ]
@@ -0,0 +1,171 @@
+import asyncio
+import secrets
+import time
+from collections import OrderedDict
+from typing import Any
+
+import orjson
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import LLM_SESSION_EVICTED
+
+log = get_logger()
+
+_TOOL_CACHE_MAX = 16  # oturum başına saklanan tool sonucu
+_SUMMARY_ANSWER_CHARS = 200
+_ID_BYTES = 16  # secrets.token_urlsafe -> 22 karakter; tahmin edilemez
+
+
+def _size(obj: Any) -> int:
+    return len(orjson.dumps(obj, default=str))
+
+
+class Conversation:
+    """
+    Tek oturumun durumu. Geçmiş sadece düz user/assistant çiftleridir (tool alışverişi tur bitince cevaba
+    indirgenir) ve yalnızca sona eklenir: sistem prompt'u + geçmiş her turda aynı byte önekini üretir,
+    backend'in prompt cache'i isabet eder. Önek sadece eski turlar özete katlandığında değişir.
+    """
+
+    def __init__(self, session_id: str, now: float) -> None:
+        self.id = session_id
+        self.lock = asyncio.Lock()  # aynı oturumdaki eşzamanlı sorular sırayla işlenir
+        self.summary = ""
+        self.turns: list[tuple[str, str]] = []
+        self.tool_names: set[str] = set()  # oturumda LLM'e gönderilen tool'lar
+        self.last_minutes: int | None = None
+        self.tool_cache: OrderedDict[tuple[str, bytes], tuple[float, dict[str, Any]]] = OrderedDict()
+        self.last_used = now
+        self.size = 0
+
+    def history(self) -> list[dict[str, Any]]:
+        out: list[dict[str, Any]] = []
+        if self.summary:
+            out.append({"role": "system", "content": "Önceki konuşmanın özeti: " + self.summary})
+        for question, answer in self.turns:
+            out.append({"role": "user", "content": question})
+            out.append({"role": "assistant", "content": answer})
+        return out
+
+    def add_turn(self, question: str, answer: str) -> None:
+        max_turns = settings.llm_session_max_turns
+        if max_turns <= 0:
+            return
+        self.turns.append((question, answer))
+        if len(self.turns) <= max_turns:
+            return
+        # Eski turların yarısı tek seferde katlanır; önek her turda değil, max_turns/2 turda bir değişir
+        keep = max_turns // 2
+        folded, self.turns = self.turns[: len(self.turns) - keep], self.turns[len(self.turns) - keep :]
+        lines = [f"Soru: {q} -> Cevap: {a[:_SUMMARY_ANSWER_CHARS]}" for q, a in folded]
+        summary = " | ".join([self.summary, *lines]) if self.summary else " | ".join(lines)
+        self.summary = summary[-settings.llm_session_summary_chars :]
+
+    @staticmethod
+    def cache_key(tool_name: str, tool_args: dict[str, Any]) -> tuple[str, bytes]:
+        return tool_name, orjson.dumps(tool_args, option=orjson.OPT_SORT_KEYS, default=str)
+
+    def cached_result(self, key: tuple[str, bytes], now: float) -> dict[str, Any] | None:
+        entry = self.tool_cache.get(key)
+        if entry is None:
+            return None
+        fetched_at, result = entry
+        if now - fetched_at > settings.llm_session_tool_cache_seconds:
+            del self.tool_cache[key]
+            return None
+        return result
+
+    def cache_result(self, key: tuple[str, bytes], result: dict[str, Any], now: float) -> None:
+        self.tool_cache[key] = (now, result)
+        self.tool_cache.move_to_end(key)
+        while len(self.tool_cache) > _TOOL_CACHE_MAX:
+            self.tool_cache.popitem(last=False)
+
+    def estimate_size(self) -> int:
+        return _size(self.history()) + sum(len(k[1]) + _size(r) for k, (_, r) in self.tool_cache.items())
+
+
+class SessionStore:
+    """
+    Süreç içi oturum deposu: son kullanıma göre sıralı (LRU). Süresi dolan (TTL) oturumlar baştan atılır;
+    oturum sayısı veya tahmini toplam boyut sınırı aşılırsa en eski kullanılanlar çıkarılır.
+    Tek API süreci varsayımı: birden fazla worker'da istemci aynı worker'a düşmezse oturum bulunamaz (404).
+    """
+
+    def __init__(self) -> None:
+        self._items: OrderedDict[str, Conversation] = OrderedDict()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def bytes(self) -> int:
+        return self._bytes
+
+    def create(self) -> Conversation:
+        # Kimliği sunucu üretir; istemcinin seçtiği kimlikle oturum açılmaz (başkasının konuşmasına erişilemesin)
+        now = time.monotonic()
+        self._expire(now)
+        session_id = secrets.token_urlsafe(_ID_BYTES)
+        while session_id in self._items:
+            session_id = secrets.token_urlsafe(_ID_BYTES)
+        conv = self._items[session_id] = Conversation(session_id, now)
+        self._evict(keep=conv)
+        return conv
+
+    def get(self, session_id: str) -> Conversation | None:
+        # Bilinmeyen/süresi dolmuş kimlik için None: oturum yeniden yaratılmaz, istemci yenisini açar
+        now = time.monotonic()
+        self._expire(now)
+        conv = self._items.get(session_id)
+        if conv is None:
+            return None
+        self._items.move_to_end(session_id)
+        conv.last_used = now
+        return conv
+
+    def update(self, conv: Conversation) -> None:
+        # Tur bittiğinde çağrılır: boyutu yeniden hesapla, gerekirse diğer oturumları çıkar
+        current = self._items.get(conv.id)
+        if current is not None and current is not conv:
+            self._bytes -= current.size
+        elif current is conv:
+            self._bytes -= conv.size
+        conv.size = conv.estimate_size()
+        conv.last_used = time.monotonic()
+        self._items[conv.id] = conv
+        self._items.move_to_end(conv.id)
+        self._bytes += conv.size
+        self._evict(keep=conv)
+
+    def _drop(self, session_id: str, reason: str) -> None:
+        conv = self._items.pop(session_id)
+        self._bytes -= conv.size
+        LLM_SESSION_EVICTED.labels(reason=reason).inc()
+        log.info("llm.session.evicted", session_id=session_id, reason=reason, bytes=conv.size)
+
+    def _expire(self, now: float) -> None:
+        ttl = settings.llm_session_ttl_seconds
+        while self._items:
+            session_id, conv = next(iter(self._items.items()))
+            if now - conv.last_used <= ttl:
+                break
+            self._drop(session_id, "ttl")
+
+    def _evict(self, keep: Conversation) -> None:
+        while len(self._items) > 1:
+            if len(self._items) > settings.llm_session_max_sessions:
+                reason = "lru"
+            elif self._bytes > settings.llm_session_max_bytes:
+                reason = "memory"
+            else:
+                return
+            oldest = next(iter(self._items))
+            if oldest == keep.id:
+                return
+            self._drop(oldest, reason)
+
+
+store = SessionStore()
@@ -1,3 +1,5 @@
+import time
+from datetime import datetime, timedelta, timezone
 from typing import Any
 
 from jsonschema import validate
@@ -5,7 +7,15 @@ from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.logging import get_logger
+from app.core.config import settings
+from app.core.deadline import deadline_scope
+from app.core.metrics import TOOL_EXEC_SECONDS, TOOL_ROLLING_LOOKUPS
+from app.core.tracing import span
+from app.llm.tools.postprocess import POSTPROCESSORS
 from app.llm.tools.registry import ToolRegistry
+from app.services.archive import window_aggregate as archive_window_aggregate
+from app.services.chunks import window_aggregate as chunk_window_aggregate
+from app.services.rolling import store as rolling_store
 
 log = get_logger()
 
@@ -101,11 +111,48 @@ async def execute_tool(
 
     log.info("tool.exec.start", tool_name=tool_name, tool_args=tool_args, sql_file=spec.x_sql_file)
 
-    res = await session.execute(text(spec.sql_text or ""), tool_args)
-    rows = res.mappings().all()
-
-    if len(rows) == 1:
-        result: dict[str, Any] = dict(rows[0])
+    wa = spec.x_window_aggregate
+    if wa is not None and settings.rolling_enabled:
+        hit, value = rolling_store.answer(wa.family, wa.column, wa.agg, int(tool_args[wa.minutes_arg]))
+        TOOL_ROLLING_LOOKUPS.labels(tool=tool_name, outcome="hit" if hit else "miss").inc()
+        if hit:
+            result = {wa.result_key: value}
+            log.info("tool.exec.end", tool_name=tool_name, source="rolling", result=result)
+            return result
+
+    with span("tool.execute", tool=tool_name, sql_file=spec.x_sql_file) as sp:
+        start = time.perf_counter()
+        # İstek deadline'ı dolarsa veya istemci koparsa sorgu iptal edilir (asyncpg sunucuya cancel request gönderir)
+        async with deadline_scope("tool"):
+            res = await session.execute(text(spec.sql_text or ""), tool_args)
+            rows = res.mappings().all()
+
+            # Pencere sıkıştırılmış geçmişe (chunk) veya Parquet arşivine uzanıyorsa o tarafları da kat
+            if wa is not None and wa.agg in {"max", "min"} and len(rows) == 1:
+                window_s = int(tool_args[wa.minutes_arg]) * 60
+                since = datetime.now(timezone.utc) - timedelta(seconds=window_s)
+                history: list[float | None] = []
+                if window_s >= settings.chunk_compress_after_hours * 3600:
+                    history.append(await chunk_window_aggregate(session, wa.family, wa.column, wa.agg, since))
+                if window_s >= settings.archive_after_days * 86400:
+                    history.append(await archive_window_aggregate(wa.family, wa.column, wa.agg, since))
+                values = [v for v in history if v is not None]
+                if values:
+                    merged = dict(rows[0])
+                    raw_value = merged.get(wa.result_key)
+                    if raw_value is not None:
+                        values.append(float(raw_value))
+                    merged[wa.result_key] = max(values) if wa.agg == "max" else min(values)
+                    rows = [merged]
+
+        TOOL_EXEC_SECONDS.labels(tool=tool_name).observe(time.perf_counter() - start)
+        if sp is not None:
+            sp.set(rowcount=len(rows))
+
+    if spec.x_postprocess is not None:
+        result: dict[str, Any] = POSTPROCESSORS[spec.x_postprocess]([dict(r) for r in rows], tool_args)
+    elif len(rows) == 1:
+        result = dict(rows[0])
     else:
         result = {"rows": [dict(r) for r in rows]}
 
@@ -1,14 +1,25 @@
 # app/llm/tools/loader.py
 import json
+import re
 from pathlib import Path
 
+from app.llm.tools.postprocess import POSTPROCESSORS
 from app.llm.tools.types import ToolSpec
 
+# Sadece sol sınır: Türkçe ekler ("diskin", "alarmlar") eşleşsin diye sağ taraf açık.
+# Bu yüzden başka kelimelerin öneki olan kısa anahtar kelimeler ("now" -> "nowhere", "ağ" -> "ağır") kullanılmaz
+_WORD_BOUNDARY = r"(?<![a-zçğıöşü0-9])"
+
+
+def compile_keywords(keywords: list[str]) -> list[tuple[re.Pattern[str], bool]]:
+    return [(re.compile(_WORD_BOUNDARY + re.escape(kw)), kw.isascii()) for kw in keywords]
+
 
 def load_tools(spec_dir: Path, sql_dir: Path) -> dict[str, ToolSpec]:
     tools: dict[str, ToolSpec] = {}
 
-    for p in spec_dir.glob("*.json"):
+    # İsme göre sıralı: openai_tools() her seferinde aynı sırada döner (stabil prompt prefix)
+    for p in sorted(spec_dir.glob("*.json")):
         data = json.loads(p.read_text(encoding="utf-8"))
         spec = ToolSpec.model_validate(data)
 
@@ -22,7 +33,11 @@ def load_tools(spec_dir: Path, sql_dir: Path) -> dict[str, ToolSpec]:
         if not sql_path.exists():
             raise RuntimeError(f"SQL file not found for tool={spec.name}: {sql_path}")
 
+        if spec.x_postprocess is not None and spec.x_postprocess not in POSTPROCESSORS:
+            raise RuntimeError(f"Unknown x_postprocess for tool={spec.name}: {spec.x_postprocess}")
+
         spec.sql_text = sql_path.read_text(encoding="utf-8")
+        spec.keyword_patterns = compile_keywords(spec.x_keywords)
         tools[spec.name] = spec
 
     if not tools:
@@ -0,0 +1,26 @@
+# app/llm/tools/postprocess.py
+from typing import Any, Callable
+
+from app.services.sketches import merge_encoded
+
+
+def merge_sketch_percentile(rows: list[dict[str, Any]], tool_args: dict[str, Any]) -> dict[str, Any]:
+    # Her satır bir dakika/saat sketch'i; birleştirip istenen quantile'ı okuruz
+    merged = merge_encoded(r["sketch"] for r in rows if r.get("sketch") is not None)
+    if merged is None or merged.count == 0:
+        return {"metric": tool_args["metric"], "percentile": tool_args["percentile"], "value": None, "count": 0}
+    return {
+        "metric": tool_args["metric"],
+        "percentile": tool_args["percentile"],
+        "value": merged.quantile(float(tool_args["percentile"]) / 100),
+        "count": merged.count,
+        "min": merged.min,
+        "max": merged.max,
+        "relative_accuracy": merged.alpha,
+    }
+
+
+# Spec'teki x_postprocess adı -> SQL satırlarını tool sonucuna çeviren fonksiyon
+POSTPROCESSORS: dict[str, Callable[[list[dict[str, Any]], dict[str, Any]], dict[str, Any]]] = {
+    "merge_sketch_percentile": merge_sketch_percentile,
+}
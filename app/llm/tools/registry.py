@@ -18,3 +18,42 @@ class ToolRegistry:
 
     def openai_tools(self) -> list[dict[str, Any]]:
         return [spec.to_openai_tool() for spec in self._tools.values()]
+
+    def tool_choice_response_format(self, names: list[str], final_tool: str) -> dict[str, Any]:
+        """
+        Structured-output modu için response_format: cevap her zaman {"name", "parameters"} nesnesidir,
+        name ya bir tool ya da final_tool (serbest metin cevap) olur. Backend bunu grammar'a çevirir.
+        """
+        variants: list[dict[str, Any]] = []
+        for name in names:
+            spec = self._tools[name]
+            variants.append(
+                {
+                    "type": "object",
+                    "description": spec.description,
+                    "properties": {"name": {"const": name}, "parameters": spec.parameters},
+                    "required": ["name", "parameters"],
+                    "additionalProperties": False,
+                }
+            )
+        variants.append(
+            {
+                "type": "object",
+                "description": "Tool gerekmiyorsa kullanıcıya doğrudan cevap.",
+                "properties": {
+                    "name": {"const": final_tool},
+                    "parameters": {
+                        "type": "object",
+                        "properties": {"text": {"type": "string"}},
+                        "required": ["text"],
+                        "additionalProperties": False,
+                    },
+                },
+                "required": ["name", "parameters"],
+                "additionalProperties": False,
+            }
+        )
+        return {
+            "type": "json_schema",
+            "json_schema": {"name": "tool_choice", "strict": True, "schema": {"anyOf": variants}},
+        }
@@ -0,0 +1,31 @@
+-- alerts sadece durum değişimlerini tutar; "aktif" = kuralın son olayı firing olanlar (pencereden bağımsız).
+-- DISTINCT ON ix_alerts_rule_ts sırasıyla okunur; tablo ALERT_RETENTION_HOURS ile sınırlı, son olaylar silinmez
+-- Kaldırılan kuralların son firing olayı collector açılışında resolved ile kapatılır; aktif listede kalmazlar
+WITH w AS (
+  SELECT * FROM alerts
+  WHERE ts >= (now() - (:minutes * interval '1 minute'))
+),
+latest AS (
+  SELECT DISTINCT ON (rule) rule, state, severity, ts, value, message
+  FROM alerts
+  ORDER BY rule, ts DESC
+)
+SELECT
+  (SELECT count(*) FROM w WHERE state = 'firing') AS fired_count,
+  (SELECT coalesce(
+     jsonb_agg(
+       jsonb_build_object(
+         'ts', e.ts, 'rule', e.rule, 'severity', e.severity, 'state', e.state,
+         'metric', e.metric, 'value', e.value, 'threshold', e.threshold, 'message', e.message
+       )
+       ORDER BY e.ts DESC
+     ),
+     '[]'::jsonb
+   ) FROM (SELECT * FROM w ORDER BY ts DESC LIMIT :limit) e) AS events,
+  (SELECT coalesce(
+     jsonb_agg(
+       jsonb_build_object('rule', l.rule, 'severity', l.severity, 'since', l.ts, 'value', l.value, 'message', l.message)
+       ORDER BY l.ts
+     ),
+     '[]'::jsonb
+   ) FROM latest l WHERE l.state = 'firing') AS active;
@@ -0,0 +1,34 @@
+-- Tick başına tek satır; çekirdek dizileri unnest ... WITH ORDINALITY ile açılır (freq_mhz NULL ise NULL'la doldurulur).
+-- busy_ratio: kullanımın :threshold ve üstünde olduğu örneklerin oranı (sürekli sıcak çekirdek)
+WITH per_core AS (
+  SELECT c.core - 1 AS core,
+         max(c.usage) AS max_usage_percent,
+         round(avg(c.usage)::numeric, 1) AS avg_usage_percent,
+         round(avg((c.usage >= :threshold)::int)::numeric, 3) AS busy_ratio,
+         max(c.freq) AS max_freq_mhz
+  FROM metrics_cpu_cores m
+  CROSS JOIN LATERAL unnest(m.usage_percent, m.freq_mhz) WITH ORDINALITY AS c(usage, freq, core)
+  WHERE m.ts >= (now() - (:minutes * interval '1 minute'))
+  GROUP BY c.core
+),
+top AS (
+  SELECT * FROM per_core
+  ORDER BY max_usage_percent DESC, avg_usage_percent DESC
+  LIMIT :limit
+)
+SELECT
+  (SELECT count(*) FROM per_core) AS core_count,
+  (SELECT round(avg(avg_usage_percent), 1) FROM per_core) AS avg_usage_percent,
+  (SELECT coalesce(
+     jsonb_agg(
+       jsonb_build_object(
+         'core', core,
+         'max_usage_percent', max_usage_percent,
+         'avg_usage_percent', avg_usage_percent,
+         'busy_ratio', busy_ratio,
+         'max_freq_mhz', max_freq_mhz
+       )
+       ORDER BY max_usage_percent DESC, avg_usage_percent DESC
+     ),
+     '[]'::jsonb
+   ) FROM top) AS cores;
@@ -0,0 +1,35 @@
+-- Oranlar collector'da sayaç farkından hesaplandı; burada (ts, device) PK üzerinden sadece aggregate.
+-- En yüklü disk önce (max okuma + max yazma)
+SELECT coalesce(
+  jsonb_agg(
+    jsonb_build_object(
+      'device', d.device,
+      'avg_read_mb_s', d.avg_read_mb_s,
+      'max_read_mb_s', d.max_read_mb_s,
+      'avg_write_mb_s', d.avg_write_mb_s,
+      'max_write_mb_s', d.max_write_mb_s,
+      'max_read_iops', d.max_read_iops,
+      'max_write_iops', d.max_write_iops,
+      'avg_busy_percent', d.avg_busy_percent,
+      'max_busy_percent', d.max_busy_percent,
+      'samples', d.samples
+    )
+    ORDER BY d.max_read_mb_s + d.max_write_mb_s DESC, d.device
+  ),
+  '[]'::jsonb
+) AS devices
+FROM (
+  SELECT device,
+         round((avg(read_bytes_per_s) / 1048576)::numeric, 2) AS avg_read_mb_s,
+         round((max(read_bytes_per_s) / 1048576)::numeric, 2) AS max_read_mb_s,
+         round((avg(write_bytes_per_s) / 1048576)::numeric, 2) AS avg_write_mb_s,
+         round((max(write_bytes_per_s) / 1048576)::numeric, 2) AS max_write_mb_s,
+         round(max(read_iops)::numeric, 1) AS max_read_iops,
+         round(max(write_iops)::numeric, 1) AS max_write_iops,
+         round(avg(busy_percent)::numeric, 1) AS avg_busy_percent,
+         round(max(busy_percent)::numeric, 1) AS max_busy_percent,
+         count(*) AS samples
+  FROM metrics_disk_io
+  WHERE ts >= (now() - (:minutes * interval '1 minute'))
+  GROUP BY device
+) d;
@@ -0,0 +1,26 @@
+-- (ts, device) PK üzerinden pencere taraması; cihaz başına tek satır
+SELECT coalesce(
+  jsonb_agg(
+    jsonb_build_object(
+      'device', d.device,
+      'max_utilization_percent', d.max_utilization_percent,
+      'avg_utilization_percent', d.avg_utilization_percent,
+      'max_temperature_c', d.max_temperature_c,
+      'max_memory_used_mb', d.max_memory_used_mb,
+      'samples', d.samples
+    )
+    ORDER BY d.device
+  ),
+  '[]'::jsonb
+) AS devices
+FROM (
+  SELECT device,
+         max(utilization_percent) AS max_utilization_percent,
+         round(avg(utilization_percent)::numeric, 1) AS avg_utilization_percent,
+         max(temperature_c) AS max_temperature_c,
+         max(memory_used_mb) AS max_memory_used_mb,
+         count(*) AS samples
+  FROM metrics_gpu_devices
+  WHERE ts >= (now() - (:minutes * interval '1 minute'))
+  GROUP BY device
+) d;
@@ -0,0 +1,24 @@
+-- Tamamlanmış saatler saatlik sketch'lerden, kenarlar (pencere başı + son saat) dakika sketch'lerinden okunur.
+-- Birleştirme ve quantile hesabı Python'da (x_postprocess: merge_sketch_percentile).
+WITH w AS (
+  SELECT now() - (:minutes * interval '1 minute') AS t0
+),
+last_hour AS (
+  SELECT max(bucket) AS b FROM metric_sketches WHERE metric = :metric AND width_s = 3600
+)
+SELECT s.sketch
+FROM metric_sketches s, w, last_hour
+WHERE s.metric = :metric
+  AND s.width_s = 3600
+  AND s.bucket >= date_trunc('hour', w.t0) + interval '1 hour'
+UNION ALL
+SELECT s.sketch
+FROM metric_sketches s, w, last_hour
+WHERE s.metric = :metric
+  AND s.width_s = 60
+  AND s.bucket >= date_trunc('minute', w.t0)
+  AND (
+    s.bucket < date_trunc('hour', w.t0) + interval '1 hour'
+    OR last_hour.b IS NULL
+    OR s.bucket >= last_hour.b + interval '1 hour'
+  );
@@ -0,0 +1,35 @@
+-- Oranlar collector'da sayaç farkından hesaplandı; burada (ts, nic) PK üzerinden sadece aggregate.
+-- Mbit/s = bytes/s * 8 / 1e6; en yoğun arayüz önce (max gelen + max giden)
+SELECT coalesce(
+  jsonb_agg(
+    jsonb_build_object(
+      'nic', n.nic,
+      'avg_rx_mbit_s', n.avg_rx_mbit_s,
+      'max_rx_mbit_s', n.max_rx_mbit_s,
+      'avg_tx_mbit_s', n.avg_tx_mbit_s,
+      'max_tx_mbit_s', n.max_tx_mbit_s,
+      'max_rx_packets_per_s', n.max_rx_packets_per_s,
+      'max_tx_packets_per_s', n.max_tx_packets_per_s,
+      'max_errors_per_s', n.max_errors_per_s,
+      'max_drops_per_s', n.max_drops_per_s,
+      'samples', n.samples
+    )
+    ORDER BY n.max_rx_mbit_s + n.max_tx_mbit_s DESC, n.nic
+  ),
+  '[]'::jsonb
+) AS nics
+FROM (
+  SELECT nic,
+         round((avg(rx_bytes_per_s) * 8 / 1e6)::numeric, 2) AS avg_rx_mbit_s,
+         round((max(rx_bytes_per_s) * 8 / 1e6)::numeric, 2) AS max_rx_mbit_s,
+         round((avg(tx_bytes_per_s) * 8 / 1e6)::numeric, 2) AS avg_tx_mbit_s,
+         round((max(tx_bytes_per_s) * 8 / 1e6)::numeric, 2) AS max_tx_mbit_s,
+         round(max(rx_packets_per_s)::numeric, 1) AS max_rx_packets_per_s,
+         round(max(tx_packets_per_s)::numeric, 1) AS max_tx_packets_per_s,
+         round(max(errors_per_s)::numeric, 2) AS max_errors_per_s,
+         round(max(drops_per_s)::numeric, 2) AS max_drops_per_s,
+         count(*) AS samples
+  FROM metrics_net_io
+  WHERE ts >= (now() - (:minutes * interval '1 minute'))
+  GROUP BY nic
+) n;
@@ -0,0 +1,30 @@
+-- Collector her tick'te sadece ilk N süreci yazar; pencere içinde (pid, ad) başına tepe/ortalama değerler.
+-- İlk görüldüğü tick'te cpu_percent NULL'dır (delta yok); max/avg bunları atlar.
+SELECT coalesce(
+  jsonb_agg(
+    jsonb_build_object(
+      'pid', p.pid,
+      'name', p.name,
+      'max_cpu_percent', p.max_cpu_percent,
+      'avg_cpu_percent', p.avg_cpu_percent,
+      'max_rss_mb', p.max_rss_mb,
+      'samples', p.samples
+    )
+    ORDER BY p.rank_value DESC NULLS LAST
+  ),
+  '[]'::jsonb
+) AS processes
+FROM (
+  SELECT pid,
+         name,
+         max(cpu_percent) AS max_cpu_percent,
+         round(avg(cpu_percent)::numeric, 1) AS avg_cpu_percent,
+         max(rss_mb) AS max_rss_mb,
+         count(*) AS samples,
+         CASE WHEN :by = 'memory' THEN max(rss_mb)::float8 ELSE max(cpu_percent) END AS rank_value
+  FROM metrics_process
+  WHERE ts >= (now() - (:minutes * interval '1 minute'))
+  GROUP BY pid, name
+  ORDER BY rank_value DESC NULLS LAST
+  LIMIT :limit
+) p;
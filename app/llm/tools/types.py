@@ -1,14 +1,30 @@
+import re
+
 from pydantic import BaseModel, Field
 from typing import Any
 
 
+class WindowAggregate(BaseModel):
+    # Tool'un "son X dakika" sorgusunun rolling store karşılığı
+    family: str
+    column: str
+    agg: str  # max | min | avg
+    result_key: str
+    minutes_arg: str = "minutes"
+
+
 class ToolSpec(BaseModel):
     name: str
     description: str
     parameters: dict[str, Any]
     x_sql_file: str = Field(alias="x_sql_file")
+    x_keywords: list[str] = Field(default_factory=list)  # tool seçimi (top-k) için soru anahtar kelimeleri
+    x_window_aggregate: WindowAggregate | None = None
+    x_postprocess: str | None = None  # SQL satırlarını Python'da işleyen hook (postprocess.POSTPROCESSORS)
 
     sql_text: str | None = None  # runtime'da dolduracağız
+    # loader derler: (x_keywords deseni, sadece ASCII mi); tool seçimi her soruda yeniden derlemez
+    keyword_patterns: list[tuple[re.Pattern[str], bool]] = Field(default_factory=list)
 
     def to_openai_tool(self) -> dict[str, Any]:
         return {
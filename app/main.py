@@ -6,9 +6,22 @@ from fastapi import FastAPI, Request, Response
 from fastapi.responses import ORJSONResponse
 from structlog.contextvars import bind_contextvars, clear_contextvars
 
-from app.core.logging import configure_logging, get_logger
+from app.core.config import settings
+from app.core.deadline import DeadlineExceeded
+from app.core.logging import configure_logging, get_logger, shutdown_logging
+from app.core.metrics import HTTP_REQUEST_SECONDS, LLM_ADMISSION_REJECTED, LLM_ASK_CANCELLED, render_latest
+from app.core.timing import server_timing_header, start_request_timing
+from app.core.tracing import shutdown_tracing, start_trace
+from app.api.v1.routers.debug import router as debug_router
+from app.api.v1.routers.export import router as export_router
+from app.api.v1.routers.live import router as live_router
+from app.api.v1.routers.metrics import router as metrics_router
 from app.api.v1.routers.health import router as health_router
 from app.api.v1.routers.llm import router as llm_router
+from app.llm.admission import AdmissionRejected
+from app.llm.client import close_llm_pool, start_llm_pool
+from app.services.live import hub as live_hub
+from app.services.rolling import store as rolling_store
 
 log = get_logger()
 
@@ -21,8 +34,18 @@ class UTF8ORJSONResponse(ORJSONResponse):
 async def lifespan(app: FastAPI):
     configure_logging()
     log.info("app.start")
+    await start_llm_pool()
+    if settings.rolling_enabled:
+        # LISTEN her bağlandığında store DB'den yeniden ısıtılır; sonrası NOTIFY ile güncel kalır
+        live_hub.add_sink(rolling_store.ingest)
+        live_hub.add_connect_hook(rolling_store.warm)
+    live_hub.start()
     yield
+    await live_hub.stop()
+    await close_llm_pool()
     log.info("app.stop")
+    shutdown_tracing()
+    shutdown_logging()
 
 
 # ✅ TEK app instance
@@ -35,6 +58,34 @@ app = FastAPI(
 # ✅ Router’lar bu app’e eklenir
 app.include_router(health_router, prefix="/api/v1")
 app.include_router(llm_router, prefix="/api/v1")
+app.include_router(metrics_router, prefix="/api/v1")
+app.include_router(export_router, prefix="/api/v1")
+app.include_router(live_router, prefix="/api/v1")
+app.include_router(debug_router, prefix="/api/v1")
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    body, content_type = render_latest()
+    return Response(content=body, media_type=content_type)
+
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    log.warning("llm.admission.rejected", reason=exc.reason, retry_after=exc.retry_after)
+    LLM_ADMISSION_REJECTED.labels(reason=exc.reason).inc()
+    return UTF8ORJSONResponse(
+        status_code=exc.status_code,
+        content={"detail": exc.reason},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+@app.exception_handler(DeadlineExceeded)
+async def deadline_exceeded_handler(request: Request, exc: DeadlineExceeded):
+    log.warning("llm.ask.deadline_exceeded", stage=exc.stage, deadline_seconds=settings.llm_request_deadline_seconds)
+    LLM_ASK_CANCELLED.labels(reason="deadline").inc()
+    return UTF8ORJSONResponse(status_code=504, content={"detail": str(exc)})
 
 
 @app.middleware("http")
@@ -52,16 +103,38 @@ async def request_logging_middleware(request: Request, call_next):
     )
 
     log.info("http.request.received")
+    stages = start_request_timing()
 
     response: Response | None = None
-    try:
-        response = await call_next(request)
-        return response
-    finally:
-        duration_ms = int((time.perf_counter() - start) * 1000)
-        log.info(
-            "http.response.sent",
-            status_code=response.status_code if response else None,
-            duration_ms=duration_ms,
-        )
-        clear_contextvars()
+    with start_trace(
+        f"{request.method} {request.url.path}",
+        traceparent=request.headers.get("traceparent"),
+        request_id=request_id,
+    ) as root:
+        try:
+            response = await call_next(request)
+            return response
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            duration_ms = int(elapsed_ms)
+            # Route şablonu (ör. /api/v1/llm/ask) ile etiketle; eşleşmeyen path'ler kardinaliteyi patlatmasın
+            route = request.scope.get("route")
+            HTTP_REQUEST_SECONDS.labels(
+                method=request.method,
+                route=getattr(route, "path", "unmatched"),
+                status=str(response.status_code) if response else "500",
+            ).observe(elapsed_ms / 1000)
+            if response is not None and settings.server_timing:
+                response.headers["Server-Timing"] = server_timing_header(stages, elapsed_ms)
+            if root is not None:
+                root.set(status_code=response.status_code if response else None)
+                if response is not None:
+                    response.headers["X-Trace-Id"] = root.trace.trace_id
+            log.info(
+                "http.response.sent",
+                status_code=response.status_code if response else None,
+                duration_ms=duration_ms,
+                stages_ms={k: int(v) for k, v in stages.items()},
+                trace_id=root.trace.trace_id if root is not None else None,
+            )
+            clear_contextvars()
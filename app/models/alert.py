@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, Float, Index, String, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class Alert(Base):
+    __tablename__ = "alerts"
+    __table_args__ = (
+        # Kural başına son olay (aktif alarmlar, collector açılışı) ve saklama temizliği için
+        Index("ix_alerts_rule_ts", "rule", text("ts DESC")),
+    )
+
+    # Olay günlüğü: her kural için sadece durum değişimleri (firing / resolved) yazılır
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    ts: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
+
+    rule: Mapped[str] = mapped_column(String(64), nullable=False)
+    severity: Mapped[str] = mapped_column(String(16), nullable=False)
+    state: Mapped[str] = mapped_column(String(16), nullable=False)
+    metric: Mapped[str] = mapped_column(String(64), nullable=False)
+    value: Mapped[float | None] = mapped_column(Float, nullable=True)  # absence olaylarında NULL
+    threshold: Mapped[float | None] = mapped_column(Float, nullable=True)
+    message: Mapped[str] = mapped_column(String(256), nullable=False)
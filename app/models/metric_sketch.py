@@ -0,0 +1,20 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Float, Integer, LargeBinary, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class MetricSketch(Base):
+    __tablename__ = "metric_sketches"
+
+    # metric: "<family>.<column>" (ör. cpu.usage_percent); width_s: 60 (dakika) veya 3600 (saat)
+    metric: Mapped[str] = mapped_column(String(64), primary_key=True)
+    width_s: Mapped[int] = mapped_column(Integer, primary_key=True)
+    bucket: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+
+    count: Mapped[int] = mapped_column(Integer, nullable=False)
+    min: Mapped[float] = mapped_column(Float, nullable=False)
+    max: Mapped[float] = mapped_column(Float, nullable=False)
+    sketch: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)  # DDSketch (app/services/sketches.py)
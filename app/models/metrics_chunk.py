@@ -0,0 +1,27 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Float, Integer, LargeBinary, String
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class MetricsChunk(Base):
+    __tablename__ = "metrics_chunks"
+
+    # Bir family'nin bir saatlik örnekleri tek satırda (app/services/chunks.py kodlaması)
+    family: Mapped[str] = mapped_column(String(16), primary_key=True)
+    chunk_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+
+    first_ts: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    last_ts: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    n: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    ts_data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)  # delta-of-delta varint
+    val_data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)  # kolon başına ölçekli delta / XOR float
+
+    # Kolon istatistikleri (FAMILIES kolon sırası): pencere tamamen kapsıyorsa decode gerekmez
+    col_min: Mapped[list[float]] = mapped_column(ARRAY(Float), nullable=False)
+    col_max: Mapped[list[float]] = mapped_column(ARRAY(Float), nullable=False)
+    col_sum: Mapped[list[float]] = mapped_column(ARRAY(Float), nullable=False)
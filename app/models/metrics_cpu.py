@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import BigInteger, DateTime, Float
+from sqlalchemy import BigInteger, DateTime, Float, Index
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.models.base import Base
@@ -8,9 +8,13 @@ from app.models.base import Base
 
 class MetricsCPU(Base):
     __tablename__ = "metrics_cpu"
+    __table_args__ = (
+        # Tool aggregate'leri ve chunk/arşiv aralık okumaları index-only scan (migration f3c9b7e2a814)
+        Index("ix_metrics_cpu_ts_cover", "ts", postgresql_include=["usage_percent", "temperature_c", "freq_mhz"]),
+    )
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
-    ts: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
+    ts: Mapped[datetime] = mapped_column(DateTime(timezone=True))
 
     usage_percent: Mapped[float] = mapped_column(Float, nullable=False)
     temperature_c: Mapped[float] = mapped_column(Float, nullable=False)
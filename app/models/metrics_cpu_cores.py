@@ -0,0 +1,17 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime
+from sqlalchemy.dialects.postgresql import ARRAY, REAL
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class MetricsCPUCores(Base):
+    __tablename__ = "metrics_cpu_cores"
+
+    # Tick başına tek satır; dizinin i. elemanı i. çekirdek (float4: 1 ondalıklı değerler için yeterli)
+    ts: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+
+    usage_percent: Mapped[list[float]] = mapped_column(ARRAY(REAL), nullable=False)
+    freq_mhz: Mapped[list[float] | None] = mapped_column(ARRAY(REAL), nullable=True)  # platform vermiyorsa NULL
@@ -0,0 +1,21 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, String
+from sqlalchemy.dialects.postgresql import REAL
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class MetricsDiskIO(Base):
+    __tablename__ = "metrics_disk_io"
+
+    # Sadece oranlar (collector önceki sayaçtan hesaplar); ham kümülatif sayaç tutulmaz
+    ts: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    device: Mapped[str] = mapped_column(String(32), primary_key=True)  # sda, nvme0n1 (bölümler hariç)
+
+    read_bytes_per_s: Mapped[float] = mapped_column(REAL, nullable=False)
+    write_bytes_per_s: Mapped[float] = mapped_column(REAL, nullable=False)
+    read_iops: Mapped[float] = mapped_column(REAL, nullable=False)
+    write_iops: Mapped[float] = mapped_column(REAL, nullable=False)
+    busy_percent: Mapped[float | None] = mapped_column(REAL, nullable=True)  # busy_time olmayan platformlarda NULL
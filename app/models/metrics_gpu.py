@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import BigInteger, DateTime, Float, Integer
+from sqlalchemy import BigInteger, DateTime, Float, Index, Integer
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.models.base import Base
@@ -8,9 +8,13 @@ from app.models.base import Base
 
 class MetricsGPU(Base):
     __tablename__ = "metrics_gpu"
+    __table_args__ = (
+        # Tool aggregate'leri ve chunk/arşiv aralık okumaları index-only scan (migration f3c9b7e2a814)
+        Index("ix_metrics_gpu_ts_cover", "ts", postgresql_include=["utilization_percent", "temperature_c", "memory_used_mb"]),
+    )
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
-    ts: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
+    ts: Mapped[datetime] = mapped_column(DateTime(timezone=True))
 
     utilization_percent: Mapped[float] = mapped_column(Float, nullable=False)
     temperature_c: Mapped[float] = mapped_column(Float, nullable=False)
@@ -0,0 +1,19 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, SmallInteger
+from sqlalchemy.dialects.postgresql import REAL
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class MetricsGPUDevice(Base):
+    __tablename__ = "metrics_gpu_devices"
+
+    # (ts, device) PK: pencere sorguları ts aralığıyla başlar, device'a göre gruplar
+    ts: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    device: Mapped[int] = mapped_column(SmallInteger, primary_key=True)  # nvidia-smi index
+
+    utilization_percent: Mapped[float] = mapped_column(REAL, nullable=False)
+    temperature_c: Mapped[float] = mapped_column(REAL, nullable=False)
+    memory_used_mb: Mapped[int] = mapped_column(Integer, nullable=False)
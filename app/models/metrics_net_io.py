@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, String
+from sqlalchemy.dialects.postgresql import REAL
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class MetricsNetIO(Base):
+    __tablename__ = "metrics_net_io"
+
+    # Sadece oranlar (collector önceki sayaçtan hesaplar); ham kümülatif sayaç tutulmaz
+    ts: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    nic: Mapped[str] = mapped_column(String(32), primary_key=True)
+
+    rx_bytes_per_s: Mapped[float] = mapped_column(REAL, nullable=False)
+    tx_bytes_per_s: Mapped[float] = mapped_column(REAL, nullable=False)
+    rx_packets_per_s: Mapped[float] = mapped_column(REAL, nullable=False)
+    tx_packets_per_s: Mapped[float] = mapped_column(REAL, nullable=False)
+    errors_per_s: Mapped[float | None] = mapped_column(REAL, nullable=True)
+    drops_per_s: Mapped[float | None] = mapped_column(REAL, nullable=True)
@@ -0,0 +1,19 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, Float, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class MetricsProcess(Base):
+    __tablename__ = "metrics_process"
+
+    # Her tick'te sadece CPU'ya ve RSS'e göre ilk N süreç (birleşimi) yazılır; cmdline/kullanıcı tutulmaz
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    ts: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
+
+    pid: Mapped[int] = mapped_column(Integer, nullable=False)
+    name: Mapped[str] = mapped_column(String(64), nullable=False)
+    cpu_percent: Mapped[float | None] = mapped_column(Float, nullable=True)  # ilk görüldüğü tick'te delta yok
+    rss_mb: Mapped[int] = mapped_column(Integer, nullable=False)
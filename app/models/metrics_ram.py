@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import BigInteger, DateTime, Float, Integer
+from sqlalchemy import BigInteger, DateTime, Float, Index, Integer
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.models.base import Base
@@ -8,9 +8,13 @@ from app.models.base import Base
 
 class MetricsRAM(Base):
     __tablename__ = "metrics_ram"
+    __table_args__ = (
+        # Tool aggregate'leri ve chunk/arşiv aralık okumaları index-only scan (migration f3c9b7e2a814)
+        Index("ix_metrics_ram_ts_cover", "ts", postgresql_include=["used_mb", "available_mb", "usage_percent"]),
+    )
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
-    ts: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
+    ts: Mapped[datetime] = mapped_column(DateTime(timezone=True))
 
     used_mb: Mapped[int] = mapped_column(Integer, nullable=False)
     available_mb: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -0,0 +1,217 @@
+import asyncio
+import os
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, AsyncIterator
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.services.chunks import INT_COLUMNS
+from app.services.chunks import read_range as chunk_read_range
+from app.services.metrics_query import FAMILIES
+
+log = get_logger()
+
+# Cold tier düzeni: {archive_dir}/{family}/date=YYYY-MM-DD/part-0.parquet (Hive partition; DuckDB/Spark doğrudan okur)
+_PART_PREFIX = "date="
+_PART_FILE = "part-0.parquet"
+
+
+def _require_pyarrow() -> tuple[Any, Any]:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("Parquet cold tier requires pyarrow") from e
+    return pa, pq
+
+
+def _day_path(family: str, day: date) -> str:
+    return os.path.join(settings.archive_dir, family, f"{_PART_PREFIX}{day.isoformat()}", _PART_FILE)
+
+
+# family -> (aile dizininin mtime'ı, günler)
+_days_cache: dict[str, tuple[int, list[date]]] = {}
+
+
+def _scan_days(base: str) -> tuple[list[date], bool]:
+    days = []
+    complete = True
+    for name in os.listdir(base):
+        if not name.startswith(_PART_PREFIX):
+            continue
+        if os.path.exists(os.path.join(base, name, _PART_FILE)):
+            days.append(date.fromisoformat(name[len(_PART_PREFIX):]))
+        else:
+            # Dizin açılmış, dosya henüz rename edilmemiş; rename üst dizinin mtime'ını değiştirmez, cache'lenmez
+            complete = False
+    return sorted(days), complete
+
+
+async def archived_days(family: str) -> list[date]:
+    """
+    Arşivdeki günler. Liste bellekte tutulur, yeni gün dizini eklenince değişen aile dizini mtime'ı ile doğrulanır:
+    istek başına tek stat; dizin sadece değiştiğinde (thread'de) yeniden listelenir. Collector ayrı süreçte yazar,
+    bu yüzden archive_family'deki invalidation tek başına yetmez.
+    """
+    base = os.path.join(settings.archive_dir, family)
+    try:
+        mtime = os.stat(base).st_mtime_ns
+    except FileNotFoundError:
+        return []
+    cached = _days_cache.get(family)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    days, complete = await asyncio.to_thread(_scan_days, base)
+    if complete:
+        _days_cache[family] = (mtime, days)
+    return days
+
+
+def _day_start(day: date) -> datetime:
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+
+
+async def _overlapping_days(family: str, ts_from: datetime, ts_to: datetime) -> list[date]:
+    first = ts_from.astimezone(timezone.utc).date()
+    last = (ts_to - timedelta(microseconds=1)).astimezone(timezone.utc).date()
+    return [d for d in await archived_days(family) if first <= d <= last]
+
+
+def _read_file(family: str, day: date, ts_from: datetime | None, ts_to: datetime | None) -> list[tuple[Any, ...]]:
+    _, pq = _require_pyarrow()
+    _, columns = FAMILIES[family]
+    filters = None
+    if ts_from is not None and ts_to is not None:
+        filters = [("ts", ">=", ts_from), ("ts", "<", ts_to)]
+    table = pq.read_table(_day_path(family, day), columns=["ts", *columns], filters=filters)
+    return list(zip(*(table.column(c).to_pylist() for c in ["ts", *columns])))
+
+
+def _write_day(family: str, day: date, rows: list[tuple[Any, ...]]) -> int:
+    pa, pq = _require_pyarrow()
+    _, columns = FAMILIES[family]
+    path = _day_path(family, day)
+
+    # Önceki geçiş dosyayı yazıp DB silmeden düştüyse aynı satırlar tekrar gelir: ts ile tekilleştir
+    by_ts: dict[datetime, tuple[Any, ...]] = {}
+    if os.path.exists(path):
+        by_ts.update((r[0], r) for r in _read_file(family, day, None, None))
+    by_ts.update((r[0], r) for r in rows)
+    merged = [by_ts[k] for k in sorted(by_ts)]
+
+    fields = [pa.field("ts", pa.timestamp("us", tz="UTC"), nullable=False)]
+    fields += [pa.field(c, pa.int32() if c in INT_COLUMNS else pa.float64(), nullable=False) for c in columns]
+    schema = pa.schema(fields)
+    arrays = [pa.array([r[i] for r in merged], type=f.type) for i, f in enumerate(fields)]
+    table = pa.Table.from_arrays(arrays, schema=schema)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    pq.write_table(table, tmp, compression="zstd")
+    with open(tmp, "rb") as f:
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return len(merged)
+
+
+async def archive_family(session: AsyncSession, family: str, cutoff_day: date, max_days: int) -> int:
+    """
+    cutoff_day'den önceki en eski günleri (chunk + ham satır) Parquet'e yazar, sonra DB'den siler.
+    Dosya rename ile atomik yazılır; DB silme başarısız olursa bir sonraki geçiş aynı günü tekilleştirerek yeniden yazar.
+    """
+    table, columns = FAMILIES[family]
+    done = 0
+    while done < max_days:
+        res = await session.execute(
+            text(
+                f"SELECT least((SELECT min(first_ts) FROM metrics_chunks WHERE family = :f), (SELECT min(ts) FROM {table}))"
+            ),
+            {"f": family},
+        )
+        oldest = res.scalar()
+        if oldest is None:
+            break
+        day = oldest.astimezone(timezone.utc).date()
+        if day >= cutoff_day:
+            break
+        start = _day_start(day)
+        end = start + timedelta(days=1)
+
+        rows = await chunk_read_range(session, family, start, end)
+        res = await session.execute(
+            text(f"SELECT ts, {', '.join(columns)} FROM {table} WHERE ts >= :start AND ts < :end"),
+            {"start": start, "end": end},
+        )
+        rows += [tuple(r) for r in res.all()]
+
+        written = await asyncio.to_thread(_write_day, family, day, rows)
+        _days_cache.pop(family, None)
+
+        await session.execute(
+            text("DELETE FROM metrics_chunks WHERE family = :f AND chunk_start >= :start AND chunk_start < :end"),
+            {"f": family, "start": start, "end": end},
+        )
+        await session.execute(text(f"DELETE FROM {table} WHERE ts >= :start AND ts < :end"), {"start": start, "end": end})
+        await session.commit()
+        log.info("archive.day.written", family=family, day=day.isoformat(), rows=written)
+        done += 1
+    return done
+
+
+async def archive_once(session: AsyncSession) -> None:
+    start = time.perf_counter()
+    cutoff_day = (datetime.now(timezone.utc) - timedelta(days=settings.archive_after_days)).date()
+    counts = {fam: await archive_family(session, fam, cutoff_day, settings.archive_max_days_per_pass) for fam in FAMILIES}
+    if any(counts.values()):
+        log.info("archive.pass", days=counts, ms=int((time.perf_counter() - start) * 1000))
+
+
+async def iter_range(family: str, ts_from: datetime, ts_to: datetime) -> AsyncIterator[list[tuple[Any, ...]]]:
+    """[ts_from, ts_to) aralığındaki arşivlenmiş örnekler, gün gün ve ts sırasıyla; bellekte en fazla bir günlük dosya."""
+    for d in await _overlapping_days(family, ts_from, ts_to):
+        rows = await asyncio.to_thread(_read_file, family, d, ts_from, ts_to)
+        if rows:
+            yield rows
+
+
+async def read_range(family: str, ts_from: datetime, ts_to: datetime) -> list[tuple[Any, ...]]:
+    """[ts_from, ts_to) aralığındaki arşivlenmiş örnekler: (ts, *kolonlar). Aralık arşive düşmüyorsa dosya açılmaz."""
+    out: list[tuple[Any, ...]] = []
+    async for rows in iter_range(family, ts_from, ts_to):
+        out.extend(rows)
+    return out
+
+
+async def has_range(family: str, ts_from: datetime, ts_to: datetime) -> bool:
+    return bool(await _overlapping_days(family, ts_from, ts_to))
+
+
+async def window_aggregate(family: str, column: str, agg: str, since: datetime) -> float | None:
+    """Arşivdeki `since` sonrası örneklerin max/min'i; sadece ilgili kolon okunur (Parquet kolon projeksiyonu)."""
+    if agg not in {"max", "min"}:
+        raise ValueError(f"Unsupported agg: {agg}")
+    days = [d for d in await archived_days(family) if _day_start(d) + timedelta(days=1) > since]
+    if not days:
+        return None
+
+    def _agg() -> float | None:
+        _, pq = _require_pyarrow()
+        import pyarrow.compute as pc
+
+        values: list[float] = []
+        for d in days:
+            filters = None if _day_start(d) >= since else [("ts", ">=", since)]
+            col = pq.read_table(_day_path(family, d), columns=[column], filters=filters).column(column)
+            if len(col):
+                v = (pc.max if agg == "max" else pc.min)(col).as_py()
+                if v is not None:
+                    values.append(float(v))
+        if not values:
+            return None
+        return max(values) if agg == "max" else min(values)
+
+    return await asyncio.to_thread(_agg)
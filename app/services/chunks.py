@@ -0,0 +1,339 @@
+import math
+import struct
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.services.metrics_query import FAMILIES
+
+log = get_logger()
+
+# Tabloda Integer olan kolonlar; decode sonrası int'e geri çevrilir
+INT_COLUMNS = {"used_mb", "available_mb", "memory_used_mb"}
+
+_F64 = struct.Struct(">d")
+_U64 = struct.Struct(">Q")
+_XOR_SAME = 0xFF
+
+# Kolon kodlaması (her kolonun ilk byte'ı): 0 -> XOR float, 1+k -> 10^k ile ölçeklenmiş tamsayı delta'ları
+_MODE_XOR = 0
+_MAX_DECIMALS = 3
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_US = timedelta(microseconds=1)
+
+
+def _write_varint(out: bytearray, n: int) -> None:
+    while True:
+        b = n & 0x7F
+        n >>= 7
+        if n:
+            out.append(b | 0x80)
+        else:
+            out.append(b)
+            return
+
+
+def _read_varint(buf: bytes, pos: int) -> tuple[int, int]:
+    shift = 0
+    n = 0
+    while True:
+        b = buf[pos]
+        pos += 1
+        n |= (b & 0x7F) << shift
+        if not b & 0x80:
+            return n, pos
+        shift += 7
+
+
+def _zigzag(n: int) -> int:
+    return (n << 1) if n >= 0 else ((-n) << 1) - 1
+
+
+def _unzigzag(z: int) -> int:
+    return (z >> 1) ^ -(z & 1)
+
+
+def encode_timestamps(ts_us: Sequence[int]) -> bytes:
+    """Delta-of-delta: sabit aralıklı örneklerde her timestamp 1-3 byte."""
+    out = bytearray()
+    _write_varint(out, len(ts_us))
+    prev, prev_delta = 0, 0
+    for i, t in enumerate(ts_us):
+        if i == 0:
+            _write_varint(out, _zigzag(t))
+        else:
+            delta = t - prev
+            _write_varint(out, _zigzag(delta - prev_delta))
+            prev_delta = delta
+        prev = t
+    return bytes(out)
+
+
+def decode_timestamps(buf: bytes, pos: int = 0) -> tuple[list[int], int]:
+    n, pos = _read_varint(buf, pos)
+    out: list[int] = []
+    prev, prev_delta = 0, 0
+    for i in range(n):
+        z, pos = _read_varint(buf, pos)
+        if i == 0:
+            prev = _unzigzag(z)
+        else:
+            prev_delta += _unzigzag(z)
+            prev += prev_delta
+        out.append(prev)
+    return out, pos
+
+
+def _decimals(values: Sequence[float]) -> int | None:
+    # Sensör değerleri genelde 0-1 ondalıklı: tamsayıya ölçeklenip delta ile 1-2 byte'a iner.
+    # NaN/inf (ve ölçekte taşan değerler) round() ile tamsayı olamaz; -0.0 işaretini kaybeder: XOR yoluna kalır
+    if not all(math.isfinite(v) and (v or math.copysign(1.0, v) > 0) for v in values):
+        return None
+    for k in range(_MAX_DECIMALS + 1):
+        scale = 10**k
+        if all(math.isfinite(v * scale) and round(v * scale) / scale == v for v in values):
+            return k
+    return None
+
+
+def encode_floats(values: Sequence[float]) -> bytes:
+    out = bytearray()
+    k = _decimals(values)
+    if k is not None:
+        out.append(1 + k)
+        scale = 10**k
+        prev = 0
+        for v in values:
+            iv = round(v * scale)
+            _write_varint(out, _zigzag(iv - prev))
+            prev = iv
+        return bytes(out)
+
+    # Gorilla benzeri, byte hizalı XOR: önceki değerle XOR'un baştaki/sondaki sıfır byte'ları atlanır
+    out.append(_MODE_XOR)
+    prev_bits = 0
+    for v in values:
+        bits = _U64.unpack(_F64.pack(v))[0]
+        x = bits ^ prev_bits
+        prev_bits = bits
+        if x == 0:
+            out.append(_XOR_SAME)
+            continue
+        b = x.to_bytes(8, "big")
+        lead = len(b) - len(b.lstrip(b"\x00"))
+        trail = len(b) - len(b.rstrip(b"\x00"))
+        out.append((lead << 4) | trail)
+        out += b[lead : 8 - trail]
+    return bytes(out)
+
+
+def decode_floats(buf: bytes, n: int, pos: int = 0) -> tuple[list[float], int]:
+    mode = buf[pos]
+    pos += 1
+    out: list[float] = []
+    if mode != _MODE_XOR:
+        scale = 10 ** (mode - 1)
+        iv = 0
+        for _ in range(n):
+            z, pos = _read_varint(buf, pos)
+            iv += _unzigzag(z)
+            out.append(iv / scale)
+        return out, pos
+
+    bits = 0
+    for _ in range(n):
+        h = buf[pos]
+        pos += 1
+        if h != _XOR_SAME:
+            lead, trail = h >> 4, h & 0x0F
+            size = 8 - lead - trail
+            bits ^= int.from_bytes(buf[pos : pos + size], "big") << (8 * trail)
+            pos += size
+        out.append(_F64.unpack(_U64.pack(bits))[0])
+    return out, pos
+
+
+def encode_chunk(rows: Sequence[Sequence[Any]], columns: Sequence[str]) -> tuple[bytes, bytes]:
+    """rows: (ts, *değerler) -> (ts_data, val_data). Kolonlar FAMILIES sırasıyla arka arkaya yazılır."""
+    ts_data = encode_timestamps([(r[0] - _EPOCH) // _US for r in rows])
+    val_data = bytearray()
+    for i, _ in enumerate(columns, start=1):
+        val_data += encode_floats([float(r[i]) for r in rows])
+    return ts_data, bytes(val_data)
+
+
+def decode_chunk(ts_data: bytes, val_data: bytes, columns: Sequence[str]) -> list[tuple[Any, ...]]:
+    ts_us, _ = decode_timestamps(bytes(ts_data))
+    n = len(ts_us)
+    cols: list[list[Any]] = []
+    pos = 0
+    buf = bytes(val_data)
+    for c in columns:
+        values, pos = decode_floats(buf, n, pos)
+        cols.append([int(v) for v in values] if c in INT_COLUMNS else values)
+    ts = [_EPOCH + t * _US for t in ts_us]
+    return list(zip(ts, *cols))
+
+
+def _stats(rows: Sequence[Sequence[Any]], columns: Sequence[str]) -> dict[str, list[float]]:
+    mins, maxs, sums = [], [], []
+    for i, _ in enumerate(columns, start=1):
+        vals = [float(r[i]) for r in rows]
+        mins.append(min(vals))
+        maxs.append(max(vals))
+        sums.append(sum(vals))
+    return {"col_min": mins, "col_max": maxs, "col_sum": sums}
+
+
+_UPSERT = text(
+    """
+    INSERT INTO metrics_chunks (family, chunk_start, first_ts, last_ts, n, ts_data, val_data, col_min, col_max, col_sum)
+    VALUES (:family, :chunk_start, :first_ts, :last_ts, :n, :ts_data, :val_data, :col_min, :col_max, :col_sum)
+    ON CONFLICT (family, chunk_start) DO UPDATE
+    SET first_ts = EXCLUDED.first_ts, last_ts = EXCLUDED.last_ts, n = EXCLUDED.n,
+        ts_data = EXCLUDED.ts_data, val_data = EXCLUDED.val_data,
+        col_min = EXCLUDED.col_min, col_max = EXCLUDED.col_max, col_sum = EXCLUDED.col_sum
+    """
+)
+
+
+async def compress_family(session: AsyncSession, family: str, cutoff: datetime, max_chunks: int) -> int:
+    """
+    cutoff'tan eski, kapanmış saatleri tek satırlık chunk'lara paketler ve ham satırları siler (aynı transaction).
+    Chunk zaten varsa (geç gelen satırlar) eski içerikle birleştirilip yeniden yazılır.
+    """
+    table, columns = FAMILIES[family]
+    cutoff = cutoff.replace(minute=0, second=0, microsecond=0)
+    done = 0
+    while done < max_chunks:
+        res = await session.execute(text(f"SELECT min(ts) FROM {table} WHERE ts < :cutoff"), {"cutoff": cutoff})
+        oldest = res.scalar()
+        if oldest is None:
+            break
+        start = oldest.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        end = start + timedelta(hours=1)
+
+        res = await session.execute(
+            text(f"SELECT ts, {', '.join(columns)} FROM {table} WHERE ts >= :start AND ts < :end ORDER BY ts"),
+            {"start": start, "end": end},
+        )
+        rows = [tuple(r) for r in res.all()]
+
+        existing = await session.execute(
+            text("SELECT ts_data, val_data FROM metrics_chunks WHERE family = :f AND chunk_start = :s FOR UPDATE"),
+            {"f": family, "s": start},
+        )
+        prev = existing.first()
+        if prev is not None:
+            rows = sorted(decode_chunk(prev[0], prev[1], columns) + rows, key=lambda r: r[0])
+
+        ts_data, val_data = encode_chunk(rows, columns)
+        await session.execute(
+            _UPSERT,
+            {
+                "family": family,
+                "chunk_start": start,
+                "first_ts": rows[0][0],
+                "last_ts": rows[-1][0],
+                "n": len(rows),
+                "ts_data": ts_data,
+                "val_data": val_data,
+                **_stats(rows, columns),
+            },
+        )
+        await session.execute(text(f"DELETE FROM {table} WHERE ts >= :start AND ts < :end"), {"start": start, "end": end})
+        await session.commit()
+        done += 1
+    return done
+
+
+async def compress_once(session: AsyncSession) -> None:
+    start = time.perf_counter()
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=settings.chunk_compress_after_hours)
+    counts = {fam: await compress_family(session, fam, cutoff, settings.chunk_max_per_pass) for fam in FAMILIES}
+    if any(counts.values()):
+        log.info("chunks.compressed", chunks=counts, ms=int((time.perf_counter() - start) * 1000))
+
+
+_PAGE_CHUNKS = 24
+
+
+async def iter_range(
+    session: AsyncSession, family: str, ts_from: datetime, ts_to: datetime
+) -> AsyncIterator[list[tuple[Any, ...]]]:
+    """
+    [ts_from, ts_to) aralığındaki sıkıştırılmış örnekler, chunk chunk ve ts sırasıyla: (ts, *kolonlar).
+    Chunk'lar sayfa sayfa okunur; tüketici yeterli satır aldığında durursa kalan chunk'lar DB'den hiç gelmez.
+    """
+    _, columns = FAMILIES[family]
+    # Chunk tek bir saati kapsar (chunk_start <= first_ts, last_ts < chunk_start + 1h): PK aralığıyla sınırlanır
+    lo = ts_from - timedelta(hours=1)
+    while True:
+        res = await session.execute(
+            text(
+                "SELECT chunk_start, ts_data, val_data FROM metrics_chunks "
+                "WHERE family = :f AND chunk_start > :lo AND chunk_start < :ts_to "
+                "AND last_ts >= :ts_from AND first_ts < :ts_to ORDER BY chunk_start LIMIT :page"
+            ),
+            {"f": family, "lo": lo, "ts_from": ts_from, "ts_to": ts_to, "page": _PAGE_CHUNKS},
+        )
+        page = res.all()
+        for _, ts_data, val_data in page:
+            rows = [r for r in decode_chunk(ts_data, val_data, columns) if ts_from <= r[0] < ts_to]
+            if rows:
+                yield rows
+        if len(page) < _PAGE_CHUNKS:
+            return
+        lo = page[-1][0]
+
+
+async def read_range(session: AsyncSession, family: str, ts_from: datetime, ts_to: datetime) -> list[tuple[Any, ...]]:
+    """[ts_from, ts_to) aralığındaki sıkıştırılmış örnekler, ham tablo satırlarıyla aynı şekilde: (ts, *kolonlar)."""
+    out: list[tuple[Any, ...]] = []
+    async for rows in iter_range(session, family, ts_from, ts_to):
+        out.extend(rows)
+    return out
+
+
+async def has_range(session: AsyncSession, family: str, ts_from: datetime, ts_to: datetime) -> bool:
+    res = await session.execute(
+        text(
+            "SELECT EXISTS (SELECT 1 FROM metrics_chunks WHERE family = :f AND chunk_start > :lo AND chunk_start < :ts_to "
+            "AND last_ts >= :ts_from AND first_ts < :ts_to)"
+        ),
+        {"f": family, "lo": ts_from - timedelta(hours=1), "ts_from": ts_from, "ts_to": ts_to},
+    )
+    return bool(res.scalar())
+
+
+async def window_aggregate(session: AsyncSession, family: str, column: str, agg: str, since: datetime) -> float | None:
+    """
+    Chunk'lardaki `since` sonrası örneklerin max/min'i. Tamamen pencere içindeki chunk'lar
+    sadece col_min/col_max istatistiğinden okunur; sadece kenardaki chunk decode edilir.
+    """
+    if agg not in {"max", "min"}:
+        raise ValueError(f"Unsupported agg: {agg}")
+    _, columns = FAMILIES[family]
+    idx = columns.index(column)
+    res = await session.execute(
+        text(
+            f"SELECT first_ts, ts_data, val_data, col_{agg}[{idx + 1}] FROM metrics_chunks "
+            "WHERE family = :f AND last_ts >= :since"
+        ),
+        {"f": family, "since": since},
+    )
+    values: list[float] = []
+    for first_ts, ts_data, val_data, stat in res.all():
+        if first_ts >= since:
+            values.append(stat)
+        else:
+            values.extend(r[idx + 1] for r in decode_chunk(ts_data, val_data, columns) if r[0] >= since)
+    if not values:
+        return None
+    return max(values) if agg == "max" else min(values)
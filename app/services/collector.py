@@ -1,17 +1,37 @@
 import asyncio
 import subprocess
 import random
+import time
 from datetime import datetime, timezone
+from pathlib import Path
 from typing import Any
 
+import orjson
 import psutil
+from prometheus_client import start_http_server
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.alerts.engine import AlertEngine, observed_values
+from app.alerts.loader import RULES_DIR, load_rules
+from app.alerts.sinks import dispatch
 from app.core.config import settings
 from app.core.db import SessionLocal
 from app.core.logging import get_logger
+from app.core.metrics import COLLECTOR_RANDOMIZED, COLLECTOR_TICK_SECONDS
 from app.models.metrics_cpu import MetricsCPU
+from app.models.metrics_cpu_cores import MetricsCPUCores
+from app.models.metrics_disk_io import MetricsDiskIO
 from app.models.metrics_ram import MetricsRAM
 from app.models.metrics_gpu import MetricsGPU
+from app.models.metrics_gpu_devices import MetricsGPUDevice
+from app.models.metrics_net_io import MetricsNetIO
+from app.models.metrics_process import MetricsProcess
+from app.services.archive import archive_once
+from app.services.chunks import compress_once
+from app.services.io_rates import sample_io_rates
+from app.services.processes import sample_top_processes
+from app.services.sketches import rollup_once
 
 log = get_logger()
 
@@ -50,45 +70,68 @@ def _cpu_freq_mhz() -> float | None:
         return None
 
 
-def _read_gpu_metrics_nvidia() -> dict[str, Any] | None:
+def _cpu_core_freqs_mhz(n_cores: int) -> list[float] | None:
+    # Linux'ta çekirdek başına frekans; sayı çekirdek sayısıyla uyuşmuyorsa (bazı VM'ler tek değer döner) yazılmaz
+    try:
+        freqs = psutil.cpu_freq(percpu=True)
+        if not freqs or len(freqs) != n_cores:
+            return None
+        return [round(float(f.current), 1) for f in freqs]
+    except Exception:
+        return None
+
+
+def _read_gpu_metrics_nvidia() -> list[dict[str, Any]] | None:
     """
-    NVIDIA varsa nvidia-smi ile:
-    utilization.gpu (%), temperature.gpu (C), memory.used (MiB)
+    NVIDIA varsa nvidia-smi ile her GPU için (satır başına bir cihaz):
+    index, utilization.gpu (%), temperature.gpu (C), memory.used (MiB)
     """
     try:
         cmd = [
             "nvidia-smi",
-            "--query-gpu=utilization.gpu,temperature.gpu,memory.used",
+            "--query-gpu=index,utilization.gpu,temperature.gpu,memory.used",
             "--format=csv,noheader,nounits",
         ]
         out = subprocess.check_output(cmd, stderr=subprocess.STDOUT, text=True).strip()
         if not out:
             return None
-        parts = [p.strip() for p in out.splitlines()[0].split(",")]
-        util = float(parts[0])
-        temp = float(parts[1])
-        mem_used = int(parts[2])
-        return {"util": util, "temp": temp, "mem_used": mem_used}
+        devices = []
+        for line in out.splitlines():
+            parts = [p.strip() for p in line.split(",")]
+            try:
+                devices.append(
+                    {"device": int(parts[0]), "util": float(parts[1]), "temp": float(parts[2]), "mem_used": int(parts[3])}
+                )
+            except (IndexError, ValueError):
+                # "[N/A]" veren tek bir cihaz diğerlerini düşürmesin
+                continue
+        return devices or None
     except Exception:
         return None
 
 
-async def collect_once() -> None:
+async def collect_once() -> dict[str, Any]:
     ts = _now_utc()
+    randomized: list[str] = []  # random fallback ile yazılan metrikler (alarm motoru bunları gözlem saymaz)
 
     async with SessionLocal() as session:
-        # CPU
+        # CPU (toplam ve çekirdek başına; psutil ikisinin önceki okumasını ayrı tutar)
         cpu_usage = float(psutil.cpu_percent(interval=None))
+        core_usage = [float(v) for v in psutil.cpu_percent(interval=None, percpu=True)]
 
         cpu_temp = _safe_cpu_temp()
         if cpu_temp is None:
             cpu_temp = _rand_float(35.0, 85.0)
             log.info("collector.cpu.temp.randomized", temperature_c=cpu_temp)
+            COLLECTOR_RANDOMIZED.labels(sensor="cpu_temp").inc()
+            randomized.append("cpu.temperature_c")
 
         cpu_freq = _cpu_freq_mhz()
         if cpu_freq is None:
             cpu_freq = _rand_float(1000.0, 5200.0)
             log.info("collector.cpu.freq.randomized", freq_mhz=cpu_freq)
+            COLLECTOR_RANDOMIZED.labels(sensor="cpu_freq").inc()
+            randomized.append("cpu.freq_mhz")
 
         session.add(
             MetricsCPU(
@@ -99,6 +142,9 @@ async def collect_once() -> None:
             )
         )
 
+        if settings.device_metrics_enabled and core_usage:
+            session.add(MetricsCPUCores(ts=ts, usage_percent=core_usage, freq_mhz=_cpu_core_freqs_mhz(len(core_usage))))
+
         # RAM
         vm = psutil.virtual_memory()
         used_mb = int(vm.used / (1024 * 1024))
@@ -114,17 +160,31 @@ async def collect_once() -> None:
             )
         )
 
-        # GPU (NVIDIA yoksa bile random yaz)
-        gpu = _read_gpu_metrics_nvidia()
-        if gpu:
-            util = float(gpu["util"])
-            temp = float(gpu["temp"])
-            mem_used = int(gpu["mem_used"])
+        # GPU (NVIDIA yoksa bile random yaz). Çok GPU'lu makinede metrics_gpu özet satırıdır:
+        # en yüksek kullanım ve sıcaklık, toplam bellek; cihaz bazında değerler metrics_gpu_devices'ta.
+        gpus = _read_gpu_metrics_nvidia()
+        if gpus:
+            util = max(float(g["util"]) for g in gpus)
+            temp = max(float(g["temp"]) for g in gpus)
+            mem_used = sum(int(g["mem_used"]) for g in gpus)
+            if settings.device_metrics_enabled:
+                for g in gpus:
+                    session.add(
+                        MetricsGPUDevice(
+                            ts=ts,
+                            device=g["device"],
+                            utilization_percent=float(g["util"]),
+                            temperature_c=float(g["temp"]),
+                            memory_used_mb=int(g["mem_used"]),
+                        )
+                    )
         else:
             util = _rand_float(0.0, 100.0)
             temp = _rand_float(30.0, 95.0)
             mem_used = _rand_int(0, 16000)
             log.info("collector.gpu.randomized", util=util, temp=temp, mem_used=mem_used)
+            COLLECTOR_RANDOMIZED.labels(sensor="gpu").inc()
+            randomized += ["gpu.utilization_percent", "gpu.temperature_c", "gpu.memory_used_mb"]
 
         session.add(
             MetricsGPU(
@@ -135,25 +195,191 @@ async def collect_once() -> None:
             )
         )
 
+        # Süreçler: sadece CPU'ya ve RSS'e göre ilk N; tarama process_scan_budget_ms ile sınırlı
+        if settings.process_top_n > 0:
+            for proc in sample_top_processes():
+                session.add(MetricsProcess(ts=ts, **proc))
+
+        # Disk/ağ: ilk tick'te (ve sayaç sıfırlandığında) sadece taban alınır, oran yazılmaz
+        if settings.io_metrics_enabled:
+            disks, nics = sample_io_rates()
+            for d in disks:
+                session.add(MetricsDiskIO(ts=ts, **d))
+            for n in nics:
+                session.add(MetricsNetIO(ts=ts, **n))
+
+        # Kolon adları tablolarla aynı; canlı yayın (LISTEN/NOTIFY) ve in-process tüketiciler bunu kullanır
+        sample: dict[str, Any] = {
+            "ts": ts.isoformat(),
+            "cpu": {"usage_percent": cpu_usage, "temperature_c": float(cpu_temp), "freq_mhz": float(cpu_freq)},
+            "ram": {"used_mb": used_mb, "available_mb": avail_mb, "usage_percent": ram_pct},
+            "gpu": {"utilization_percent": util, "temperature_c": temp, "memory_used_mb": mem_used},
+            "randomized": randomized,
+        }
+
+        if settings.live_enabled:
+            # NOTIFY commit ile birlikte teslim edilir; dinleyen API süreci tek bağlantıdan fan-out yapar
+            await session.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": settings.live_channel, "payload": orjson.dumps(sample).decode()},
+            )
+
         await session.commit()
 
-    log.info(
-        "collector.metrics.written",
-        ts=ts.isoformat(),
-        cpu={"usage_percent": cpu_usage, "temperature_c": cpu_temp, "freq_mhz": cpu_freq},
-        ram={"used_mb": used_mb, "available_mb": avail_mb, "usage_percent": ram_pct},
-        gpu={"util": util, "temp": temp, "mem_used": mem_used},
-    )
+    log.info("collector.metrics.written", **sample)
+    return sample
+
+
+async def _prune_detail_tables(session: AsyncSession) -> None:
+    retention: list[tuple[str, int]] = []
+    if settings.process_top_n > 0:
+        retention.append(("metrics_process", settings.process_retention_hours))
+    if settings.device_metrics_enabled:
+        retention += [
+            ("metrics_cpu_cores", settings.device_metrics_retention_hours),
+            ("metrics_gpu_devices", settings.device_metrics_retention_hours),
+        ]
+    if settings.io_metrics_enabled:
+        retention += [
+            ("metrics_disk_io", settings.io_metrics_retention_hours),
+            ("metrics_net_io", settings.io_metrics_retention_hours),
+        ]
+    for table, hours in retention:
+        await session.execute(text(f"DELETE FROM {table} WHERE ts < now() - (:hours * interval '1 hour')"), {"hours": hours})
+    if settings.alert_enabled:
+        # Her kuralın son olayı kalır: get_alerts ve açılıştaki durum devralma aktif alarmı ondan okur
+        await session.execute(
+            text(
+                "DELETE FROM alerts a WHERE a.ts < now() - (:hours * interval '1 hour') "
+                "AND EXISTS (SELECT 1 FROM alerts b WHERE b.rule = a.rule AND b.ts > a.ts)"
+            ),
+            {"hours": settings.alert_retention_hours},
+        )
+    await session.commit()
+
+
+async def _firing_alerts() -> list[dict[str, Any]]:
+    # Son olayı firing olan kurallar (yüklü olmayanlar dahil). Kurallar (rule, ts DESC) index'inde atlanarak gezilir
+    # (skip scan), her kural için son olay tek index lookup'tır; tablo taranmaz
+    async with SessionLocal() as session:
+        res = await session.execute(
+            text(
+                """
+                WITH RECURSIVE r AS (
+                    (SELECT rule FROM alerts ORDER BY rule LIMIT 1)
+                    UNION ALL
+                    SELECT (SELECT rule FROM alerts WHERE rule > r.rule ORDER BY rule LIMIT 1) FROM r WHERE r.rule IS NOT NULL
+                )
+                SELECT a.rule, a.severity, a.metric, a.threshold, a.message
+                FROM r CROSS JOIN LATERAL (
+                    SELECT * FROM alerts WHERE alerts.rule = r.rule ORDER BY ts DESC LIMIT 1
+                ) a
+                WHERE a.state = 'firing'
+                """
+            )
+        )
+        return [dict(row) for row in res.mappings().all()]
+
+
+async def _seed_alerts(loaded: set[str]) -> set[str]:
+    """
+    Yeniden başlatmada aktif kalan alarmlar firing olarak devralınır; yoksa resolved hiç yazılmaz.
+    Kural dosyası kaldırılmış aktif alarmlar bir daha değerlendirilmez: bir kez resolved yazılıp kapatılır.
+    """
+    active = await _firing_alerts()
+    now = _now_utc()
+    orphaned = [
+        {
+            "ts": now, "rule": a["rule"], "severity": a["severity"], "state": "resolved",
+            "metric": a["metric"], "value": None, "threshold": a["threshold"], "message": a["message"],
+        }
+        for a in active
+        if a["rule"] not in loaded
+    ]
+    if orphaned:
+        await dispatch(orphaned)
+    return {a["rule"] for a in active if a["rule"] in loaded}
 
 
 async def run_forever() -> None:
     log.info("collector.start", interval_seconds=settings.metrics_interval_seconds)
 
+    if settings.collector_metrics_port > 0:
+        # Ayrı süreç: kendi küçük exporter'ı (tick süresi, randomized sensör sayaçları, DB pool)
+        start_http_server(settings.collector_metrics_port)
+        log.info("collector.metrics.exporter", port=settings.collector_metrics_port)
+
+    last_rollup_minute: datetime | None = None
+    last_compress_hour: datetime | None = None
+    last_archive_hour: datetime | None = None
+    last_prune_hour: datetime | None = None
+
+    engine: AlertEngine | None = None
+    if settings.alert_enabled:
+        rules = load_rules(Path(settings.alert_rules_dir) if settings.alert_rules_dir else RULES_DIR)
+        firing: set[str] = set()
+        try:
+            firing = await _seed_alerts({r.name for r in rules})
+        except Exception:
+            log.exception("collector.alerts.seed.error")
+        engine = AlertEngine(rules, _now_utc().timestamp(), firing)
+        log.info("collector.alerts.rules", rules=[r.name for r in rules], firing=sorted(firing))
+
     while True:
+        start = time.perf_counter()
+        sample: dict[str, Any] | None = None
         try:
-            await collect_once()
+            sample = await collect_once()
         except Exception:
             log.exception("collector.error")
+        finally:
+            COLLECTOR_TICK_SECONDS.observe(time.perf_counter() - start)
+
+        # Alarmlar bellekteki kural durumlarıyla, sadece bu örnekten değerlendirilir (DB sorgusu yok).
+        # Örnek yazılamadıysa boş gözlem gider: absence kuralları böyle tetiklenir.
+        if engine is not None:
+            ts = datetime.fromisoformat(sample["ts"]) if sample else _now_utc()
+            events = engine.observe(ts, observed_values(sample))
+            if events:
+                await dispatch(events)
+
+        # Dakika değiştiğinde kapanan dakikaların (ve saatlerin) sketch'lerini üret
+        minute = _now_utc().replace(second=0, microsecond=0)
+        if settings.sketch_enabled and minute != last_rollup_minute:
+            try:
+                async with SessionLocal() as session:
+                    await rollup_once(session)
+                last_rollup_minute = minute
+            except Exception:
+                log.exception("collector.sketch_rollup.error")
+
+        # Saat değiştiğinde eski saatleri sıkıştır (sketch rollup'tan sonra: o ham satırları okur)
+        hour = minute.replace(minute=0)
+        if settings.chunk_enabled and hour != last_compress_hour:
+            try:
+                async with SessionLocal() as session:
+                    await compress_once(session)
+                last_compress_hour = hour
+            except Exception:
+                log.exception("collector.chunk_compress.error")
+
+        # Arşiv günlük dosyalar yazar; aynı saat tetikleyicisiyle, sıkıştırmadan sonra
+        if settings.archive_enabled and hour != last_archive_hour:
+            try:
+                async with SessionLocal() as session:
+                    await archive_once(session)
+                last_archive_hour = hour
+            except Exception:
+                log.exception("collector.archive.error")
+
+        # Süreç, çekirdek/cihaz, I/O ve alarm tabloları sıkıştırılmaz/arşivlenmez; saat başı saklama süresinden eskiler silinir
+        if hour != last_prune_hour:
+            try:
+                async with SessionLocal() as session:
+                    await _prune_detail_tables(session)
+                last_prune_hour = hour
+            except Exception:
+                log.exception("collector.prune.error")
         await asyncio.sleep(settings.metrics_interval_seconds)
 
 
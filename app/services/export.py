@@ -0,0 +1,300 @@
+import asyncio
+import time
+import zlib
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, AsyncIterator
+
+import orjson
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.db import ReadSessionLocal
+from app.core.logging import get_logger
+from app.services import archive, chunks
+from app.services.chunks import INT_COLUMNS
+from app.services.metrics_query import FAMILIES
+
+log = get_logger()
+
+FORMATS = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson", "parquet": "application/vnd.apache.parquet"}
+COMPRESSIONS = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+
+
+class ExportError(ValueError):
+    pass
+
+
+class ExportUnavailable(ExportError):
+    # Opsiyonel bağımlılık (pyarrow, zstandard) kurulu değil
+    pass
+
+
+class _Encoder:
+    def __init__(self, compression: str) -> None:
+        self._c: Any = None
+        if compression == "gzip":
+            self._c = zlib.compressobj(6, zlib.DEFLATED, 31)
+        elif compression == "zstd":
+            try:
+                import zstandard
+            except ImportError as e:
+                raise ExportUnavailable("zstd compression requires the zstandard package") from e
+            self._c = zstandard.ZstdCompressor(level=3).compressobj()
+
+    def feed(self, data: bytes) -> bytes:
+        return self._c.compress(data) if self._c is not None else data
+
+    def finish(self) -> bytes:
+        return self._c.flush() if self._c is not None else b""
+
+
+class _ChunkedOutput:
+    """
+    Üretilen byte'ları sıkıştırıp export_chunk_bytes'lık parçalar halinde sınırlı kuyruğa koyar.
+    Kuyruk doluysa (yavaş istemci) write() bekler; COPY de onunla birlikte yavaşlar -> bellek sabit kalır.
+    """
+
+    def __init__(self, queue: "asyncio.Queue[bytes]", compression: str) -> None:
+        self.queue = queue
+        self.encoder = _Encoder(compression)
+        self.buf = bytearray()
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    async def write(self, data: bytes) -> None:
+        self.bytes_in += len(data)
+        self.buf += self.encoder.feed(bytes(data))
+        if len(self.buf) >= settings.export_chunk_bytes:
+            await self._emit()
+
+    async def _emit(self) -> None:
+        if self.buf:
+            self.bytes_out += len(self.buf)
+            await self.queue.put(bytes(self.buf))
+            self.buf.clear()
+
+    async def close(self) -> None:
+        self.buf += self.encoder.finish()
+        await self._emit()
+
+
+class _ParquetSink:
+    # pyarrow ParquetWriter'ın yazdığı file-like; byte'lar her batch'ten sonra _ChunkedOutput'a aktarılır
+    def __init__(self) -> None:
+        self.pending = bytearray()
+        self.pos = 0
+        self.closed = False
+
+    def write(self, data: Any) -> int:
+        b = bytes(data)
+        self.pending += b
+        self.pos += len(b)
+        return len(b)
+
+    def tell(self) -> int:
+        return self.pos
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def take(self) -> bytes:
+        out = bytes(self.pending)
+        self.pending.clear()
+        return out
+
+
+def _archive_end(days: list[date]) -> datetime | None:
+    # Arşiv her zaman en eski günlerden başlar (archive_family): bu andan önceki her şey dosyalardadır
+    if not days:
+        return None
+    return datetime(days[-1].year, days[-1].month, days[-1].day, tzinfo=timezone.utc) + timedelta(days=1)
+
+
+async def _history_batches(
+    session: AsyncSession, family: str, ts_from: datetime, ts_to: datetime, days: list[date]
+) -> AsyncIterator[list[tuple[Any, ...]]]:
+    """
+    Parquet arşivi + metrics_chunks'taki örnekler, gün gün (bellekte en fazla bir günlük satır).
+    Arşivlenmiş gün sadece dosyadan okunur: dosya DB silmesinden önce yazılır, snapshot'ta aynı satırlar hâlâ görünebilir.
+    """
+    res = await session.execute(text("SELECT max(last_ts) FROM metrics_chunks WHERE family = :f"), {"f": family})
+    end = res.scalar()
+    archive_end = _archive_end(days)
+    if archive_end is not None:
+        end = archive_end if end is None else max(end, archive_end)
+    if end is None or end < ts_from:
+        return
+
+    archived = set(days)
+    stop = min(ts_to, end + timedelta(microseconds=1))
+    day = ts_from.astimezone(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    while day < stop:
+        lo, hi = max(ts_from, day), min(stop, day + timedelta(days=1))
+        if day.date() in archived:
+            rows = await archive.read_range(family, lo, hi)
+        else:
+            rows = await chunks.read_range(session, family, lo, hi)
+        if rows:
+            yield rows
+        day += timedelta(days=1)
+
+
+def _raw_from(ts_from: datetime, days: list[date]) -> datetime:
+    # Ham kısım arşivlenmiş günlerin bitişinden başlar (arşivlenirken snapshot'ta kalan satırlar iki kez gelmesin)
+    archive_end = _archive_end(days)
+    return ts_from if archive_end is None else max(ts_from, archive_end)
+
+
+def _csv_lines(rows: list[tuple[Any, ...]]) -> bytes:
+    # COPY ... csv çıktısıyla aynı biçim: ISO ts (UTC), Python/Postgres'in en kısa float gösterimi
+    return "".join(",".join([r[0].isoformat(), *(str(v) for v in r[1:])]) + "\n" for r in rows).encode()
+
+
+def _ndjson_lines(family: str, columns: tuple[str, ...], rows: list[tuple[Any, ...]]) -> bytes:
+    return b"".join(orjson.dumps({"family": family, "ts": r[0], **dict(zip(columns, r[1:]))}) + b"\n" for r in rows)
+
+
+async def _export_text(session: AsyncSession, pg: Any, out: _ChunkedOutput, fmt: str, families: list[str], ts_from: datetime, ts_to: datetime) -> None:
+    for family in families:
+        table, columns = FAMILIES[family]
+        if fmt == "csv":
+            await out.write((",".join(["ts", *columns]) + "\n").encode())
+
+        days = await archive.archived_days(family)
+        async for rows in _history_batches(session, family, ts_from, ts_to, days):
+            await out.write(_csv_lines(rows) if fmt == "csv" else _ndjson_lines(family, columns, rows))
+        raw_from = _raw_from(ts_from, days)
+
+        # Ham kısım doğrudan Postgres'ten: COPY ... TO STDOUT, satırlar Python'a nesne olarak hiç gelmez
+        if fmt == "csv":
+            query = f"SELECT to_json(ts) #>> '{{}}', {', '.join(columns)} FROM {table} WHERE ts >= $1 AND ts < $2 ORDER BY ts"
+            await pg.copy_from_query(query, raw_from, ts_to, output=out.write, format="csv")
+        else:
+            # text COPY sadece ters bölü/kontrol karakterlerini kaçırır; sayı+timestamp JSON'unda bunlar yok
+            fields = ", ".join(f"'{c}', {c}" for c in columns)
+            query = (
+                f"SELECT json_build_object('family', '{family}', 'ts', ts, {fields}) "
+                f"FROM {table} WHERE ts >= $1 AND ts < $2 ORDER BY ts"
+            )
+            await pg.copy_from_query(query, raw_from, ts_to, output=out.write, format="text")
+
+
+async def _export_parquet(session: AsyncSession, pg: Any, out: _ChunkedOutput, family: str, ts_from: datetime, ts_to: datetime) -> None:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ExportUnavailable("Parquet export requires pyarrow") from e
+
+    table, columns = FAMILIES[family]
+    fields = [pa.field("ts", pa.timestamp("us", tz="UTC"), nullable=False)]
+    fields += [pa.field(c, pa.int32() if c in INT_COLUMNS else pa.float64(), nullable=False) for c in columns]
+    schema = pa.schema(fields)
+
+    sink = _ParquetSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+
+    async def write_rows(rows: list[tuple[Any, ...]]) -> None:
+        arrays = [pa.array([r[i] for r in rows], type=f.type) for i, f in enumerate(fields)]
+        await asyncio.to_thread(writer.write_batch, pa.RecordBatch.from_arrays(arrays, schema=schema))
+        await out.write(sink.take())
+
+    days = await archive.archived_days(family)
+    async for rows in _history_batches(session, family, ts_from, ts_to, days):
+        await write_rows(rows)
+
+    # Server-side cursor: her seferinde export_batch_rows satır (bir row group)
+    batch: list[tuple[Any, ...]] = []
+    query = f"SELECT ts, {', '.join(columns)} FROM {table} WHERE ts >= $1 AND ts < $2 ORDER BY ts"
+    async for r in pg.cursor(query, _raw_from(ts_from, days), ts_to, prefetch=settings.export_batch_rows):
+        batch.append(tuple(r))
+        if len(batch) >= settings.export_batch_rows:
+            await write_rows(batch)
+            batch = []
+    if batch:
+        await write_rows(batch)
+
+    writer.close()
+    await out.write(sink.take())
+
+
+async def _produce(out: _ChunkedOutput, fmt: str, families: list[str], ts_from: datetime, ts_to: datetime) -> None:
+    async with ReadSessionLocal() as session:
+        # Tüm okumalar tek snapshot'tan: chunk okuması ile ham COPY arasında compress_once commit ederse
+        # READ COMMITTED'da taşınan saat ikisinde de görünmez. İzolasyon transaction'ın ilk komutu olmalı.
+        await session.execute(text("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY"))
+        # COPY/cursor asyncpg bağlantısında, SQLAlchemy'nin açtığı transaction içinde çalışır
+        await session.execute(text("SET LOCAL TimeZone = 'UTC'"))
+        conn = await session.connection()
+        raw = await conn.get_raw_connection()
+        pg = raw.driver_connection
+
+        if fmt == "parquet":
+            await _export_parquet(session, pg, out, families[0], ts_from, ts_to)
+        else:
+            await _export_text(session, pg, out, fmt, families, ts_from, ts_to)
+    await out.close()
+
+
+def validate_export(fmt: str, compression: str, families: list[str]) -> None:
+    if fmt not in FORMATS:
+        raise ExportError(f"Unsupported format: {fmt}")
+    if compression not in COMPRESSIONS:
+        raise ExportError(f"Unsupported compression: {compression}")
+    if not families or any(f not in FAMILIES for f in families):
+        raise ExportError(f"family must be a comma separated subset of {sorted(FAMILIES)}")
+    if fmt in {"csv", "parquet"} and len(families) != 1:
+        raise ExportError(f"{fmt} export supports exactly one family")
+    if fmt == "parquet" and compression != "none":
+        raise ExportError("parquet is already compressed internally; use compression=none")
+    if compression == "zstd":
+        _Encoder("zstd")
+    if fmt == "parquet":
+        try:
+            import pyarrow.parquet  # noqa: F401
+        except ImportError as e:
+            raise ExportUnavailable("Parquet export requires pyarrow") from e
+
+
+async def stream_export(fmt: str, compression: str, families: list[str], ts_from: datetime, ts_to: datetime) -> AsyncIterator[bytes]:
+    """
+    Üretici (DB -> format -> sıkıştırma) ayrı task'ta çalışır; aradaki kuyruk export_queue_chunks parça ile sınırlı.
+    İstemci koparsa generator kapanır ve üretici iptal edilir (COPY/cursor ile birlikte).
+    """
+    start = time.perf_counter()
+    queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize=settings.export_queue_chunks)
+    out = _ChunkedOutput(queue, compression)
+    producer = asyncio.create_task(_produce(out, fmt, families, ts_from, ts_to))
+    getter: asyncio.Future[bytes] | None = None
+    try:
+        while True:
+            getter = asyncio.ensure_future(queue.get())
+            await asyncio.wait({getter, producer}, return_when=asyncio.FIRST_COMPLETED)
+            if getter.done():
+                yield getter.result()
+                continue
+            getter.cancel()
+            while not queue.empty():
+                yield queue.get_nowait()
+            producer.result()  # üreticideki hatayı yüzeye çıkar
+            break
+        log.info(
+            "export.done",
+            format=fmt,
+            compression=compression,
+            families=families,
+            bytes_raw=out.bytes_in,
+            bytes_sent=out.bytes_out,
+            ms=int((time.perf_counter() - start) * 1000),
+        )
+    finally:
+        # İstemci yield'de koparsa (GeneratorExit) veya üretici önce biterse bekleyen queue.get() kalmasın
+        if getter is not None and not getter.done():
+            getter.cancel()
+        if not producer.done():
+            producer.cancel()
+            log.info("export.cancelled", format=fmt, families=families, bytes_sent=out.bytes_out)
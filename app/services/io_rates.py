@@ -0,0 +1,170 @@
+import re
+import time
+from typing import Any, Callable
+
+import psutil
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+log = get_logger()
+
+_NAME_MAX = 32
+_PARTITION_RE = re.compile(r"^(?P<disk>.+?)(?:p)?\d+$")
+
+# (psutil alanı, çıktı alanı); çıktı saniye başına oran
+_DISK_FIELDS = (
+    ("read_bytes", "read_bytes_per_s"),
+    ("write_bytes", "write_bytes_per_s"),
+    ("read_count", "read_iops"),
+    ("write_count", "write_iops"),
+)
+_NET_FIELDS = (
+    ("bytes_recv", "rx_bytes_per_s"),
+    ("bytes_sent", "tx_bytes_per_s"),
+    ("packets_recv", "rx_packets_per_s"),
+    ("packets_sent", "tx_packets_per_s"),
+)
+
+
+def _prefixes(raw: str) -> tuple[str, ...]:
+    return tuple(p.strip() for p in raw.split(",") if p.strip())
+
+
+def _counter_delta(cur: int, prev: int) -> int | None:
+    """
+    Monoton sayaç farkı. Geri gitmişse sayaç sıfırlanmıştır (cihaz yeniden takıldı, arayüz yeniden oluşturuldu)
+    ve bu aralık için oran yoktur. psutil nowrap=True kendi süreci içindeki taşmaları zaten düzeltir; burada
+    taşma tahmini yapılmaz, yanlış tahmin sahte bir tepe olarak yazılırdı.
+    """
+    if cur >= prev:
+        return cur - prev
+    return None
+
+
+def _whole_disks(names: list[str]) -> list[str]:
+    # Linux perdisk hem diski (sda, nvme0n1) hem bölümlerini (sda1, nvme0n1p1) döndürür; bölümler toplamı ikiye katlar
+    present = set(names)
+    out = []
+    for name in names:
+        m = _PARTITION_RE.match(name)
+        if m and m.group("disk") in present and m.group("disk") != name:
+            continue
+        out.append(name)
+    return out
+
+
+class _Counters:
+    __slots__ = ("values", "at")
+
+    def __init__(self, values: dict[str, int], at: float) -> None:
+        self.values = values
+        self.at = at
+
+
+class IORateTracker:
+    """
+    Disk ve ağ sayaçlarından aralık başına oranlar (bytes/s, IOPS, paket/s).
+
+    Ham sayaçlar DB'ye yazılmaz: her cihaz/arayüz için bir önceki okuma bellekte tutulur ve yalnızca
+    (şimdi - önceki) / geçen süre yazılır. Okuma anında pencere fonksiyonu (lag) gerekmez, satırlar küçük kalır.
+    Bir cihazın ilk görüldüğü tick'te (ve sayaç sıfırlandığında) oran üretilmez, sadece taban alınır.
+    """
+
+    def __init__(self) -> None:
+        self._disks: dict[str, _Counters] = {}
+        self._nics: dict[str, _Counters] = {}
+
+    @staticmethod
+    def _rates(
+        state: dict[str, _Counters],
+        key: str,
+        current: dict[str, dict[str, int]],
+        fields: tuple[tuple[str, str], ...],
+        now: float,
+        extra: Callable[[dict[str, int], dict[str, int], float], dict[str, float | None]] | None = None,
+    ) -> list[dict[str, Any]]:
+        for name in [n for n in state if n not in current]:
+            del state[name]
+
+        out: list[dict[str, Any]] = []
+        for name, values in current.items():
+            prev = state.get(name)
+            state[name] = _Counters(values, now)
+            if prev is None or now <= prev.at:
+                continue
+            dt = now - prev.at
+            row: dict[str, Any] = {}
+            for src, dst in fields:
+                d = _counter_delta(values[src], prev.values[src])
+                if d is None:
+                    log.info("collector.io.counter_reset", device=name, counter=src)
+                    row = {}
+                    break
+                row[dst] = round(d / dt, 1)
+            if not row:
+                continue
+            if extra is not None:
+                row.update(extra(values, prev.values, dt))
+            out.append({key: name, **row})
+        return out
+
+    def sample_disks(self, now: float) -> list[dict[str, Any]]:
+        try:
+            raw = psutil.disk_io_counters(perdisk=True) or {}
+        except Exception:
+            return []
+        exclude = _prefixes(settings.io_disk_exclude_prefixes)
+        names = _whole_disks([n for n in raw if not n.startswith(exclude)])
+        current: dict[str, dict[str, int]] = {}
+        for name in names:
+            c = raw[name]
+            values = {src: int(getattr(c, src)) for src, _ in _DISK_FIELDS}
+            busy = getattr(c, "busy_time", None)  # Linux/FreeBSD; ms
+            if busy is not None:
+                values["busy_time"] = int(busy)
+            current[name[:_NAME_MAX]] = values
+
+        def busy_percent(cur: dict[str, int], prev: dict[str, int], dt: float) -> dict[str, float | None]:
+            if "busy_time" not in cur or "busy_time" not in prev:
+                return {"busy_percent": None}
+            d = _counter_delta(cur["busy_time"], prev["busy_time"])
+            return {"busy_percent": None if d is None else round(min(100.0, d / (dt * 1000.0) * 100.0), 1)}
+
+        return self._rates(self._disks, "device", current, _DISK_FIELDS, now, busy_percent)
+
+    def sample_nics(self, now: float) -> list[dict[str, Any]]:
+        try:
+            raw = psutil.net_io_counters(pernic=True) or {}
+        except Exception:
+            return []
+        exclude = _prefixes(settings.io_nic_exclude_prefixes)
+        current: dict[str, dict[str, int]] = {}
+        for name, c in raw.items():
+            if name.startswith(exclude):
+                continue
+            values = {src: int(getattr(c, src)) for src, _ in _NET_FIELDS}
+            values["errors"] = int(c.errin) + int(c.errout)
+            values["drops"] = int(c.dropin) + int(c.dropout)
+            current[name[:_NAME_MAX]] = values
+
+        def errors(cur: dict[str, int], prev: dict[str, int], dt: float) -> dict[str, float | None]:
+            e = _counter_delta(cur["errors"], prev["errors"])
+            d = _counter_delta(cur["drops"], prev["drops"])
+            return {
+                "errors_per_s": None if e is None else round(e / dt, 2),
+                "drops_per_s": None if d is None else round(d / dt, 2),
+            }
+
+        return self._rates(self._nics, "nic", current, _NET_FIELDS, now, errors)
+
+    def sample(self) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+        now = time.monotonic()
+        return self.sample_disks(now), self.sample_nics(now)
+
+
+tracker = IORateTracker()
+
+
+def sample_io_rates() -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    return tracker.sample()
@@ -0,0 +1,143 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable
+
+import asyncpg
+import orjson
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+log = get_logger()
+
+
+class Frame:
+    """Bir örnek; tüm abonelere aynı serileştirilmiş byte'lar gider."""
+
+    __slots__ = ("payload", "sse", "arrived")
+
+    def __init__(self, payload: str) -> None:
+        self.payload = payload
+        self.sse = f"event: sample\ndata: {payload}\n\n".encode("utf-8")
+        self.arrived = time.monotonic()
+
+
+class Subscriber:
+    def __init__(self, min_interval_seconds: float = 0.0) -> None:
+        # maxsize=1: yavaş tüketici için bekleyen eski frame yenisiyle değiştirilir
+        self.queue: asyncio.Queue[Frame] = asyncio.Queue(maxsize=1)
+        self.min_interval_seconds = min_interval_seconds
+        self._last_accepted = 0.0
+        self.dropped = 0
+
+    def offer(self, frame: Frame) -> None:
+        # Sunucu tarafı downsampling: abonelik başına en fazla 1 frame / min_interval
+        if self.min_interval_seconds > 0 and frame.arrived - self._last_accepted < self.min_interval_seconds:
+            return
+        self._last_accepted = frame.arrived
+        if self.queue.full():
+            try:
+                self.queue.get_nowait()
+                self.dropped += 1
+            except asyncio.QueueEmpty:
+                pass
+        self.queue.put_nowait(frame)
+
+
+class LiveHub:
+    """
+    Tek bir Postgres LISTEN bağlantısı; gelen her örnek bir kez serileştirilip tüm abonelere dağıtılır.
+    In-process tüketiciler (ör. rolling window store) add_sink ile parse edilmiş örneği alır;
+    add_connect_hook ile her (yeniden) bağlanmada kaçırılan örnekleri DB'den tamamlayabilir.
+    """
+
+    def __init__(self) -> None:
+        self.subscribers: set[Subscriber] = set()
+        self._sinks: list[Callable[[dict[str, Any]], None]] = []
+        self._connect_hooks: list[Callable[[], Awaitable[None]]] = []
+        self._task: asyncio.Task | None = None
+        self.last_frame_at: float | None = None
+        self.frames_total = 0
+
+    def subscribe(self, min_interval_seconds: float = 0.0) -> Subscriber:
+        sub = Subscriber(min_interval_seconds)
+        self.subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        self.subscribers.discard(sub)
+
+    def add_sink(self, fn: Callable[[dict[str, Any]], None]) -> None:
+        self._sinks.append(fn)
+
+    def add_connect_hook(self, fn: Callable[[], Awaitable[None]]) -> None:
+        self._connect_hooks.append(fn)
+
+    async def _run_connect_hooks(self) -> None:
+        for fn in self._connect_hooks:
+            try:
+                await fn()
+            except Exception:
+                log.exception("live.connect_hook.error")
+
+    def publish(self, payload: str) -> None:
+        frame = Frame(payload)
+        self.last_frame_at = frame.arrived
+        self.frames_total += 1
+        for sub in self.subscribers:
+            sub.offer(frame)
+
+        if self._sinks:
+            sample = orjson.loads(payload)
+            for fn in self._sinks:
+                try:
+                    fn(sample)
+                except Exception:
+                    log.exception("live.sink.error")
+
+    def _on_notify(self, conn: Any, pid: int, channel: str, payload: str) -> None:
+        self.publish(payload)
+
+    async def _listen_forever(self) -> None:
+        # Transaction modundaki pooler NOTIFY'ı LISTEN eden oturuma teslim etmez; doğrudan Postgres'e bağlanılır
+        dsn = (settings.live_listen_url or settings.database_url_async).replace("postgresql+asyncpg://", "postgresql://", 1)
+        backoff = 1.0
+        while True:
+            conn: asyncpg.Connection | None = None
+            try:
+                conn = await asyncpg.connect(dsn)
+                closed = asyncio.Event()
+                conn.add_termination_listener(lambda _c: closed.set())
+                await conn.add_listener(settings.live_channel, self._on_notify)
+                log.info("live.listen.started", channel=settings.live_channel)
+                backoff = 1.0
+                # LISTEN aktif olduktan sonra: arada gelen örnekler sink'lere düşer, boşluk kalmaz
+                hooks = asyncio.create_task(self._run_connect_hooks())
+                await closed.wait()
+                hooks.cancel()
+                log.warning("live.listen.connection_lost")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                log.exception("live.listen.error")
+            finally:
+                if conn is not None and not conn.is_closed():
+                    await conn.close()
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+    def start(self) -> None:
+        if self._task is None and settings.live_enabled:
+            self._task = asyncio.create_task(self._listen_forever())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+hub = LiveHub()
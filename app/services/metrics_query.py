@@ -0,0 +1,203 @@
+import heapq
+import itertools
+import re
+from contextlib import aclosing
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# family -> (tablo, değer kolonları). SQL'e sadece bu whitelist'ten isim girer.
+FAMILIES: dict[str, tuple[str, tuple[str, ...]]] = {
+    "cpu": ("metrics_cpu", ("usage_percent", "temperature_c", "freq_mhz")),
+    "ram": ("metrics_ram", ("used_mb", "available_mb", "usage_percent")),
+    "gpu": ("metrics_gpu", ("utilization_percent", "temperature_c", "memory_used_mb")),
+}
+
+AGGREGATES = {"avg", "max", "min"}
+
+# date_bin origin'i ile aynı (Python tarafında bucket'lanan chunk/arşiv satırları için)
+_BIN_ORIGIN = datetime(2000, 1, 1, tzinfo=timezone.utc).timestamp()
+
+_BUCKET_RE = re.compile(r"^(\d+)\s*(s|m|h|d)?$")
+_UNIT_SECONDS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_bucket(raw: str | None) -> int | None:
+    """'30s', '5m', '1h', '1d' veya saniye -> saniye. None -> ham örnekler."""
+    if raw is None or raw == "":
+        return None
+    m = _BUCKET_RE.match(raw.strip().lower())
+    if not m:
+        raise ValueError(f"Invalid bucket: {raw}")
+    seconds = int(m.group(1)) * _UNIT_SECONDS[m.group(2) or "s"]
+    if seconds <= 0:
+        raise ValueError(f"Invalid bucket: {raw}")
+    return seconds
+
+
+async def latest_ts(session: AsyncSession, family: str) -> datetime | None:
+    table, _ = FAMILIES[family]
+    # ix_metrics_*_ts_cover üzerinden tek index lookup (son sayfa)
+    res = await session.execute(text(f"SELECT max(ts) FROM {table}"))
+    ts = res.scalar()
+    if ts is None:
+        # Ham tablo boşsa (hepsi sıkıştırılmış) son chunk
+        res = await session.execute(text("SELECT max(last_ts) FROM metrics_chunks WHERE family = :f"), {"f": family})
+        ts = res.scalar()
+    return ts
+
+
+async def query_columns(
+    session: AsyncSession,
+    family: str,
+    ts_from: datetime,
+    ts_to: datetime,
+    bucket_seconds: int | None,
+    agg: str,
+    limit: int,
+) -> dict[str, list[Any]]:
+    """
+    Zaman aralığını kolon bazlı döndürür: {"ts": [epoch_ms...], "<kolon>": [...]}.
+    Tool SQL'leri gibi `ts` range'i üzerinden ix_metrics_*_ts_cover index'ini kullanır.
+    Aralık sıkıştırılmış geçmişe (metrics_chunks) veya Parquet arşivine uzanıyorsa o kısımlar okunup ham satırlarla birleştirilir.
+    """
+    # chunks/archive modülleri FAMILIES'i buradan import ediyor; döngüsel import olmasın diye burada
+    from app.services import archive, chunks
+
+    table, columns = FAMILIES[family]
+    if bucket_seconds is not None and agg not in AGGREGATES:
+        raise ValueError(f"Invalid agg: {agg}")
+
+    if await archive.has_range(family, ts_from, ts_to) or await chunks.has_range(session, family, ts_from, ts_to):
+        # Her kaynak ts sırasıyla okunur ve kendi içinde ilk `limit` satır/bucket'ta durur; sonucun ilk `limit`'i
+        # bu alt kümelerin birleşimindedir. Aylık bir aralık için bile bellekte en fazla ~3 x limit satır/bucket olur.
+        sources = [archive.iter_range(family, ts_from, ts_to), chunks.iter_range(session, family, ts_from, ts_to)]
+        if bucket_seconds is None:
+            parts = [await _first_rows(src, limit) for src in sources]
+            res = await session.execute(
+                text(f"SELECT ts, {', '.join(columns)} FROM {table} WHERE ts >= :ts_from AND ts < :ts_to ORDER BY ts LIMIT :limit"),
+                {"ts_from": ts_from, "ts_to": ts_to, "limit": limit},
+            )
+            parts.append([tuple(r) for r in res.all()])
+            merged = list(itertools.islice(heapq.merge(*parts, key=lambda r: r[0]), limit))
+            return _as_columns(merged, columns)
+
+        partials = [await _first_buckets(src, bucket_seconds, agg, limit) for src in sources]
+        partials.append(await _raw_buckets(session, table, columns, ts_from, ts_to, bucket_seconds, agg, limit))
+        return _as_columns(_merge_buckets(partials, agg, limit), columns)
+
+    if bucket_seconds is None:
+        sql = (
+            f"SELECT ts, {', '.join(columns)} FROM {table} "
+            "WHERE ts >= :ts_from AND ts < :ts_to ORDER BY ts LIMIT :limit"
+        )
+        params: dict[str, Any] = {"ts_from": ts_from, "ts_to": ts_to, "limit": limit}
+    else:
+        # Integer kolonlarda avg() numeric döner (asyncpg -> Decimal; orjson/Arrow serialize edemez); her aggregate float8
+        selects = ", ".join(f"{agg}({c})::float8 AS {c}" for c in columns)
+        sql = (
+            f"SELECT date_bin(make_interval(secs => :bucket), ts, TIMESTAMPTZ '2000-01-01') AS ts, {selects} "
+            f"FROM {table} WHERE ts >= :ts_from AND ts < :ts_to "
+            "GROUP BY 1 ORDER BY 1 LIMIT :limit"
+        )
+        params = {"ts_from": ts_from, "ts_to": ts_to, "limit": limit, "bucket": bucket_seconds}
+
+    res = await session.execute(text(sql), params)
+    return _as_columns(res.all(), columns)
+
+
+def _as_columns(rows: Any, columns: tuple[str, ...]) -> dict[str, list[Any]]:
+    out: dict[str, list[Any]] = {"ts": [int(r[0].timestamp() * 1000) for r in rows]}
+    for i, c in enumerate(columns, start=1):
+        out[c] = [r[i] for r in rows]
+    return out
+
+
+# Kısmi bucket: [örnek sayısı, kolon başına toplam (avg) veya max/min]; kaynaklar arası birleştirilebilir
+_Partial = list[Any]
+
+
+async def _first_rows(batches: AsyncIterator[list[tuple[Any, ...]]], limit: int) -> list[tuple[Any, ...]]:
+    out: list[tuple[Any, ...]] = []
+    async with aclosing(batches):
+        async for rows in batches:
+            out.extend(rows)
+            if len(out) >= limit:
+                break
+    return out[:limit]
+
+
+async def _first_buckets(
+    batches: AsyncIterator[list[tuple[Any, ...]]], bucket_seconds: int, agg: str, limit: int
+) -> dict[float, _Partial]:
+    # SQL'deki date_bin + GROUP BY'ın Python karşılığı; kaynak ts sıralı olduğu için limit+1'inci bucket görülünce durulur
+    out: dict[float, _Partial] = {}
+    async with aclosing(batches):
+        async for rows in batches:
+            for r in rows:
+                t = r[0].timestamp()
+                b = _BIN_ORIGIN + ((t - _BIN_ORIGIN) // bucket_seconds) * bucket_seconds
+                acc = out.get(b)
+                if acc is None:
+                    if len(out) >= limit:
+                        return out
+                    out[b] = [1, *r[1:]]
+                    continue
+                acc[0] += 1
+                for i in range(1, len(acc)):
+                    acc[i] = _combine(agg, acc[i], r[i])
+    return out
+
+
+async def _raw_buckets(
+    session: AsyncSession,
+    table: str,
+    columns: tuple[str, ...],
+    ts_from: datetime,
+    ts_to: datetime,
+    bucket_seconds: int,
+    agg: str,
+    limit: int,
+) -> dict[float, _Partial]:
+    # avg kaynaklar arası ağırlıklı birleşsin diye ham tablodan sum + count alınır
+    fn = "sum" if agg == "avg" else agg
+    selects = ", ".join(f"{fn}({c})::float8" for c in columns)
+    res = await session.execute(
+        text(
+            f"SELECT date_bin(make_interval(secs => :bucket), ts, TIMESTAMPTZ '2000-01-01') AS b, count(*), {selects} "
+            f"FROM {table} WHERE ts >= :ts_from AND ts < :ts_to GROUP BY 1 ORDER BY 1 LIMIT :limit"
+        ),
+        {"ts_from": ts_from, "ts_to": ts_to, "limit": limit, "bucket": bucket_seconds},
+    )
+    return {r[0].timestamp(): list(r[1:]) for r in res.all()}
+
+
+def _combine(agg: str, a: Any, b: Any) -> Any:
+    if agg == "avg":
+        return a + b
+    if agg == "max":
+        return a if a >= b else b
+    return a if a <= b else b
+
+
+def _merge_buckets(partials: list[dict[float, _Partial]], agg: str, limit: int) -> list[tuple[Any, ...]]:
+    merged: dict[float, _Partial] = {}
+    for part in partials:
+        for b, p in part.items():
+            acc = merged.get(b)
+            if acc is None:
+                merged[b] = list(p)
+                continue
+            acc[0] += p[0]
+            for i in range(1, len(acc)):
+                acc[i] = _combine(agg, acc[i], p[i])
+
+    out: list[tuple[Any, ...]] = []
+    for b in sorted(merged)[:limit]:
+        n, *values = merged[b]
+        if agg == "avg":
+            values = [v / n for v in values]
+        out.append((datetime.fromtimestamp(b, tz=timezone.utc), *values))
+    return out
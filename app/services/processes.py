@@ -0,0 +1,129 @@
+import heapq
+import time
+from bisect import bisect_right
+from typing import Any
+
+import psutil
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import COLLECTOR_PROCESS_SCAN_SECONDS, COLLECTOR_PROCESS_SCAN_TRUNCATED
+
+log = get_logger()
+
+_MB = 1024 * 1024
+_NAME_MAX = 64
+
+
+class _Proc:
+    __slots__ = ("proc", "name", "cpu_total", "seen_at", "cpu_percent", "rss_mb")
+
+    def __init__(self, proc: psutil.Process, name: str) -> None:
+        self.proc = proc
+        self.name = name
+        self.cpu_total: float | None = None
+        self.seen_at = 0.0
+        self.cpu_percent: float | None = None
+        self.rss_mb = 0
+
+
+class ProcessSampler:
+    """
+    Tick başına top-N süreç örnekleyicisi.
+
+    psutil.process_iter her süreç için yeni Process nesnesi kurar ve istenen tüm alanları okur;
+    burada Process nesnesi ve ad süreç yaşadıkça bir kez oluşturulur, her ziyarette kimlik
+    (pid + create_time, is_running) doğrulanıp cpu_times + memory_info okunur (Linux'ta oneshot ile
+    /proc/<pid>/stat + statm). Pid başka bir sürece geçmişse eski ad ve CPU sayacı atılır.
+    CPU yüzdesi iki ziyaret arasındaki CPU zamanı farkından hesaplanır (100 = bir çekirdek, top gibi).
+
+    Tarama süresi process_scan_budget_ms ile sınırlıdır: önce bir önceki tick'in top süreçleri tazelenir,
+    kalan bütçe diğer pid'leri kaldığı yerden sırayla gezer. Bütçe dolduğunda ziyaret edilmeyen süreçler
+    son ölçülen değerleriyle sıralamaya girer.
+    """
+
+    def __init__(self) -> None:
+        self._procs: dict[int, _Proc] = {}
+        self._hot: list[int] = []
+        self._cursor = -1  # round-robin: en son ziyaret edilen "soğuk" pid
+
+    def _refresh(self, pid: int, now: float) -> None:
+        entry = self._procs.get(pid)
+        try:
+            if entry is not None and not entry.proc.is_running():
+                # pid iki tarama arasında yeniden kullanılmış (create_time değişmiş); süreci yeniden tanı
+                entry = None
+            if entry is None:
+                p = psutil.Process(pid)
+                with p.oneshot():
+                    entry = _Proc(p, p.name()[:_NAME_MAX] or str(pid))
+                self._procs[pid] = entry
+            with entry.proc.oneshot():
+                t = entry.proc.cpu_times()
+                rss = entry.proc.memory_info().rss
+        except (psutil.NoSuchProcess, psutil.ZombieProcess, psutil.AccessDenied):
+            self._procs.pop(pid, None)
+            return
+
+        total = t.user + t.system
+        if entry.cpu_total is not None and now > entry.seen_at:
+            entry.cpu_percent = (total - entry.cpu_total) / (now - entry.seen_at) * 100.0
+        entry.cpu_total = total
+        entry.seen_at = now
+        entry.rss_mb = int(rss / _MB)
+
+    def sample(self, top_n: int, budget_ms: float) -> list[dict[str, Any]]:
+        start = time.perf_counter()
+        deadline = start + budget_ms / 1000.0
+
+        pids = psutil.pids()  # sadece /proc dizin listesi; ucuz
+        alive = set(pids)
+        for pid in [p for p in self._procs if p not in alive]:
+            del self._procs[pid]
+
+        hot = [p for p in self._hot if p in alive]
+        hot_set = set(hot)
+        cold = sorted(p for p in pids if p not in hot_set)
+        i = bisect_right(cold, self._cursor)
+        order = hot + cold[i:] + cold[:i]
+
+        visited = 0
+        for pid in order:
+            if visited and time.perf_counter() >= deadline:
+                break
+            self._refresh(pid, time.monotonic())
+            visited += 1
+            if pid not in hot_set:
+                self._cursor = pid
+
+        elapsed = time.perf_counter() - start
+        COLLECTOR_PROCESS_SCAN_SECONDS.observe(elapsed)
+        if visited < len(order):
+            COLLECTOR_PROCESS_SCAN_TRUNCATED.inc()
+            log.debug("collector.processes.budget", visited=visited, total=len(order), ms=int(elapsed * 1000))
+
+        entries = list(self._procs.values())
+        # Boşta bekleyen (%0) süreçler CPU sıralamasına girmez; yoksa liste kernel thread'leriyle dolar
+        by_cpu = heapq.nlargest(top_n, (e for e in entries if e.cpu_percent), key=lambda e: e.cpu_percent)
+        by_rss = heapq.nlargest(top_n, entries, key=lambda e: e.rss_mb)
+
+        picked: dict[int, _Proc] = {}
+        for e in by_cpu + by_rss:
+            picked.setdefault(e.proc.pid, e)
+        self._hot = list(picked)
+        return [
+            {
+                "pid": pid,
+                "name": e.name,
+                "cpu_percent": round(e.cpu_percent, 1) if e.cpu_percent is not None else None,
+                "rss_mb": e.rss_mb,
+            }
+            for pid, e in picked.items()
+        ]
+
+
+sampler = ProcessSampler()
+
+
+def sample_top_processes() -> list[dict[str, Any]]:
+    return sampler.sample(settings.process_top_n, settings.process_scan_budget_ms)
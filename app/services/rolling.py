@@ -0,0 +1,177 @@
+import asyncio
+import bisect
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.core.logging import get_logger
+from app.services.metrics_query import FAMILIES
+
+log = get_logger()
+
+
+class MetricWindow:
+    """
+    Tek bir kolon için sınırlı ring buffer + monotonic deque'ler.
+    maxq değerleri azalan, minq artan sırada tutar; her ikisi de ts'e göre sıralı olduğundan
+    herhangi bir "son X dakika" penceresinin max/min'i ts >= başlangıç olan ilk elemandır.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.ts: deque[float] = deque(maxlen=capacity)
+        self.prefix: deque[float] = deque(maxlen=capacity)  # avg için: örnekten önceki kümülatif toplam
+        self.maxq: deque[tuple[float, float]] = deque()
+        self.minq: deque[tuple[float, float]] = deque()
+        self._total = 0.0
+
+    def push(self, ts: float, value: float) -> None:
+        if self.ts and ts <= self.ts[-1]:
+            return  # aynı örnek hem NOTIFY hem warm-up ile gelebilir
+        self.ts.append(ts)
+        self.prefix.append(self._total)
+        self._total += value
+
+        while self.maxq and self.maxq[-1][1] <= value:
+            self.maxq.pop()
+        self.maxq.append((ts, value))
+        while self.minq and self.minq[-1][1] >= value:
+            self.minq.pop()
+        self.minq.append((ts, value))
+
+    def evict_before(self, cutoff: float) -> None:
+        while self.ts and self.ts[0] < cutoff:
+            self.ts.popleft()
+            self.prefix.popleft()
+        # ring kapasitesi dolup eski örnek attıysa deque'ler de ona uysun
+        oldest = self.ts[0] if self.ts else cutoff
+        while self.maxq and self.maxq[0][0] < oldest:
+            self.maxq.popleft()
+        while self.minq and self.minq[0][0] < oldest:
+            self.minq.popleft()
+
+    @property
+    def full(self) -> bool:
+        return self.ts.maxlen is not None and len(self.ts) == self.ts.maxlen
+
+    def aggregate(self, agg: str, since: float) -> float | None:
+        if agg == "max":
+            return next((v for t, v in self.maxq if t >= since), None)
+        if agg == "min":
+            return next((v for t, v in self.minq if t >= since), None)
+        if agg == "avg":
+            i = bisect.bisect_left(self.ts, since)
+            n = len(self.ts) - i
+            if n <= 0:
+                return None
+            return (self._total - self.prefix[i]) / n
+        raise ValueError(f"Unsupported agg: {agg}")
+
+
+class RollingStore:
+    """
+    API süreci içinde son `rolling_retention_minutes` dakikanın metriklerini tutar.
+    Başlangıçta DB'den ısıtılır, sonra collector yayınıyla (LiveHub) güncel kalır.
+    """
+
+    def __init__(self, retention_minutes: int, max_samples: int) -> None:
+        self.retention_s = retention_minutes * 60
+        self.max_samples = max_samples
+        self.windows: dict[tuple[str, str], MetricWindow] = self._new_windows()
+        self.coverage_start: float | None = None
+        self.last_ingest: float | None = None  # monotonic
+        self._warming = False
+        self._pending: list[dict[str, Any]] = []
+        self._lock = asyncio.Lock()
+
+    def _new_windows(self) -> dict[tuple[str, str], MetricWindow]:
+        return {(fam, col): MetricWindow(self.max_samples) for fam, (_, cols) in FAMILIES.items() for col in cols}
+
+    @staticmethod
+    def _epoch(ts: Any) -> float:
+        if isinstance(ts, datetime):
+            return ts.timestamp()
+        return datetime.fromisoformat(str(ts)).timestamp()
+
+    def _apply(self, windows: dict[tuple[str, str], MetricWindow], sample: dict[str, Any]) -> None:
+        ts = self._epoch(sample["ts"])
+        for fam, (_, cols) in FAMILIES.items():
+            values = sample.get(fam) or {}
+            for col in cols:
+                v = values.get(col)
+                if v is not None:
+                    windows[(fam, col)].push(ts, float(v))
+        cutoff = time.time() - self.retention_s
+        for w in windows.values():
+            w.evict_before(cutoff)
+
+    def ingest(self, sample: dict[str, Any]) -> None:
+        """LiveHub sink: collector'ın yayınladığı her örnek."""
+        if self._warming:
+            self._pending.append(sample)
+            return
+        self._apply(self.windows, sample)
+        self.last_ingest = time.monotonic()
+        if self.coverage_start is None:
+            self.coverage_start = self._epoch(sample["ts"])
+
+    async def warm(self) -> None:
+        """Son retention penceresini DB'den yükler; LISTEN (yeniden) bağlandığında da çağrılır."""
+        async with self._lock:
+            self._warming = True
+            start = time.perf_counter()
+            try:
+                windows = self._new_windows()
+                since = time.time() - self.retention_s
+                rows_total = 0
+                async with SessionLocal() as session:
+                    for fam, (table, cols) in FAMILIES.items():
+                        res = await session.execute(
+                            text(
+                                f"SELECT ts, {', '.join(cols)} FROM {table} "
+                                "WHERE ts >= now() - make_interval(secs => :secs) ORDER BY ts"
+                            ),
+                            {"secs": self.retention_s},
+                        )
+                        for row in res.all():
+                            ts = row[0].timestamp()
+                            for i, col in enumerate(cols, start=1):
+                                if row[i] is not None:
+                                    windows[(fam, col)].push(ts, float(row[i]))
+                            rows_total += 1
+
+                for sample in self._pending:
+                    self._apply(windows, sample)
+                self.windows = windows
+                self.coverage_start = since
+                self.last_ingest = time.monotonic()
+                log.info("rolling.warmed", rows=rows_total, replayed=len(self._pending), ms=int((time.perf_counter() - start) * 1000))
+            finally:
+                self._pending.clear()
+                self._warming = False
+
+    def answer(self, family: str, column: str, agg: str, minutes: int) -> tuple[bool, float | None]:
+        """(hit, value). hit=False ise pencere store kapsamı dışında veya feed bayat: SQL'e düş."""
+        if self._warming or self.coverage_start is None or self.last_ingest is None:
+            return False, None
+        if time.monotonic() - self.last_ingest > 3 * settings.metrics_interval_seconds:
+            return False, None
+
+        w = self.windows.get((family, column))
+        if w is None:
+            return False, None
+
+        since = time.time() - minutes * 60
+        coverage = self.coverage_start
+        if w.full and w.ts:
+            coverage = max(coverage, w.ts[0])
+        if since < coverage:
+            return False, None
+        return True, w.aggregate(agg, since)
+
+
+store = RollingStore(settings.rolling_retention_minutes, settings.rolling_max_samples)
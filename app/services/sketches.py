@@ -0,0 +1,251 @@
+# app/services/sketches.py
+import math
+import struct
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterable
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.services.metrics_query import FAMILIES
+
+log = get_logger()
+
+# Sketch tutulan metrikler: "<family>.<column>" (tool'daki metric enum'u ile aynı)
+METRICS: tuple[str, ...] = tuple(f"{fam}.{col}" for fam, (_, cols) in FAMILIES.items() for col in cols)
+
+_HEADER = struct.Struct("<BdQddd")  # version, alpha, count, min, max, sum
+_VERSION = 1
+_MIN_INDEXABLE = 1e-9
+
+
+def _write_varint(out: bytearray, n: int) -> None:
+    while True:
+        b = n & 0x7F
+        n >>= 7
+        if n:
+            out.append(b | 0x80)
+        else:
+            out.append(b)
+            return
+
+
+def _read_varint(buf: bytes, pos: int) -> tuple[int, int]:
+    shift = 0
+    n = 0
+    while True:
+        b = buf[pos]
+        pos += 1
+        n |= (b & 0x7F) << shift
+        if not b & 0x80:
+            return n, pos
+        shift += 7
+
+
+class DDSketch:
+    """
+    Göreli hata garantili, birleştirilebilir quantile sketch'i (DDSketch).
+    Her değer log_gamma tabanlı bir kovaya düşer; aynı alpha ile üretilmiş sketch'ler kova sayaçları toplanarak birleşir.
+    Metrikler negatif olmadığından <= 0 değerler tek bir sıfır kovasında tutulur.
+    """
+
+    __slots__ = ("alpha", "gamma", "_log_gamma", "bins", "zero_count", "count", "min", "max", "sum")
+
+    def __init__(self, alpha: float | None = None) -> None:
+        self.alpha = alpha if alpha is not None else settings.sketch_relative_accuracy
+        self.gamma = (1 + self.alpha) / (1 - self.alpha)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: dict[int, int] = defaultdict(int)
+        self.zero_count = 0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.sum = 0.0
+
+    def add(self, value: float) -> None:
+        if value > _MIN_INDEXABLE:
+            self.bins[math.ceil(math.log(value) / self._log_gamma)] += 1
+        else:
+            self.zero_count += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "DDSketch") -> None:
+        if other.alpha != self.alpha:
+            raise ValueError(f"Cannot merge sketches with different alpha: {self.alpha} != {other.alpha}")
+        for k, c in other.bins.items():
+            self.bins[k] += c
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> float | None:
+        if self.count == 0:
+            return None
+        q = max(0.0, min(1.0, q))
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if seen > rank:
+            return max(self.min, 0.0)
+        for k in sorted(self.bins):
+            seen += self.bins[k]
+            if seen > rank:
+                # Kovanın orta noktası: gerçek değere göre en fazla alpha göreli hata
+                v = 2 * self.gamma**k / (self.gamma + 1)
+                return min(max(v, self.min), self.max)
+        return self.max
+
+    def to_bytes(self) -> bytes:
+        out = bytearray(_HEADER.pack(_VERSION, self.alpha, self.count, self.min, self.max, self.sum))
+        _write_varint(out, self.zero_count)
+        _write_varint(out, len(self.bins))
+        prev = 0
+        for k in sorted(self.bins):
+            delta = k - prev
+            _write_varint(out, (delta << 1) ^ (delta >> 63))  # zigzag: negatif kova indeksleri
+            _write_varint(out, self.bins[k])
+            prev = k
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, buf: bytes) -> "DDSketch":
+        version, alpha, count, vmin, vmax, vsum = _HEADER.unpack_from(buf, 0)
+        if version != _VERSION:
+            raise ValueError(f"Unsupported sketch version: {version}")
+        s = cls(alpha)
+        s.count, s.min, s.max, s.sum = count, vmin, vmax, vsum
+        pos = _HEADER.size
+        s.zero_count, pos = _read_varint(buf, pos)
+        n, pos = _read_varint(buf, pos)
+        k = 0
+        for _ in range(n):
+            z, pos = _read_varint(buf, pos)
+            k += (z >> 1) ^ -(z & 1)
+            c, pos = _read_varint(buf, pos)
+            s.bins[k] = c
+        return s
+
+
+def merge_encoded(blobs: Iterable[bytes]) -> DDSketch | None:
+    merged: DDSketch | None = None
+    for blob in blobs:
+        s = DDSketch.from_bytes(bytes(blob))
+        if merged is None:
+            merged = s
+        else:
+            merged.merge(s)
+    return merged
+
+
+_UPSERT = text(
+    """
+    INSERT INTO metric_sketches (metric, width_s, bucket, count, min, max, sketch)
+    VALUES (:metric, :width_s, :bucket, :count, :min, :max, :sketch)
+    ON CONFLICT (metric, width_s, bucket) DO UPDATE
+    SET count = EXCLUDED.count, min = EXCLUDED.min, max = EXCLUDED.max, sketch = EXCLUDED.sketch
+    """
+)
+
+
+def _rows(sketches: dict[tuple[str, datetime], DDSketch], width_s: int) -> list[dict[str, Any]]:
+    return [
+        {"metric": m, "width_s": width_s, "bucket": b, "count": s.count, "min": s.min, "max": s.max, "sketch": s.to_bytes()}
+        for (m, b), s in sketches.items()
+    ]
+
+
+# Metrik başına PK (metric, width_s, bucket) üzerinden tek index lookup; sadece width_s ile filtre tabloyu tarar
+_LAST_BUCKET = text(
+    """
+    SELECT max(b) FROM (
+        SELECT (SELECT max(bucket) FROM metric_sketches WHERE metric = m AND width_s = :w) AS b
+        FROM unnest(CAST(:metrics AS text[])) AS m
+    ) s
+    """
+)
+
+
+async def _last_bucket(session: AsyncSession, width_s: int) -> datetime | None:
+    res = await session.execute(_LAST_BUCKET, {"w": width_s, "metrics": list(METRICS)})
+    return res.scalar()
+
+
+async def rollup_minutes(session: AsyncSession, now: datetime) -> int:
+    """Kapanmış dakikaların ham satırlarından dakika sketch'leri üretir (idempotent upsert)."""
+    end = now.replace(second=0, microsecond=0)
+    floor = end - timedelta(minutes=settings.sketch_backfill_minutes)
+    last = await _last_bucket(session, 60)
+    start = max(last + timedelta(minutes=1), floor) if last is not None else floor
+    if start >= end:
+        return 0
+
+    sketches: dict[tuple[str, datetime], DDSketch] = {}
+    for fam, (table, cols) in FAMILIES.items():
+        res = await session.execute(
+            text(f"SELECT date_trunc('minute', ts) AS m, {', '.join(cols)} FROM {table} WHERE ts >= :start AND ts < :end"),
+            {"start": start, "end": end},
+        )
+        for row in res.all():
+            for i, col in enumerate(cols, start=1):
+                if row[i] is None:
+                    continue
+                v = float(row[i])
+                if not math.isfinite(v):
+                    continue  # inf log kovasında OverflowError, NaN min/max/sum'ı bozar
+                key = (f"{fam}.{col}", row[0])
+                s = sketches.get(key)
+                if s is None:
+                    s = sketches[key] = DDSketch()
+                s.add(v)
+
+    if sketches:
+        await session.execute(_UPSERT, _rows(sketches, 60))
+    return len(sketches)
+
+
+async def rollup_hours(session: AsyncSession, now: datetime) -> int:
+    """Tamamlanmış saatler için dakika sketch'lerini birleştirir; uzun pencereler saatlik satırlardan okunur."""
+    end = now.replace(minute=0, second=0, microsecond=0)
+    floor = end - timedelta(minutes=settings.sketch_backfill_minutes)
+    last = await _last_bucket(session, 3600)
+    start = max(last + timedelta(hours=1), floor) if last is not None else floor
+    if start >= end:
+        return 0
+
+    res = await session.execute(
+        text(
+            "SELECT metric, date_trunc('hour', bucket) AS h, sketch FROM metric_sketches "
+            "WHERE width_s = 60 AND bucket >= :start AND bucket < :end"
+        ),
+        {"start": start, "end": end},
+    )
+    sketches: dict[tuple[str, datetime], DDSketch] = {}
+    for metric, hour, blob in res.all():
+        s = DDSketch.from_bytes(bytes(blob))
+        key = (metric, hour)
+        if key in sketches:
+            sketches[key].merge(s)
+        else:
+            sketches[key] = s
+
+    if sketches:
+        await session.execute(_UPSERT, _rows(sketches, 3600))
+    return len(sketches)
+
+
+async def rollup_once(session: AsyncSession) -> None:
+    start = time.perf_counter()
+    now = datetime.now(timezone.utc)
+    minutes = await rollup_minutes(session, now)
+    hours = await rollup_hours(session, now)
+    await session.commit()
+    if minutes or hours:
+        log.info("sketch.rollup", minute_sketches=minutes, hour_sketches=hours, ms=int((time.perf_counter() - start) * 1000))
@@ -0,0 +1,115 @@
+from datetime import datetime, timezone
+from typing import Any
+
+# Benchmark'larda kullanılan gerçekçi Türkçe/İngilizce soru örnekleri
+QUESTIONS: list[str] = [
+    "Son 10 dk CPU max nedir?",
+    "Geçen 1 saat GPU max kaç?",
+    "son yarım saat ram kullanımı en fazla ne oldu",
+    "Son on beş dakika işlemci sıcaklığı en yüksek kaç derece?",
+    "Şu an CPU kullanımı kaç?",
+    "En güncel metrikleri göster.",
+    "bugün gpu kullanımı en çok kaç oldu",
+    "Son 2 saat bellek kullanımı max",
+    "What was the max CPU usage in the last 30 dakika?",
+    "last 5 dk gpu utilization max?",
+    "son bir gün cpu max",
+    "Şimdi sistem durumu nasıl?",
+]
+
+# Modelin content alanında döndürdüğü tipik metinler: inline tool JSON (trailing comma, tool_name/tool_args varyantı),
+# structured moddaki final_answer ve düz cevaplar
+LLM_CONTENTS: list[str] = [
+    '{"name": "get_max_cpu_usage", "parameters": {"minutes": 10}}',
+    '{"name": "get_max_gpu_utilization", "parameters": {"minutes": "60",},}',
+    '{"tool_name": "get_metric_percentile", "tool_args": {"metric": "cpu.temperature_c", "percentile": 95, "minutes": 1440}}',
+    '{"name": "final_answer", "parameters": {"text": "Son 10 dakika içinde maksimum CPU kullanımı: %87.5"}}',
+    "Son 30 dakika içinde maksimum RAM kullanımı %64.2 olarak ölçüldü.",
+    "The maximum GPU utilization in the last 5 minutes was 41.0%.",
+    '{"name": "get_top_processes", "parameters": {"minutes": 15, "by": "memory", "limit": 5}}',
+    "{bozuk json",
+]
+
+# Modelin ürettiği (ham) tool argümanları: string sayılar, eksik/sıfır minutes, fazladan alanlar
+TOOL_CALLS: list[tuple[str, dict[str, Any]]] = [
+    ("get_max_cpu_usage", {"minutes": 10}),
+    ("get_max_cpu_temp", {"minutes": "15"}),
+    ("get_max_ram_usage_percent", {"minutes": 0}),
+    ("get_max_gpu_utilization", {}),
+    ("get_metric_percentile", {"metric": "cpu.usage_percent", "percentile": "99", "minutes": 60}),
+    ("get_top_processes", {"minutes": 30, "by": "memory", "limit": 5, "sort": "desc"}),
+    ("get_cpu_core_usage", {"minutes": 10, "threshold": 80}),
+    ("get_gpu_device_usage", {"minutes": "60"}),
+    ("get_alerts", {"minutes": 1440, "limit": 10}),
+    ("get_latest_snapshot", {}),
+]
+
+_TS = datetime(2026, 10, 18, 12, 0, 0, tzinfo=timezone.utc)
+
+# Tool'ların DB'den dönen sonuçları (executor çıktısı biçiminde); args format/metin yolunda kullanılan son hal
+TOOL_RESULTS: list[tuple[str, dict[str, Any], dict[str, Any]]] = [
+    ("get_max_cpu_usage", {"minutes": 10}, {"max_cpu_usage_percent": 87.5}),
+    ("get_max_cpu_temp", {"minutes": 15}, {"max_cpu_temp_c": 71.3}),
+    ("get_max_ram_usage_percent", {"minutes": 30}, {"max_ram_usage_percent": None}),
+    ("get_max_gpu_utilization", {"minutes": 60}, {"max_gpu_utilization_percent": 41.0}),
+    (
+        "get_metric_percentile",
+        {"metric": "cpu.usage_percent", "percentile": 99, "minutes": 60},
+        {"metric": "cpu.usage_percent", "percentile": 99.0, "value": 93.2, "count": 360},
+    ),
+    (
+        "get_top_processes",
+        {"minutes": 30, "by": "memory", "limit": 5},
+        {
+            "processes": [
+                {"name": name, "pid": 1000 + i, "max_cpu_percent": 120.0 - i * 20, "avg_cpu_percent": 40.0 - i * 5, "max_rss_mb": 4096 - i * 600}
+                for i, name in enumerate(["postgres", "python3", "chrome", "code", "dockerd"])
+            ]
+        },
+    ),
+    (
+        "get_cpu_core_usage",
+        {"minutes": 10, "threshold": 80, "limit": 8},
+        {
+            "core_count": 16,
+            "avg_usage_percent": 37.4,
+            "cores": [
+                {"core": i, "max_usage_percent": 100.0 - i * 4, "avg_usage_percent": 70.0 - i * 6, "busy_ratio": 0.5 - i * 0.05, "max_freq_mhz": 4800.0}
+                for i in range(8)
+            ],
+        },
+    ),
+    (
+        "get_gpu_device_usage",
+        {"minutes": 60},
+        {
+            "devices": [
+                {"device": 0, "max_utilization_percent": 98.0, "avg_utilization_percent": 71.2, "max_temperature_c": 82.0, "max_memory_used_mb": 22110, "samples": 360},
+                {"device": 1, "max_utilization_percent": 35.0, "avg_utilization_percent": 12.9, "max_temperature_c": 54.0, "max_memory_used_mb": 4096, "samples": 360},
+            ]
+        },
+    ),
+    (
+        "get_alerts",
+        {"minutes": 1440, "limit": 10},
+        {
+            "fired_count": 2,
+            "events": [
+                {"ts": _TS, "rule": "cpu_usage_sustained", "severity": "warning", "state": "firing", "metric": "cpu.usage_percent", "value": 96.1, "threshold": 90.0, "message": "CPU kullanımı 5 dakikadır %90 üstünde"},
+                {"ts": _TS, "rule": "gpu_temp_high", "severity": "critical", "state": "resolved", "metric": "gpu.temperature_c", "value": 79.0, "threshold": 85.0, "message": "GPU sıcaklığı 85°C üstünde"},
+            ],
+            "active": [{"rule": "cpu_usage_sustained", "severity": "warning", "since": _TS, "value": 96.1, "message": "CPU kullanımı 5 dakikadır %90 üstünde"}],
+        },
+    ),
+    (
+        "get_latest_snapshot",
+        {},
+        {
+            "snapshot": {
+                "cpu": {"ts": _TS, "usage_percent": 23.5, "temperature_c": 58.0, "freq_mhz": 3600.0},
+                "ram": {"ts": _TS, "used_mb": 14236, "available_mb": 18532, "usage_percent": 43.4},
+                "gpu": {"ts": _TS, "utilization_percent": 12.0, "temperature_c": 47.0, "memory_used_mb": 2048},
+            }
+        },
+    ),
+]
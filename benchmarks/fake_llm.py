@@ -0,0 +1,137 @@
+"""
+Gerçek model olmadan /llm/ask ölçmek için OpenAI-compatible sahte /chat/completions sunucusu.
+
+    python -m benchmarks.fake_llm --port 9000 --latency-ms 300 --jitter-ms 50 --mode mixed
+
+API'yi buna yönlendir: LLM_BASE_URL=http://localhost:9000/v1
+
+Modlar:
+- native: tool_calls ile tek tool çağrısı
+- inline: tool JSON'u content içinde düz metin (sonda virgül ile), _try_parse_inline_tool_json yolu
+- multi:  tek cevapta iki tool_calls (ör. CPU + RAM)
+- mixed:  istek sırasına göre native/inline/multi dönüşümlü
+İstek response_format içeriyorsa (structured-output modu) mod fark etmeksizin şemaya uygun JSON döner.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import re
+import time
+import uuid
+from typing import Any
+
+import uvicorn
+from fastapi import FastAPI, Request
+
+_KEYWORDS = [
+    (("sıcaklık", "sicaklik", "temp", "derece"), "get_max_cpu_temp"),
+    (("gpu", "ekran kartı"), "get_max_gpu_utilization"),
+    (("ram", "bellek", "memory"), "get_max_ram_usage_percent"),
+    (("cpu", "işlemci", "islemci"), "get_max_cpu_usage"),
+    (("snapshot", "güncel", "guncel", "şu an", "su an"), "get_latest_snapshot"),
+]
+_MINUTES_RE = re.compile(r"(\d+)\s*dakika")
+_BILGI_RE = re.compile(r"BİLGİ:\s*(.*)", re.DOTALL)
+
+
+def _pick_tool(question: str) -> str:
+    q = question.lower()
+    for words, tool in _KEYWORDS:
+        if any(w in q for w in words):
+            return tool
+    return "get_latest_snapshot"
+
+
+def _minutes_hint(messages: list[dict[str, Any]]) -> int:
+    for m in messages:
+        if m.get("role") == "system":
+            hit = _MINUTES_RE.search(m.get("content") or "")
+            if hit:
+                return int(hit.group(1))
+    return 10
+
+
+def _tool_call(name: str, args: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "id": f"call_{uuid.uuid4().hex[:8]}",
+        "type": "function",
+        "function": {"name": name, "arguments": json.dumps(args)},
+    }
+
+
+def _completion(message: dict[str, Any], prompt_chars: int) -> dict[str, Any]:
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": "fake",
+        "choices": [{"index": 0, "message": message, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": prompt_chars // 4, "completion_tokens": 16, "total_tokens": prompt_chars // 4 + 16},
+    }
+
+
+def create_app(latency_ms: float, jitter_ms: float, mode: str) -> FastAPI:
+    app = FastAPI(title="fake-llm")
+    modes = itertools.cycle(["native", "inline", "multi"])
+
+    @app.get("/v1/models")
+    async def models():
+        return {"object": "list", "data": [{"id": "fake", "object": "model"}]}
+
+    @app.post("/v1/chat/completions")
+    async def chat(req: Request):
+        body = await req.json()
+        messages: list[dict[str, Any]] = body.get("messages") or []
+        prompt_chars = sum(len(m.get("content") or "") for m in messages) + len(json.dumps(body.get("tools") or []))
+
+        await asyncio.sleep(max(0.0, random.gauss(latency_ms, jitter_ms)) / 1000)
+
+        # finalize turu veya tool sonucu sonrası: BİLGİ'yi aynen geri ver (marker kontrolü geçsin)
+        if body.get("tool_choice") == "none" or (messages and messages[-1].get("role") == "tool"):
+            info = ""
+            for m in reversed(messages):
+                hit = _BILGI_RE.search(m.get("content") or "") if m.get("role") == "system" else None
+                if hit:
+                    info = hit.group(1).strip()
+                    break
+            return _completion({"role": "assistant", "content": info or "Tamam."}, prompt_chars)
+
+        question = next((m.get("content") or "" for m in reversed(messages) if m.get("role") == "user"), "")
+        tool = _pick_tool(question)
+        args: dict[str, Any] = {} if tool == "get_latest_snapshot" else {"minutes": _minutes_hint(messages)}
+
+        if body.get("response_format"):
+            # structured-output modu (LLM_TOOL_CALL_MODE=json_schema): şemaya uyan tek JSON nesnesi
+            content = json.dumps({"name": tool, "parameters": args})
+            return _completion({"role": "assistant", "content": content}, prompt_chars)
+
+        m = next(modes) if mode == "mixed" else mode
+        if m == "inline":
+            # Bilerek sonda virgül: orchestrator'daki _TRAILING_COMMA_RE temizliği çalışsın
+            content = json.dumps({"name": tool, "parameters": args})[:-1] + ",}"
+            return _completion({"role": "assistant", "content": content}, prompt_chars)
+        if m == "multi" and tool != "get_latest_snapshot":
+            second = "get_max_ram_usage_percent" if tool != "get_max_ram_usage_percent" else "get_max_cpu_usage"
+            calls = [_tool_call(second, args), _tool_call(tool, args)]
+            return _completion({"role": "assistant", "content": "", "tool_calls": calls}, prompt_chars)
+        return _completion({"role": "assistant", "content": "", "tool_calls": [_tool_call(tool, args)]}, prompt_chars)
+
+    return app
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--host", default="0.0.0.0")
+    ap.add_argument("--port", type=int, default=9000)
+    ap.add_argument("--latency-ms", type=float, default=200.0)
+    ap.add_argument("--jitter-ms", type=float, default=0.0)
+    ap.add_argument("--mode", choices=["native", "inline", "multi", "mixed"], default="mixed")
+    args = ap.parse_args()
+
+    uvicorn.run(create_app(args.latency_ms, args.jitter_ms, args.mode), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
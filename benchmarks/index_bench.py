@@ -0,0 +1,194 @@
+"""
+Zaman aralığı aggregate sorguları için index karşılaştırması: btree (ts) / covering (ts) INCLUDE / BRIN / covering + BRIN.
+
+Önkoşul: yerel Postgres (DATABASE_URL_SYNC). metrics_* tablolarına dokunmaz; metrics_cpu şemasında ayrı bir tablo kurar.
+
+    python -m benchmarks.index_bench --rows 5000000 --interval-seconds 1
+    python -m benchmarks.index_bench --rows 20000000 --interval-seconds 1 --windows 10,60,1440,10080 --repeat 30
+    python -m benchmarks.index_bench --rows 5000000 --no-vacuum   # yeni yazılmış (visibility map boş) durum
+
+Tablo ts artan sırayla doldurulur (collector'ın append-only yazımı gibi). Her varyant için: index boyutu,
+pencere başına p50/p95 gecikme, planner'ın seçtiği tarama, Heap Fetches ve dokunulan buffer sayısı
+(EXPLAIN ANALYZE BUFFERS). Covering index'in kazancı visibility map'e bağlıdır: vacuum edilmemiş sayfalarda
+index-only scan de heap'e gider (Heap Fetches).
+
+Yazma maliyeti: her varyantta --insert-rows satır, --insert-batch'lik INSERT'lerle tablonun sonuna eklenir;
+satır/sn ve satır başına WAL raporlanır (her insert tüm index'leri günceller). Eklenen satırlar sonra silinir.
+"""
+import argparse
+import time
+from typing import Any
+
+from sqlalchemy import Connection, create_engine, text
+
+from app.core.config import settings
+from benchmarks.load_ask import percentile
+
+TABLE = "bench_index_metrics_cpu"
+COLS = ("usage_percent", "temperature_c", "freq_mhz")
+
+VARIANTS: dict[str, list[str]] = {
+    "btree": [f"CREATE INDEX {TABLE}_ts ON {TABLE} (ts)"],
+    "covering": [f"CREATE INDEX {TABLE}_ts_cover ON {TABLE} (ts) INCLUDE ({', '.join(COLS)})"],
+    "brin": [f"CREATE INDEX {TABLE}_ts_brin ON {TABLE} USING brin (ts) WITH (pages_per_range = 32)"],
+    "covering+brin": [
+        f"CREATE INDEX {TABLE}_ts_cover ON {TABLE} (ts) INCLUDE ({', '.join(COLS)})",
+        f"CREATE INDEX {TABLE}_ts_brin ON {TABLE} USING brin (ts) WITH (pages_per_range = 32)",
+    ],
+}
+
+# get_max_cpu_usage.sql ve get_latest_snapshot'taki CPU alt sorgusuyla aynı biçim
+QUERIES = {
+    "max": f"SELECT MAX(usage_percent) FROM {TABLE} WHERE ts >= (now() - (:minutes * interval '1 minute'))",
+    "latest": f"SELECT ts, {', '.join(COLS)} FROM {TABLE} ORDER BY ts DESC LIMIT 1",
+}
+
+
+def create_table(conn: Connection, rows: int, step: float) -> None:
+    conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+    conn.execute(
+        text(
+            f"CREATE TABLE {TABLE} (id bigserial PRIMARY KEY, ts timestamptz NOT NULL, "
+            "usage_percent double precision NOT NULL, temperature_c double precision NOT NULL, freq_mhz double precision NOT NULL)"
+        )
+    )
+    start = time.perf_counter()
+    conn.execute(
+        text(
+            f"INSERT INTO {TABLE} (ts, usage_percent, temperature_c, freq_mhz) "
+            "SELECT now() - ((:rows - n) * :step * interval '1 second'), random() * 100, 35 + random() * 50, 1000 + random() * 4200 "
+            "FROM generate_series(1, :rows) AS n"
+        ),
+        {"rows": rows, "step": step},
+    )
+    print(f"seeded {rows} rows in {time.perf_counter() - start:.1f}s")
+
+
+def drop_indexes(conn: Connection) -> None:
+    names = conn.execute(
+        text("SELECT indexname FROM pg_indexes WHERE tablename = :t AND indexname <> :pk"),
+        {"t": TABLE, "pk": f"{TABLE}_pkey"},
+    ).scalars().all()
+    for name in names:
+        conn.execute(text(f"DROP INDEX {name}"))
+
+
+def index_sizes(conn: Connection) -> dict[str, int]:
+    rows = conn.execute(
+        text(
+            "SELECT indexrelid::regclass::text, pg_relation_size(indexrelid) FROM pg_index "
+            "WHERE indrelid = CAST(:t AS regclass) AND NOT indisprimary"
+        ),
+        {"t": TABLE},
+    ).all()
+    return {name: int(size) for name, size in rows}
+
+
+def plan_summary(conn: Connection, sql: str, params: dict[str, Any]) -> dict[str, Any]:
+    plan = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}"), params).scalar()[0]
+    scans: list[str] = []
+    heap_fetches = 0
+
+    def walk(node: dict[str, Any]) -> None:
+        nonlocal heap_fetches
+        if "Scan" in node["Node Type"]:
+            scans.append(node["Node Type"])
+        heap_fetches += int(node.get("Heap Fetches", 0))
+        for child in node.get("Plans", []):
+            walk(child)
+
+    top = plan["Plan"]
+    walk(top)
+    return {
+        "scan": "+".join(dict.fromkeys(scans)) or top["Node Type"],
+        "heap_fetches": heap_fetches,
+        "buffers": int(top.get("Shared Hit Blocks", 0)) + int(top.get("Shared Read Blocks", 0)),
+    }
+
+
+def insert_cost(conn: Connection, rows: int, batch: int, step: float) -> tuple[float, float]:
+    # Collector gibi tablonun sonuna ekler; (satır/sn, satır başına WAL byte)
+    max_id = conn.execute(text(f"SELECT coalesce(max(id), 0) FROM {TABLE}")).scalar()
+    stmt = text(
+        f"INSERT INTO {TABLE} (ts, usage_percent, temperature_c, freq_mhz) "
+        "SELECT now() + ((:offset + n) * :step * interval '1 second'), random() * 100, 35 + random() * 50, 1000 + random() * 4200 "
+        "FROM generate_series(1, :batch) AS n"
+    )
+    lsn = conn.execute(text("SELECT pg_current_wal_insert_lsn()")).scalar()
+    start = time.perf_counter()
+    for offset in range(0, rows, batch):
+        conn.execute(stmt, {"offset": offset, "step": step, "batch": min(batch, rows - offset)})
+    elapsed = time.perf_counter() - start
+    wal = conn.execute(text("SELECT pg_wal_lsn_diff(pg_current_wal_insert_lsn(), CAST(:lsn AS pg_lsn))"), {"lsn": lsn}).scalar()
+    conn.execute(text(f"DELETE FROM {TABLE} WHERE id > :id"), {"id": max_id})
+    return rows / elapsed, float(wal) / rows
+
+
+def time_query(conn: Connection, sql: str, params: dict[str, Any], repeat: int) -> list[float]:
+    stmt = text(sql)
+    conn.execute(stmt, params).all()  # ısınma: plan + shared_buffers
+    out: list[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.execute(stmt, params).all()
+        out.append((time.perf_counter() - start) * 1000)
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=5_000_000)
+    ap.add_argument("--interval-seconds", type=float, default=1.0, help="ardışık örnekler arası süre")
+    ap.add_argument("--windows", default="10,60,1440", help="dakika cinsinden pencereler (virgülle)")
+    ap.add_argument("--variants", default=",".join(VARIANTS))
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--insert-rows", type=int, default=100_000, help="yazma maliyeti için eklenecek satır (0 -> ölçme)")
+    ap.add_argument("--insert-batch", type=int, default=100)
+    ap.add_argument("--no-vacuum", action="store_true", help="index'lerden sonra VACUUM yapma (sadece ANALYZE)")
+    ap.add_argument("--keep", action="store_true", help=f"bitince {TABLE} tablosunu silme")
+    args = ap.parse_args()
+
+    windows = [int(w) for w in args.windows.split(",") if w]
+    variants = [v for v in args.variants.split(",") if v]
+    mb = 1024 * 1024
+
+    engine = create_engine(settings.database_url_sync, isolation_level="AUTOCOMMIT")
+    with engine.connect() as conn:
+        create_table(conn, args.rows, args.interval_seconds)
+        table_size = conn.execute(text("SELECT pg_table_size(CAST(:t AS regclass))"), {"t": TABLE}).scalar()
+        print(f"table={table_size / mb:.1f} MiB rows={args.rows} span={args.rows * args.interval_seconds / 86400:.1f} days")
+        print(f"{'variant':<14} {'query':<12} {'scan':<34} {'p50_ms':>8} {'p95_ms':>8} {'heap_fetch':>10} {'buffers':>8}")
+
+        try:
+            for variant in variants:
+                drop_indexes(conn)
+                start = time.perf_counter()
+                for ddl in VARIANTS[variant]:
+                    conn.execute(text(ddl))
+                build_s = time.perf_counter() - start
+                conn.execute(text(f"ANALYZE {TABLE}" if args.no_vacuum else f"VACUUM (ANALYZE) {TABLE}"))
+
+                sizes = index_sizes(conn)
+                detail = ", ".join(f"{name.removeprefix(TABLE + '_')}={size / mb:.2f}" for name, size in sizes.items())
+                print(f"{variant:<14} index_MiB total={sum(sizes.values()) / mb:.2f} ({detail}) build={build_s:.1f}s")
+
+                cases = [(f"max {w}m", QUERIES["max"], {"minutes": w}) for w in windows]
+                cases.append(("latest", QUERIES["latest"], {}))
+                for label, sql, params in cases:
+                    plan = plan_summary(conn, sql, params)
+                    ms = time_query(conn, sql, params, args.repeat)
+                    print(
+                        f"{variant:<14} {label:<12} {plan['scan']:<34} {percentile(ms, 50):>8.2f} {percentile(ms, 95):>8.2f} "
+                        f"{plan['heap_fetches']:>10} {plan['buffers']:>8}"
+                    )
+                if args.insert_rows > 0:
+                    rate, wal = insert_cost(conn, args.insert_rows, args.insert_batch, args.interval_seconds)
+                    print(f"{variant:<14} insert rows/s={rate:.0f} wal_bytes/row={wal:.0f}")
+        finally:
+            if not args.keep:
+                conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Yazma yolu kapasite testi: N sanal collector, her biri `interval` saniyede bir CPU/RAM/GPU örneği üretir.
+
+Önkoşul: migrate edilmiş yerel Postgres; gerçek collector durdurulmuş olmalı (WAL/boyut ölçümünü kirletir).
+
+    python -m benchmarks.ingest_bench --collectors 200 --interval-seconds 1 --duration 60 --mode orm
+    python -m benchmarks.ingest_bench --collectors 2000 --interval-seconds 1 --duration 60 --mode bulk --batch-size 500
+    python -m benchmarks.ingest_bench --collectors 2000 --interval-seconds 1 --duration 60 --mode copy --truncate
+
+Modlar:
+  orm   collect_once ile aynı yol: örnek başına session + 3x session.add + commit
+  bulk  örnekler kuyrukta toplanır, writer'lar SQLAlchemy insert().values executemany ile toplu yazar
+  copy  writer'lar asyncpg copy_records_to_table (COPY FROM STDIN) ile yazar
+
+Rapor: hedef/gerçekleşen satır/sn, commit gecikmesi p50/p95/p99, zamanında yazılamayan tick'ler,
+WAL hacmi ve tablo/index büyümesi (milyon satır başına).
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.models.metrics_cpu import MetricsCPU
+from app.models.metrics_gpu import MetricsGPU
+from app.models.metrics_ram import MetricsRAM
+from benchmarks.load_ask import percentile
+
+TABLES = ("metrics_cpu", "metrics_ram", "metrics_gpu")
+
+
+def make_sample(rng: random.Random) -> dict[str, dict[str, Any]]:
+    # collect_once'ın ürettiği değerlere benzer dağılım (sensör değerleri 1 ondalık)
+    ts = datetime.now(timezone.utc)
+    used = rng.randint(4000, 30000)
+    return {
+        "cpu": {"ts": ts, "usage_percent": round(rng.uniform(0, 100), 1), "temperature_c": round(rng.uniform(35, 85), 1), "freq_mhz": round(rng.uniform(1000, 5200), 1)},
+        "ram": {"ts": ts, "used_mb": used, "available_mb": 32768 - used, "usage_percent": round(used * 100 / 32768, 1)},
+        "gpu": {"ts": ts, "utilization_percent": round(rng.uniform(0, 100), 1), "temperature_c": round(rng.uniform(30, 95), 1), "memory_used_mb": rng.randint(0, 16000)},
+    }
+
+
+async def db_stats(engine: AsyncEngine) -> dict[str, int]:
+    async with engine.connect() as conn:
+        out = {"wal_lsn_bytes": int((await conn.execute(text("SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), '0/0')"))).scalar())}
+        for t in TABLES:
+            row = (await conn.execute(text(f"SELECT pg_table_size('{t}'), pg_indexes_size('{t}'), (SELECT count(*) FROM {t})"))).one()
+            out[f"{t}.table"], out[f"{t}.index"], out[f"{t}.rows"] = int(row[0]), int(row[1]), int(row[2])
+        return out
+
+
+class Stats:
+    def __init__(self) -> None:
+        self.rows = 0
+        self.commit_ms: list[float] = []
+        self.late_ticks = 0
+        self.errors = 0
+
+
+async def orm_collector(idx: int, engine: AsyncEngine, stats: Stats, interval: float, deadline: float, seed: int) -> None:
+    rng = random.Random(seed + idx)
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+    # Collector'lar aynı anda tick atmasın diye faz kaydırma
+    next_tick = time.perf_counter() + rng.uniform(0, interval)
+    while next_tick < deadline:
+        await asyncio.sleep(max(0.0, next_tick - time.perf_counter()))
+        s = make_sample(rng)
+        start = time.perf_counter()
+        try:
+            async with Session() as session:
+                session.add(MetricsCPU(**s["cpu"]))
+                session.add(MetricsRAM(**s["ram"]))
+                session.add(MetricsGPU(**s["gpu"]))
+                await session.commit()
+            stats.rows += 3
+            stats.commit_ms.append((time.perf_counter() - start) * 1000)
+        except Exception:
+            stats.errors += 1
+        next_tick += interval
+        if time.perf_counter() > next_tick:
+            # Yazma tick süresini aştı: kaçırılan tick'leri say, takvimi ileri al
+            missed = int((time.perf_counter() - next_tick) // interval) + 1
+            stats.late_ticks += missed
+            next_tick += missed * interval
+
+
+async def queue_collector(idx: int, queue: asyncio.Queue, stats: Stats, interval: float, deadline: float, seed: int) -> None:
+    rng = random.Random(seed + idx)
+    next_tick = time.perf_counter() + rng.uniform(0, interval)
+    while next_tick < deadline:
+        await asyncio.sleep(max(0.0, next_tick - time.perf_counter()))
+        try:
+            queue.put_nowait(make_sample(rng))
+        except asyncio.QueueFull:
+            stats.late_ticks += 1  # writer'lar yetişemiyor
+        next_tick += interval
+
+
+async def writer(mode: str, engine: AsyncEngine, queue: asyncio.Queue, stats: Stats, batch_size: int, done: asyncio.Event) -> None:
+    while not (done.is_set() and queue.empty()):
+        try:
+            first = await asyncio.wait_for(queue.get(), timeout=0.2)
+        except asyncio.TimeoutError:
+            continue
+        batch = [first]
+        while len(batch) < batch_size and not queue.empty():
+            batch.append(queue.get_nowait())
+
+        start = time.perf_counter()
+        try:
+            async with engine.begin() as conn:
+                if mode == "bulk":
+                    await conn.execute(insert(MetricsCPU), [s["cpu"] for s in batch])
+                    await conn.execute(insert(MetricsRAM), [s["ram"] for s in batch])
+                    await conn.execute(insert(MetricsGPU), [s["gpu"] for s in batch])
+                else:
+                    raw = (await conn.get_raw_connection()).driver_connection
+                    for fam, table in (("cpu", "metrics_cpu"), ("ram", "metrics_ram"), ("gpu", "metrics_gpu")):
+                        cols = list(batch[0][fam].keys())
+                        await raw.copy_records_to_table(table, records=[tuple(s[fam][c] for c in cols) for s in batch], columns=cols)
+            stats.rows += 3 * len(batch)
+            stats.commit_ms.append((time.perf_counter() - start) * 1000)
+        except Exception:
+            stats.errors += 1
+
+
+async def run(args: argparse.Namespace) -> None:
+    pool = args.writers if args.mode != "orm" else args.pool_size
+    engine = create_async_engine(settings.database_url_async, pool_size=pool, max_overflow=0)
+
+    if args.truncate:
+        async with engine.begin() as conn:
+            await conn.execute(text("TRUNCATE metrics_cpu, metrics_ram, metrics_gpu"))
+            if args.checkpoint:
+                await conn.execute(text("CHECKPOINT"))
+
+    before = await db_stats(engine)
+    stats = Stats()
+    start = time.perf_counter()
+    deadline = start + args.duration
+
+    if args.mode == "orm":
+        await asyncio.gather(
+            *(orm_collector(i, engine, stats, args.interval_seconds, deadline, args.seed) for i in range(args.collectors))
+        )
+    else:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=args.queue_size)
+        done = asyncio.Event()
+        writers = [
+            asyncio.create_task(writer(args.mode, engine, queue, stats, args.batch_size, done)) for _ in range(args.writers)
+        ]
+        await asyncio.gather(
+            *(queue_collector(i, queue, stats, args.interval_seconds, deadline, args.seed) for i in range(args.collectors))
+        )
+        done.set()
+        await asyncio.gather(*writers)
+
+    wall = time.perf_counter() - start
+    after = await db_stats(engine)
+    await engine.dispose()
+
+    target = 3 * args.collectors / args.interval_seconds
+    rows_db = sum(after[f"{t}.rows"] - before[f"{t}.rows"] for t in TABLES)
+    per_m = 1_000_000 / rows_db if rows_db else 0.0
+    mb = 1024 * 1024
+
+    print(f"mode={args.mode} collectors={args.collectors} interval={args.interval_seconds}s wall={wall:.1f}s")
+    print(f"rows/s target={target:.0f} sustained={stats.rows / wall:.0f} rows_in_db={rows_db} errors={stats.errors} late_ticks={stats.late_ticks}")
+    print(
+        f"commit_ms p50={percentile(stats.commit_ms, 50):.1f} p95={percentile(stats.commit_ms, 95):.1f} "
+        f"p99={percentile(stats.commit_ms, 99):.1f} max={max(stats.commit_ms, default=0):.1f} commits={len(stats.commit_ms)}"
+    )
+    wal = after["wal_lsn_bytes"] - before["wal_lsn_bytes"]
+    print(f"wal total={wal / mb:.1f} MiB per_1M_rows={wal * per_m / mb:.1f} MiB")
+    print("growth per 1M rows (MiB):")
+    for t in TABLES:
+        dt = after[f"{t}.table"] - before[f"{t}.table"]
+        di = after[f"{t}.index"] - before[f"{t}.index"]
+        n = after[f"{t}.rows"] - before[f"{t}.rows"]
+        scale = 1_000_000 / n if n else 0.0
+        print(f"  {t:<12} table={dt * scale / mb:>8.1f} index={di * scale / mb:>8.1f} rows={n}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--collectors", type=int, default=100)
+    ap.add_argument("--interval-seconds", type=float, default=1.0)
+    ap.add_argument("--duration", type=float, default=30.0)
+    ap.add_argument("--mode", choices=["orm", "bulk", "copy"], default="orm")
+    ap.add_argument("--pool-size", type=int, default=20, help="orm modunda bağlantı havuzu")
+    ap.add_argument("--writers", type=int, default=4, help="bulk/copy modunda paralel writer sayısı")
+    ap.add_argument("--batch-size", type=int, default=500, help="writer başına tek transaction'daki örnek sayısı")
+    ap.add_argument("--queue-size", type=int, default=100_000)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--truncate", action="store_true", help="Önce metrics_* tablolarını boşalt")
+    ap.add_argument("--checkpoint", action="store_true", help="truncate sonrası CHECKPOINT (superuser gerekir)")
+    args = ap.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
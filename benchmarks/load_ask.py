@@ -0,0 +1,123 @@
+"""
+/api/v1/llm/ask için uçtan uca yük testi.
+
+Önkoşullar: API çalışıyor (LLM_BASE_URL sahte sunucuya yönlenmiş), DB seed'li:
+
+    python -m benchmarks.fake_llm --port 9000 --latency-ms 200 &
+    python -m benchmarks.seed_db --hours 24
+    LLM_BASE_URL=http://localhost:9000/v1 uvicorn app.main:app --port 8000 &
+    python -m benchmarks.load_ask --concurrency 16 --requests 500
+
+p50/p95/p99 gecikme, istek/sn ve Server-Timing header'ından aşama kırılımı (llm, tool, finalize,
+orchestrator overhead = total - diğerleri) raporlanır.
+"""
+import argparse
+import asyncio
+import itertools
+import statistics
+import time
+from collections import Counter, defaultdict
+
+import httpx
+
+from benchmarks.corpus import QUESTIONS
+
+
+def percentile(values: list[float], p: float) -> float:
+    if not values:
+        return 0.0
+    s = sorted(values)
+    k = min(len(s) - 1, max(0, round(p / 100 * (len(s) - 1))))
+    return s[k]
+
+
+def parse_server_timing(header: str | None) -> dict[str, float]:
+    out: dict[str, float] = {}
+    for part in (header or "").split(","):
+        name, _, rest = part.strip().partition(";")
+        if rest.startswith("dur="):
+            try:
+                out[name] = float(rest[4:])
+            except ValueError:
+                pass
+    return out
+
+
+async def run(url: str, concurrency: int, total: int, warmup: int, timeout: float) -> None:
+    questions = itertools.cycle(QUESTIONS)
+    latencies: list[float] = []
+    stages: dict[str, list[float]] = defaultdict(list)
+    statuses: Counter[int | str] = Counter()
+    lock = asyncio.Lock()
+    remaining = total + warmup
+
+    async with httpx.AsyncClient(base_url=url, timeout=timeout, limits=httpx.Limits(max_connections=concurrency)) as client:
+
+        async def worker() -> None:
+            nonlocal remaining
+            while True:
+                async with lock:
+                    if remaining <= 0:
+                        return
+                    remaining -= 1
+                    measured = remaining < total
+                    text = next(questions)
+
+                start = time.perf_counter()
+                try:
+                    r = await client.post("/api/v1/llm/ask", json={"text": text})
+                    status: int | str = r.status_code
+                except httpx.HTTPError as e:
+                    r = None
+                    status = type(e).__name__
+                elapsed = (time.perf_counter() - start) * 1000
+
+                if not measured:
+                    continue
+                statuses[status] += 1
+                latencies.append(elapsed)
+                if r is not None:
+                    st = parse_server_timing(r.headers.get("Server-Timing"))
+                    if st:
+                        accounted = sum(v for k, v in st.items() if k != "total")
+                        st["overhead"] = max(0.0, st.get("total", elapsed) - accounted)
+                        st["network"] = max(0.0, elapsed - st.get("total", elapsed))
+                    for k, v in st.items():
+                        stages[k].append(v)
+
+        wall_start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall = time.perf_counter() - wall_start
+
+    n = len(latencies)
+    print(f"requests={n} concurrency={concurrency} wall={wall:.2f}s rps={n / wall if wall else 0:.1f}")
+    print(f"status={dict(statuses)}")
+    print(
+        f"latency_ms p50={percentile(latencies, 50):.1f} p95={percentile(latencies, 95):.1f} "
+        f"p99={percentile(latencies, 99):.1f} max={max(latencies, default=0):.1f}"
+    )
+    if stages:
+        print("stage breakdown (ms, per request):")
+        print(f"  {'stage':<10} {'mean':>9} {'p50':>9} {'p95':>9} {'p99':>9}")
+        for name in sorted(stages, key=lambda k: -statistics.fmean(stages[k])):
+            # aşamanın hiç çalışmadığı istekleri 0 say
+            vals = stages[name] + [0.0] * (n - len(stages[name]))
+            print(
+                f"  {name:<10} {statistics.fmean(vals):>9.1f} {percentile(vals, 50):>9.1f} "
+                f"{percentile(vals, 95):>9.1f} {percentile(vals, 99):>9.1f}"
+            )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--url", default="http://localhost:8000")
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--requests", type=int, default=200)
+    ap.add_argument("--warmup", type=int, default=10)
+    ap.add_argument("--timeout", type=float, default=120.0)
+    args = ap.parse_args()
+    asyncio.run(run(args.url, args.concurrency, args.requests, args.warmup, args.timeout))
+
+
+if __name__ == "__main__":
+    main()
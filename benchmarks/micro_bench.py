@@ -0,0 +1,199 @@
+"""
+Orchestrator/executor sıcak yollarının (istek başına saf Python işi) mikro benchmark'ı; DB ve LLM gerekmez.
+
+    python -m benchmarks.micro_bench                              # ölç, tabloyu yaz
+    python -m benchmarks.micro_bench --save                       # sonucu baseline olarak kaydet
+    python -m benchmarks.micro_bench --check --threshold 0.25     # baseline'dan %25 yavaşsa exit 1
+
+Her vaka korpusun (benchmarks/corpus.py) tamamını gezer. Tek ölçüm: `--rounds` turun en iyisi, çağrı başına ns.
+Bellek: tracemalloc ile korpus turlarındaki en küçük peak ayrılan byte, çağrı başına.
+
+Süre makineye ve anlık yüke bağlıdır; ardışık koşular tek başına %40'a kadar oynayabiliyor. Bu yüzden her vakadan
+hemen önce sabit bir kalibrasyon döngüsü ölçülür ve vaka ona oranla (ratio) ifade edilir; --repeat tekrarın medyanı
+alınır. --check oranı baseline'ın oranıyla karşılaştırır: runner hızlı/yavaş olsa da oran korunur.
+Baseline repoda: benchmarks/micro_baseline.json (bilinçli hızlanma/yavaşlamadan sonra --save ile güncellenir).
+Bellek ölçümü makineden bağımsızdır ve daha sıkı eşikle (--alloc-threshold) kontrol edilir.
+Settings import'u için DATABASE_URL_ASYNC/SYNC tanımlı olmalı (bağlantı açılmaz).
+"""
+import argparse
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+
+from jsonschema import validate
+
+from app.llm.orchestrator import (
+    _format_tool_answer,
+    _required_markers,
+    _tool_result_as_text,
+    _try_parse_inline_tool_json,
+    infer_minutes_from_text,
+)
+from app.llm.prompt import select_tools
+from app.llm.tools.executor import sanitize_args
+from app.llm.tools.registry import ToolRegistry
+from app.main import UTF8ORJSONResponse
+from benchmarks.corpus import LLM_CONTENTS, QUESTIONS, TOOL_CALLS, TOOL_RESULTS
+
+BASELINE = Path(__file__).resolve().parent / "micro_baseline.json"
+_MIN_ROUND_SECONDS = 0.05
+_ALLOC_NOISE_BYTES = 256  # bu kadarlık fark eşik aşımı sayılmaz (interned str/dict resize oynaması)
+
+
+def _calibration(n: int) -> int:
+    # Vakalara benzer karışık yorumlayıcı işi (str, dict, list); kod değişmediği sürece sabit referans
+    d: dict[str, int] = {}
+    for i in range(n):
+        key = f"k{i % 97}"
+        d[key] = d.get(key, 0) + len(key)
+    return sum(sorted(d.values()))
+
+
+_CALIBRATION_CORPUS = [200] * 10
+
+
+def build_cases() -> dict[str, tuple[Callable[[Any], Any], list[Any]]]:
+    registry = ToolRegistry()
+    schemas = {name: registry.get(name).parameters for name, _ in TOOL_CALLS}
+    sanitized = [(sanitize_args(schemas[name], args), schemas[name]) for name, args in TOOL_CALLS]
+    answers = [_format_tool_answer(name, args, result) or "" for name, args, result in TOOL_RESULTS]
+
+    return {
+        "infer_minutes": (infer_minutes_from_text, QUESTIONS),
+        "select_tools": (lambda q: select_tools(registry, q, 3), QUESTIONS),
+        "parse_inline_json": (_try_parse_inline_tool_json, LLM_CONTENTS),
+        "sanitize_args": (lambda c: sanitize_args(schemas[c[0]], c[1]), TOOL_CALLS),
+        "jsonschema_validate": (lambda c: validate(instance=c[0], schema=c[1]), sanitized),
+        "format_tool_answer": (lambda c: _format_tool_answer(*c), TOOL_RESULTS),
+        "tool_result_as_text": (lambda c: _tool_result_as_text(*c), TOOL_RESULTS),
+        "required_markers": (lambda c: _required_markers(*c), TOOL_RESULTS),
+        "orjson_response": (lambda a: UTF8ORJSONResponse(content={"answer": a, "session_id": "c0ffee"}).body, answers),
+        "orjson_tool_result": (lambda c: UTF8ORJSONResponse(content=c[2]).body, TOOL_RESULTS),
+    }
+
+
+def _run(fn: Callable[[Any], Any], corpus: list[Any], loops: int) -> float:
+    start = time.perf_counter()
+    for _ in range(loops):
+        for item in corpus:
+            fn(item)
+    return time.perf_counter() - start
+
+
+def measure_time(fn: Callable[[Any], Any], corpus: list[Any], rounds: int) -> float:
+    # timeit gibi: ölçüm sırasında GC kapalı, tur süresi kısa olmasın diye döngü sayısı kalibre edilir
+    gc.collect()
+    gc.disable()
+    try:
+        loops = 1
+        while _run(fn, corpus, loops) < _MIN_ROUND_SECONDS:
+            loops *= 2
+        best = min(_run(fn, corpus, loops) for _ in range(rounds))
+    finally:
+        gc.enable()
+    return best / (loops * len(corpus)) * 1e9
+
+
+def measure_alloc(fn: Callable[[Any], Any], corpus: list[Any], passes: int) -> float:
+    _run(fn, corpus, 1)  # lazy init / regex cache ölçüme girmesin
+    # İlk turlarda iç cache'ler (jsonschema, interned str) hâlâ doluyor: turların en küçüğü kararlı değer
+    peaks: list[int] = []
+    tracemalloc.start()
+    try:
+        for _ in range(passes):
+            base, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            _run(fn, corpus, 1)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(max(0, peak - base))
+    finally:
+        tracemalloc.stop()
+    return min(peaks) / len(corpus)
+
+
+def compare(results: dict[str, dict[str, float]], baseline: dict[str, dict[str, float]], threshold: float, alloc_threshold: float) -> list[str]:
+    failures: list[str] = []
+    for name, cur in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if cur["ratio"] > base["ratio"] * (1 + threshold):
+            failures.append(
+                f"{name}: time ratio {base['ratio']:.3f} -> {cur['ratio']:.3f} "
+                f"({base['ns_per_call']:.0f} -> {cur['ns_per_call']:.0f} ns/call)"
+            )
+        grew = cur["alloc_bytes_per_call"] - base["alloc_bytes_per_call"]
+        if grew > _ALLOC_NOISE_BYTES and cur["alloc_bytes_per_call"] > base["alloc_bytes_per_call"] * (1 + alloc_threshold):
+            failures.append(
+                f"{name}: alloc {base['alloc_bytes_per_call']:.0f} -> {cur['alloc_bytes_per_call']:.0f} B/call"
+            )
+    return failures
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rounds", type=int, default=7)
+    ap.add_argument("--repeat", type=int, default=5, help="kalibrasyon + tüm vakalar bu kadar tekrarlanır; medyan alınır")
+    ap.add_argument("--only", default="", help="virgülle ayrılmış vaka adları")
+    ap.add_argument("--baseline", type=Path, default=BASELINE)
+    ap.add_argument("--save", action="store_true", help="sonucu --baseline dosyasına yaz")
+    ap.add_argument("--check", action="store_true", help="baseline'a göre gerilemede exit 1")
+    ap.add_argument("--threshold", type=float, default=0.25, help="izin verilen süre artışı (0.25 = %%25)")
+    ap.add_argument("--alloc-threshold", type=float, default=0.10, help="izin verilen bellek artışı")
+    args = ap.parse_args()
+
+    cases = build_cases()
+    only = {n for n in args.only.split(",") if n}
+    baseline = json.loads(args.baseline.read_text()).get("results", {}) if args.baseline.exists() else {}
+
+    selected = {name: case for name, case in cases.items() if not only or name in only}
+    samples: dict[str, list[tuple[float, float]]] = {name: [] for name in selected}
+    calibrations: list[float] = []
+    for _ in range(args.repeat):
+        for name, (fn, corpus) in selected.items():
+            # Kalibrasyon her vakanın hemen önünde: frekans/yük oynaması iki ölçümü birlikte etkiler
+            calib = measure_time(_calibration, _CALIBRATION_CORPUS, args.rounds)
+            calibrations.append(calib)
+            ns = measure_time(fn, corpus, args.rounds)
+            samples[name].append((ns, ns / calib))
+
+    results: dict[str, dict[str, float]] = {}
+    print(f"calibration {statistics.median(calibrations):.0f} ns/unit (repeat={args.repeat}, rounds={args.rounds})")
+    print(f"{'case':<22} {'n':>4} {'ns/call':>10} {'ratio':>9} {'B/call':>9} {'vs base':>8}")
+    for name, (fn, corpus) in selected.items():
+        ns = statistics.median(ns for ns, _ in samples[name])
+        ratio = statistics.median(r for _, r in samples[name])
+        alloc = measure_alloc(fn, corpus, max(args.repeat, 5))
+        results[name] = {"ns_per_call": round(ns, 1), "ratio": round(ratio, 6), "alloc_bytes_per_call": round(alloc, 1)}
+        base = baseline.get(name)
+        delta = f"{(ratio / base['ratio'] - 1) * 100:+.0f}%" if base else "-"
+        print(f"{name:<22} {len(corpus):>4} {ns:>10.0f} {ratio:>9.4f} {alloc:>9.0f} {delta:>8}")
+
+    if args.save:
+        meta = {"python": platform.python_version(), "machine": platform.machine(), "saved_at": time.strftime("%Y-%m-%dT%H:%M:%S")}
+        args.baseline.write_text(json.dumps({"meta": meta, "results": results}, indent=2) + "\n")
+        print(f"baseline -> {args.baseline}")
+
+    if args.check:
+        if not baseline:
+            print(f"baseline yok: {args.baseline} (önce --save)", file=sys.stderr)
+            sys.exit(2)
+        base_python = json.loads(args.baseline.read_text()).get("meta", {}).get("python", "")
+        if base_python.rsplit(".", 1)[0] != platform.python_version().rsplit(".", 1)[0]:
+            print(f"uyarı: baseline Python {base_python}, bu koşu {platform.python_version()}", file=sys.stderr)
+        failures = compare(results, baseline, args.threshold, args.alloc_threshold)
+        for f in failures:
+            print(f"REGRESSION {f}", file=sys.stderr)
+        if failures:
+            sys.exit(1)
+        print(f"ok: {len(results)} cases within threshold (time +{args.threshold:.0%}, alloc +{args.alloc_threshold:.0%})")
+
+
+if __name__ == "__main__":
+    main()
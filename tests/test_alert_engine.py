@@ -0,0 +1,129 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from app.alerts.engine import AlertEngine
+from app.alerts.loader import RULES_DIR, load_rules
+from app.alerts.types import AlertRule
+from app.services import collector
+
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _rule(**kw) -> AlertRule:
+    base = {"name": "r", "description": "test", "kind": "threshold", "metric": "cpu.usage_percent", "op": ">=", "value": 90}
+    return AlertRule(**(base | kw))
+
+
+def _run(engine: AlertEngine, samples: list[tuple[int, float | None]], metric: str = "cpu.usage_percent") -> list[tuple[int, str]]:
+    # (saniye, değer) dizisini sırayla gözlemler; None o tick'te metriğin gelmediği anlamına gelir
+    out = []
+    for sec, v in samples:
+        for e in engine.observe(T0 + timedelta(seconds=sec), {} if v is None else {metric: v}):
+            out.append((sec, e["state"]))
+    return out
+
+
+def test_bundled_rules_load():
+    names = [r.name for r in load_rules(RULES_DIR)]
+    assert len(names) == len(set(names)) > 0
+
+
+def test_threshold_fires_after_for_seconds_and_resets_on_gap():
+    engine = AlertEngine([_rule(for_seconds=10)], T0.timestamp())
+    # 0-5 sn sağlanır, 6'da bozulur: sayaç sıfırlanır; 7'den itibaren 10 sn kesintisiz sağlanınca (17) tetiklenir
+    samples = [(0, 95), (5, 95), (6, 50), (7, 95), (12, 95), (16, 95), (17, 95), (18, 95)]
+    assert _run(engine, samples) == [(17, "firing")]
+
+
+def test_threshold_missing_sample_does_not_break_condition():
+    engine = AlertEngine([_rule(for_seconds=10)], T0.timestamp())
+    assert _run(engine, [(0, 95), (5, None), (10, 95)]) == [(10, "firing")]
+
+
+def test_threshold_hysteresis_uses_clear_value():
+    engine = AlertEngine([_rule(value=90, clear_value=80)], T0.timestamp())
+    samples = [(0, 95), (1, 85), (2, 80.5), (3, 92), (4, 79), (5, 85), (6, 90)]
+    # 85 ve 80.5 clear_value'nun üstünde: alarm açık kalır; 79'da düzelir, 85 yeniden tetiklemez
+    assert _run(engine, samples) == [(0, "firing"), (4, "resolved"), (6, "firing")]
+
+
+def test_threshold_without_clear_value_resolves_below_value():
+    engine = AlertEngine([_rule(value=90)], T0.timestamp())
+    assert _run(engine, [(0, 95), (1, 89.9)]) == [(0, "firing"), (1, "resolved")]
+
+
+def test_less_than_operator():
+    engine = AlertEngine([_rule(op="<", value=10, clear_value=20)], T0.timestamp())
+    assert _run(engine, [(0, 15), (1, 5), (2, 15), (3, 25)]) == [(1, "firing"), (3, "resolved")]
+
+
+def test_rate_is_per_minute():
+    rule = _rule(kind="rate", metric="cpu.temperature_c", value=10, clear_value=2)
+    engine = AlertEngine([rule], T0.timestamp())
+    # 30 sn'de +4°C = 8°C/dk (tetiklemez), 30 sn'de +6°C = 12°C/dk (tetikler), sonra 1°C/dk ile düzelir
+    samples = [(0, 50), (30, 54), (60, 60), (90, 63), (150, 64)]
+    assert _run(engine, samples, metric="cpu.temperature_c") == [(60, "firing"), (150, "resolved")]
+
+
+def test_rate_first_sample_and_non_increasing_time_are_ignored():
+    rule = _rule(kind="rate", metric="cpu.temperature_c", value=10)
+    engine = AlertEngine([rule], T0.timestamp())
+    # Aynı zaman damgalı ikinci örnek sıfıra bölmez; sadece baz değeri günceller
+    assert _run(engine, [(0, 50), (0, 90), (60, 91)], metric="cpu.temperature_c") == []
+
+
+def test_absence_fires_and_resolves():
+    rule = _rule(kind="absence", value=None, for_seconds=30)
+    engine = AlertEngine([rule], T0.timestamp())
+    samples = [(10, None), (29, None), (30, None), (40, None), (45, 12.0), (60, None), (75, 12.0)]
+    assert _run(engine, samples) == [(30, "firing"), (45, "resolved")]
+
+
+def test_absence_event_has_no_value():
+    rule = _rule(kind="absence", value=None, for_seconds=5)
+    engine = AlertEngine([rule], T0.timestamp())
+    [event] = engine.observe(T0 + timedelta(seconds=5), {})
+    assert event["state"] == "firing" and event["value"] is None and event["threshold"] is None
+
+
+def test_seeded_firing_resolves_without_refiring():
+    engine = AlertEngine([_rule(value=90, clear_value=80)], T0.timestamp(), firing=["r", "unknown"])
+    assert _run(engine, [(0, 95), (1, 70)]) == [(1, "resolved")]
+
+
+def test_event_shape():
+    engine = AlertEngine([_rule(severity="critical")], T0.timestamp())
+    [event] = engine.observe(T0, {"cpu.usage_percent": 95.456})
+    assert event == {
+        "ts": T0,
+        "rule": "r",
+        "severity": "critical",
+        "state": "firing",
+        "metric": "cpu.usage_percent",
+        "value": 95.46,
+        "threshold": 90,
+        "message": "test",
+    }
+
+
+def test_seed_resolves_removed_rules(monkeypatch):
+    active = [
+        {"rule": "kept", "severity": "warning", "metric": "cpu.usage_percent", "threshold": 90.0, "message": "a"},
+        {"rule": "removed", "severity": "critical", "metric": "ram.used_percent", "threshold": 95.0, "message": "b"},
+    ]
+    sent: list[dict] = []
+
+    async def fake_firing_alerts():
+        return active
+
+    async def fake_dispatch(events):
+        sent.extend(events)
+
+    monkeypatch.setattr(collector, "_firing_alerts", fake_firing_alerts)
+    monkeypatch.setattr(collector, "dispatch", fake_dispatch)
+
+    firing = asyncio.run(collector._seed_alerts({"kept", "other"}))
+
+    assert firing == {"kept"}
+    assert [(e["rule"], e["state"], e["value"]) for e in sent] == [("removed", "resolved", None)]
+    assert list(sent[0]) == list(AlertEngine._event(_rule(), T0, "resolved", None))
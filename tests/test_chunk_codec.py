@@ -0,0 +1,88 @@
+import math
+import struct
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.services.chunks import (
+    decode_chunk,
+    decode_floats,
+    decode_timestamps,
+    encode_chunk,
+    encode_floats,
+    encode_timestamps,
+)
+
+
+def _bits(values: list[float]) -> list[bytes]:
+    # NaN != NaN ve 0.0 == -0.0; round-trip bit düzeyinde karşılaştırılır
+    return [struct.pack(">d", v) for v in values]
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        [],
+        [42.0],
+        [12.5] * 100,
+        [0.0, -1.5, 3.25, -100.125, 7.0],
+        [-3.0, -2.0, -1.0, 0.0, 1.0],
+        [0.1, 0.2, 0.30000000000000004, 1 / 3],
+        [1.0, math.nan, 2.0],
+        [math.inf, -math.inf, 0.5],
+        [math.nan] * 5,
+        [-0.0, 0.0, -0.0],
+        [1e308, -1e308, 5e-324],
+        [2.0**60, 2.0**60 + 256],
+    ],
+)
+def test_floats_round_trip(values: list[float]) -> None:
+    buf = encode_floats(values) + b"\xaa"  # arkadan gelen kolon verisi okunmamalı
+    decoded, pos = decode_floats(buf, len(values))
+    assert _bits(decoded) == _bits(values)
+    assert pos == len(buf) - 1
+
+
+def test_scaled_mode_is_compact_for_sensor_values() -> None:
+    values = [round(40 + (i % 7) * 0.1, 1) for i in range(360)]
+    assert encode_floats(values)[0] == 2  # 10^1 ölçekli tamsayı delta'ları
+    assert len(encode_floats(values)) < 2 * len(values)
+
+
+def test_non_finite_values_use_xor_mode() -> None:
+    assert encode_floats([1.0, math.nan])[0] == 0
+    assert encode_floats([1.0, math.inf])[0] == 0
+    assert encode_floats([1e308, 0.5])[0] == 0  # 0.5 için 10^1 ölçek gerekir, 1e308 * 10 taşar
+
+
+@pytest.mark.parametrize(
+    "ts_us",
+    [
+        [],
+        [1_700_000_000_000_000],
+        [1_700_000_000_000_000 + i * 10_000_000 for i in range(50)],  # sabit aralık: delta-of-delta 0
+        [1_700_000_000_000_000, 1_700_000_010_000_000, 1_700_000_010_000_001, 1_700_000_050_123_456],
+        [5, 3, 10, -7],  # geri giden ve negatif değerler (zigzag)
+    ],
+)
+def test_timestamps_round_trip(ts_us: list[int]) -> None:
+    buf = encode_timestamps(ts_us)
+    decoded, pos = decode_timestamps(buf)
+    assert decoded == ts_us
+    assert pos == len(buf)
+
+
+def test_regular_timestamps_take_one_byte_each() -> None:
+    ts_us = [1_700_000_000_000_000 + i * 10_000_000 for i in range(1000)]
+    # uzunluk + ilk değer + ilk delta dışında her örnek tek byte (0)
+    assert len(encode_timestamps(ts_us)) < len(ts_us) + 16
+
+
+def test_chunk_round_trip_restores_int_columns() -> None:
+    start = datetime(2026, 10, 1, tzinfo=timezone.utc)
+    rows = [(start + timedelta(seconds=10 * i), 1000 + i, 2000 - i, 33.3 + i / 10) for i in range(30)]
+    columns = ("used_mb", "available_mb", "usage_percent")
+    ts_data, val_data = encode_chunk(rows, columns)
+    decoded = decode_chunk(ts_data, val_data, columns)
+    assert decoded == rows
+    assert all(isinstance(r[1], int) and isinstance(r[2], int) for r in decoded)
@@ -0,0 +1,148 @@
+from types import SimpleNamespace
+
+import psutil
+import pytest
+
+from app.core.config import settings
+from app.services.io_rates import IORateTracker, _counter_delta, _whole_disks
+
+
+def _disk(rb=0, wb=0, rc=0, wc=0, busy=None):
+    c = SimpleNamespace(read_bytes=rb, write_bytes=wb, read_count=rc, write_count=wc)
+    if busy is not None:
+        c.busy_time = busy
+    return c
+
+
+def _nic(rx=0, tx=0, prx=0, ptx=0, err=0, drop=0):
+    return SimpleNamespace(
+        bytes_recv=rx, bytes_sent=tx, packets_recv=prx, packets_sent=ptx, errin=err, errout=0, dropin=drop, dropout=0
+    )
+
+
+@pytest.fixture
+def counters(monkeypatch):
+    # psutil'in döndürdüğü sayaçlar test içinden değiştirilir: {"disk": {...}, "nic": {...}}
+    state = {"disk": {}, "nic": {}}
+    monkeypatch.setattr(psutil, "disk_io_counters", lambda perdisk=True: state["disk"])
+    monkeypatch.setattr(psutil, "net_io_counters", lambda pernic=True: state["nic"])
+    monkeypatch.setattr(settings, "io_disk_exclude_prefixes", "loop,ram")
+    monkeypatch.setattr(settings, "io_nic_exclude_prefixes", "lo")
+    return state
+
+
+def test_counter_delta():
+    assert _counter_delta(150, 100) == 50
+    assert _counter_delta(100, 100) == 0
+    assert _counter_delta(10, 100) is None
+
+
+def test_whole_disks_drops_partitions():
+    names = ["sda", "sda1", "sda2", "nvme0n1", "nvme0n1p1", "md0", "xvdb3"]
+    # md0 ve xvdb3'ün üst diski listede yok; kendileri cihaz sayılır
+    assert _whole_disks(names) == ["sda", "nvme0n1", "md0", "xvdb3"]
+
+
+def test_first_tick_is_baseline_only(counters):
+    t = IORateTracker()
+    counters["disk"] = {"sda": _disk(rb=1000)}
+    counters["nic"] = {"eth0": _nic(rx=500)}
+    assert t.sample_disks(0.0) == []
+    assert t.sample_nics(0.0) == []
+
+
+def test_disk_rates_and_busy_percent(counters):
+    t = IORateTracker()
+    counters["disk"] = {"sda": _disk(rb=0, wb=0, rc=0, wc=0, busy=0), "sda1": _disk(rb=0), "loop0": _disk()}
+    t.sample_disks(10.0)
+    counters["disk"] = {"sda": _disk(rb=4096, wb=2048, rc=4, wc=2, busy=500), "sda1": _disk(rb=4096), "loop0": _disk()}
+    assert t.sample_disks(12.0) == [
+        {
+            "device": "sda",
+            "read_bytes_per_s": 2048.0,
+            "write_bytes_per_s": 1024.0,
+            "read_iops": 2.0,
+            "write_iops": 1.0,
+            "busy_percent": 25.0,
+        }
+    ]
+
+
+def test_busy_percent_missing_on_platforms_without_busy_time(counters):
+    t = IORateTracker()
+    counters["disk"] = {"disk0": _disk()}
+    t.sample_disks(0.0)
+    counters["disk"] = {"disk0": _disk(rb=100)}
+    [row] = t.sample_disks(1.0)
+    assert row["busy_percent"] is None and row["read_bytes_per_s"] == 100.0
+
+
+def test_counter_reset_skips_interval_then_recovers(counters):
+    t = IORateTracker()
+    counters["nic"] = {"eth0": _nic(rx=10_000, tx=5_000, prx=100, ptx=50)}
+    t.sample_nics(0.0)
+    # Arayüz yeniden oluşturuldu: rx geriye gitti. Bu aralık için satır yok, sahte tepe de yok
+    counters["nic"] = {"eth0": _nic(rx=200, tx=6_000, prx=2, ptx=60)}
+    assert t.sample_nics(1.0) == []
+    # Yeni değerler taban olarak alınmıştır; sonraki aralık normal oran üretir
+    counters["nic"] = {"eth0": _nic(rx=1_200, tx=6_500, prx=12, ptx=65)}
+    assert t.sample_nics(2.0) == [
+        {
+            "nic": "eth0",
+            "rx_bytes_per_s": 1000.0,
+            "tx_bytes_per_s": 500.0,
+            "rx_packets_per_s": 10.0,
+            "tx_packets_per_s": 5.0,
+            "errors_per_s": 0.0,
+            "drops_per_s": 0.0,
+        }
+    ]
+
+
+def test_error_counter_reset_only_nulls_that_field(counters):
+    t = IORateTracker()
+    counters["nic"] = {"eth0": _nic(rx=0, err=50, drop=5)}
+    t.sample_nics(0.0)
+    counters["nic"] = {"eth0": _nic(rx=100, err=3, drop=7)}
+    [row] = t.sample_nics(2.0)
+    assert row["rx_bytes_per_s"] == 50.0
+    assert row["errors_per_s"] is None
+    assert row["drops_per_s"] == 1.0
+
+
+def test_disk_busy_time_reset_only_nulls_busy_percent(counters):
+    t = IORateTracker()
+    counters["disk"] = {"sda": _disk(busy=9_000)}
+    t.sample_disks(0.0)
+    counters["disk"] = {"sda": _disk(rb=10, busy=100)}
+    [row] = t.sample_disks(1.0)
+    assert row["busy_percent"] is None and row["read_bytes_per_s"] == 10.0
+
+
+def test_vanished_device_starts_from_baseline_again(counters):
+    t = IORateTracker()
+    counters["disk"] = {"sdb": _disk(rb=1_000_000)}
+    t.sample_disks(0.0)
+    counters["disk"] = {}
+    assert t.sample_disks(1.0) == []
+    # Yeniden takılan cihazın sayaçları sıfırdan başlar; eski taban unutulduğu için negatif/sahte oran yok
+    counters["disk"] = {"sdb": _disk(rb=10)}
+    assert t.sample_disks(2.0) == []
+    counters["disk"] = {"sdb": _disk(rb=110)}
+    assert t.sample_disks(3.0)[0]["read_bytes_per_s"] == 100.0
+
+
+def test_non_increasing_clock_yields_no_rate(counters):
+    t = IORateTracker()
+    counters["disk"] = {"sda": _disk()}
+    t.sample_disks(5.0)
+    counters["disk"] = {"sda": _disk(rb=100)}
+    assert t.sample_disks(5.0) == []
+
+
+def test_psutil_failure_returns_empty(monkeypatch):
+    def boom(**_):
+        raise RuntimeError("no /proc/diskstats")
+
+    monkeypatch.setattr(psutil, "disk_io_counters", boom)
+    assert IORateTracker().sample_disks(0.0) == []
@@ -0,0 +1,32 @@
+from app.core.config import settings
+from app.llm.sessions import SessionStore
+
+
+def test_ids_are_issued_by_server():
+    store = SessionStore()
+    ids = {store.create().id for _ in range(100)}
+    assert len(ids) == 100
+    assert all(len(i) >= 22 for i in ids)
+
+
+def test_unknown_id_is_not_created():
+    store = SessionStore()
+    assert store.get("c0ffee") is None
+    assert len(store) == 0
+
+
+def test_get_returns_existing_conversation():
+    store = SessionStore()
+    conv = store.create()
+    conv.add_turn("soru", "cevap")
+    store.update(conv)
+    assert store.get(conv.id) is conv
+
+
+def test_evicted_session_is_not_recreated(monkeypatch):
+    monkeypatch.setattr(settings, "llm_session_max_sessions", 1)
+    store = SessionStore()
+    first = store.create()
+    second = store.create()
+    assert store.get(first.id) is None
+    assert store.get(second.id) is second